@@ -0,0 +1,188 @@
+"""
+Async database access for the async def routes (gate passes, products).
+
+DB_MODE=async (default) uses an aiomysql pool, so waiting on MySQL does not hold a threadpool thread.
+DB_MODE=sync keeps the blocking pymysql pool from app.database and runs each cursor call in the
+threadpool instead; both expose the same interface:
+
+    async with get_db_async() as conn:
+        async with conn.cursor() as cur:
+            await cur.execute(sql, args)
+            rows = await cur.fetchall()
+
+Compare the two with benchmarks/db_mode.py. With DB_BACKEND=sqlite both come from app.sqlite_database.
+"""
+import asyncio
+import os
+from contextlib import asynccontextmanager
+from pymysql.err import InterfaceError, OperationalError
+from starlette.concurrency import run_in_threadpool
+from app.database import DB_BACKEND, get_pool
+from app.metrics import TimedSSDictCursor, async_cursor_classes
+
+DB_MODE = os.getenv("DB_MODE", "async").strip().lower()
+
+_pool = None
+_pool_lock = None
+
+
+async def get_async_pool():
+    """Per-process aiomysql pool, created on first use with the MYSQL_POOL_* settings."""
+    global _pool, _pool_lock
+    if _pool is None:
+        if _pool_lock is None:
+            _pool_lock = asyncio.Lock()
+        async with _pool_lock:
+            if _pool is None:
+                import aiomysql
+                _pool = await aiomysql.create_pool(
+                    host=os.getenv("MYSQL_HOST", "localhost"),
+                    user=os.getenv("MYSQL_USER", "root"),
+                    password=os.getenv("MYSQL_PASSWORD", ""),
+                    db=os.getenv("MYSQL_DATABASE", "gate_pass_db"),
+                    minsize=int(os.getenv("MYSQL_POOL_SIZE", "10")),
+                    maxsize=int(os.getenv("MYSQL_POOL_SIZE", "10")) + int(os.getenv("MYSQL_POOL_MAX_OVERFLOW", "20")),
+                    pool_recycle=int(os.getenv("MYSQL_POOL_RECYCLE", "3600")),
+                    cursorclass=async_cursor_classes()[0],
+                    autocommit=False,
+                )
+    return _pool
+
+
+async def warm_async_pool():
+    """Create the aiomysql pool (it opens MYSQL_POOL_SIZE connections) ahead of traffic; no-op for the other modes."""
+    if DB_BACKEND == "mysql" and DB_MODE != "sync":
+        await get_async_pool()
+
+
+async def close_async_pool():
+    global _pool
+    if _pool is not None:
+        _pool.close()
+        await _pool.wait_closed()
+        _pool = None
+
+
+class _ThreadedCursor:
+    """Async facade over a pymysql cursor; statements run in the threadpool (DB_MODE=sync)."""
+
+    def __init__(self, cur, unbuffered=False):
+        self._cur = cur
+        self._unbuffered = unbuffered
+
+    async def execute(self, sql, args=None):
+        return await run_in_threadpool(self._cur.execute, sql, args)
+
+    # Buffered results are read by execute(), so fetching does no I/O; unbuffered ones read the socket
+    async def _fetch(self, fn, *args):
+        if self._unbuffered:
+            return await run_in_threadpool(fn, *args)
+        return fn(*args)
+
+    async def fetchone(self):
+        return await self._fetch(self._cur.fetchone)
+
+    async def fetchmany(self, size):
+        return await self._fetch(self._cur.fetchmany, size)
+
+    async def fetchall(self):
+        return await self._fetch(self._cur.fetchall)
+
+    @property
+    def rowcount(self):
+        return self._cur.rowcount
+
+    @property
+    def lastrowid(self):
+        return self._cur.lastrowid
+
+    @property
+    def connection(self):
+        return self._cur.connection
+
+
+class _ThreadedConnection:
+    def __init__(self, conn):
+        self._conn = conn
+
+    @asynccontextmanager
+    async def cursor(self, unbuffered=False):
+        cur = self._conn.cursor(TimedSSDictCursor) if unbuffered else self._conn.cursor()
+        try:
+            yield _ThreadedCursor(cur, unbuffered)
+        finally:
+            if unbuffered:
+                # Closing an unbuffered cursor drains its remaining rows
+                await run_in_threadpool(cur.close)
+            else:
+                cur.close()
+
+    async def commit(self):
+        await run_in_threadpool(self._conn.commit)
+
+    async def rollback(self):
+        await run_in_threadpool(self._conn.rollback)
+
+
+@asynccontextmanager
+async def _threaded_db():
+    pool = get_pool()
+    conn = await run_in_threadpool(pool.acquire)
+    discard = False
+    try:
+        yield _ThreadedConnection(conn)
+        await run_in_threadpool(conn.commit)
+    except Exception as e:
+        discard = isinstance(e, (OperationalError, InterfaceError))
+        try:
+            await run_in_threadpool(conn.rollback)
+        except Exception:
+            discard = True
+        raise
+    except BaseException:
+        # Cancelled mid-transaction: don't hand the connection out again
+        discard = True
+        raise
+    finally:
+        pool.release(conn, discard=discard)
+
+
+@asynccontextmanager
+async def _aiomysql_db():
+    pool = await get_async_pool()
+    conn = await asyncio.wait_for(pool.acquire(), float(os.getenv("MYSQL_POOL_TIMEOUT", "30")))
+    try:
+        yield conn
+        await conn.commit()
+    except Exception as e:
+        if isinstance(e, (OperationalError, InterfaceError)):
+            conn.close()
+        else:
+            try:
+                await conn.rollback()
+            except Exception:
+                conn.close()
+        raise
+    finally:
+        # aiomysql closes connections released mid-transaction (e.g. on cancellation)
+        pool.release(conn)
+
+
+def unbuffered_cursor(conn):
+    """Server-side (streaming) dict cursor on a get_db_async() connection: rows are read as they are fetched.
+
+    Fetch with fetchmany(); the connection can't run other statements until the cursor is closed.
+    """
+    if DB_BACKEND == "sqlite" or isinstance(conn, _ThreadedConnection):
+        return conn.cursor(unbuffered=True)
+    return conn.cursor(async_cursor_classes()[1])
+
+
+def get_db_async(write=False):
+    """Async counterpart of app.database.get_db (including write): commits on success, rolls back on error."""
+    if DB_BACKEND == "sqlite":
+        from app import sqlite_database
+        return sqlite_database.get_db_async(write)
+    if DB_MODE == "sync":
+        return _threaded_db()
+    return _aiomysql_db()
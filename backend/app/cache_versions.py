@@ -0,0 +1,47 @@
+"""
+Version counters for in-process caches, shared across uvicorn workers via the cache_versions table.
+
+Writers call bump() inside their own transaction, so the new version commits together with the data.
+Readers call current(), which re-reads the counter at most every CACHE_VERSION_TTL seconds per
+process (a primary-key lookup); a bump from this process forces a re-read on the next call.
+"""
+import os
+import threading
+import time
+from app.async_database import get_db_async
+
+CHECK_TTL = float(os.getenv("CACHE_VERSION_TTL", "1"))
+
+_lock = threading.Lock()
+_versions = {}  # name -> (version, checked_at)
+
+
+async def bump(cur, name: str) -> int:
+    """Increment the version for name using the caller's cursor/transaction; returns the new version."""
+    await cur.execute(
+        "INSERT INTO cache_versions (name, version) VALUES (%s, 1) ON DUPLICATE KEY UPDATE version = version + 1",
+        (name,),
+    )
+    await cur.execute("SELECT version FROM cache_versions WHERE name = %s", (name,))
+    version = int((await cur.fetchone())["version"])
+    with _lock:
+        # Force the next current() to read the committed value
+        _versions.pop(name, None)
+    return version
+
+
+async def current(name: str) -> int:
+    """Latest known version for name (0 if never bumped)."""
+    now = time.monotonic()
+    with _lock:
+        cached = _versions.get(name)
+    if cached and now - cached[1] < CHECK_TTL:
+        return cached[0]
+    async with get_db_async() as conn:
+        async with conn.cursor() as cur:
+            await cur.execute("SELECT version FROM cache_versions WHERE name = %s", (name,))
+            row = await cur.fetchone()
+    version = int(row["version"]) if row else 0
+    with _lock:
+        _versions[name] = (version, now)
+    return version
@@ -0,0 +1,144 @@
+"""
+Negotiated response compression: brotli or gzip for JSON, CSV and other text bodies.
+
+Responses of COMPRESS_MIN_BYTES or more are compressed with the best encoding the request's
+Accept-Encoding allows: br when the brotli package is installed, otherwise gzip. Streaming responses
+(/gate-passes/export) are compressed chunk by chunk and flushed, so the client still gets data as it
+is produced. Event streams, binary types (PDF, PNG) and bodies that already carry a Content-Encoding
+pass through unchanged. Big bodies are compressed in the threadpool (zlib and brotli release the GIL)
+so the event loop keeps serving other requests meanwhile.
+"""
+import os
+import zlib
+from starlette.concurrency import run_in_threadpool
+from starlette.datastructures import Headers, MutableHeaders
+
+try:
+    import brotli
+except ImportError:  # optional: gzip only
+    brotli = None
+
+COMPRESS_MIN_BYTES = int(os.getenv("COMPRESS_MIN_BYTES", "1024"))
+COMPRESS_GZIP_LEVEL = int(os.getenv("COMPRESS_GZIP_LEVEL", "6"))
+# 4-5 is the usual speed/size balance for dynamic content (11 is for static assets)
+COMPRESS_BROTLI_QUALITY = int(os.getenv("COMPRESS_BROTLI_QUALITY", "4"))
+# Bodies/chunks at least this big are compressed in the threadpool instead of on the event loop
+THREADPOOL_BYTES = 256 * 1024
+COMPRESSIBLE_TYPES = ("application/json", "application/x-ndjson", "text/csv", "text/plain", "text/html")
+
+
+def choose_encoding(accept_encoding: str):
+    """"br", "gzip" or None for an Accept-Encoding header value."""
+    accepted = {}
+    for part in accept_encoding.lower().split(","):
+        name, _, params = part.partition(";")
+        q = 1.0
+        for param in params.split(";"):
+            key, _, value = param.strip().partition("=")
+            if key == "q":
+                try:
+                    q = float(value)
+                except ValueError:
+                    q = 0.0
+        if name.strip():
+            accepted[name.strip()] = q
+    for encoding in ("br", "gzip") if brotli is not None else ("gzip",):
+        if accepted.get(encoding, accepted.get("*", 0.0)) > 0:
+            return encoding
+    return None
+
+
+class _Compressor:
+    """Incremental compressor for one response body."""
+
+    def __init__(self, encoding):
+        if encoding == "br":
+            self._brotli = brotli.Compressor(mode=brotli.MODE_TEXT, quality=COMPRESS_BROTLI_QUALITY)
+        else:
+            self._brotli = None
+            self._zlib = zlib.compressobj(COMPRESS_GZIP_LEVEL, zlib.DEFLATED, zlib.MAX_WBITS | 16)
+
+    def chunk(self, data: bytes) -> bytes:
+        """Compressed data for a streamed chunk, flushed so the client can decode it right away."""
+        if self._brotli is not None:
+            return self._brotli.process(data) + self._brotli.flush()
+        return self._zlib.compress(data) + self._zlib.flush(zlib.Z_SYNC_FLUSH)
+
+    def finish(self, data: bytes = b"") -> bytes:
+        if self._brotli is not None:
+            return self._brotli.process(data) + self._brotli.finish()
+        return self._zlib.compress(data) + self._zlib.flush()
+
+
+async def _run(fn, data):
+    if len(data) >= THREADPOOL_BYTES:
+        return await run_in_threadpool(fn, data)
+    return fn(data)
+
+
+class CompressionMiddleware:
+    """ASGI middleware compressing eligible responses with the client's preferred encoding."""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+        encoding = choose_encoding(Headers(scope=scope).get("accept-encoding", ""))
+        if encoding is None:
+            return await self.app(scope, receive, send)
+
+        start = None
+        compressor = None  # set once the body is being compressed
+        passthrough = False
+
+        async def send_wrapper(message):
+            nonlocal start, compressor, passthrough
+            if message["type"] == "http.response.start":
+                headers = Headers(raw=message.get("headers", []))
+                content_type = headers.get("content-type", "").split(";")[0].strip().lower()
+                passthrough = (
+                    message["status"] < 200 or message["status"] in (204, 304)
+                    or "content-encoding" in headers
+                    or content_type not in COMPRESSIBLE_TYPES
+                )
+                if passthrough:
+                    await send(message)
+                else:
+                    start = message  # held until the first body chunk shows whether to compress
+                return
+            if message["type"] != "http.response.body" or passthrough:
+                await send(message)
+                return
+            body = message.get("body", b"")
+            more_body = message.get("more_body", False)
+            if start is not None:
+                headers = MutableHeaders(scope=start)
+                if not more_body and len(body) < COMPRESS_MIN_BYTES:
+                    passthrough = True
+                    await send(start)
+                    await send(message)
+                    return
+                compressor = _Compressor(encoding)
+                headers["Content-Encoding"] = encoding
+                headers.add_vary_header("Accept-Encoding")
+                if more_body:
+                    del headers["Content-Length"]
+                    await send(start)
+                    start = None
+                    body = await _run(compressor.chunk, body)
+                else:
+                    body = await _run(compressor.finish, body)
+                    headers["Content-Length"] = str(len(body))
+                    await send(start)
+                    start = None
+                    await send({"type": "http.response.body", "body": body})
+                    return
+            elif more_body:
+                body = await _run(compressor.chunk, body)
+            else:
+                body = await _run(compressor.finish, body)
+            await send({"type": "http.response.body", "body": body, "more_body": more_body})
+
+        await self.app(scope, receive, send_wrapper)
@@ -1,98 +1,211 @@
 import os
+import threading
 from pathlib import Path
 from pymysql import connect
-from pymysql.cursors import DictCursor
+from pymysql.err import InterfaceError, OperationalError
 from contextlib import contextmanager
 from dotenv import load_dotenv
+from app.db_pool import ConnectionPool
+from app.metrics import TimedDictCursor
 
 # Load .env from backend directory so it works regardless of current working directory
 _backend_dir = Path(__file__).resolve().parent.parent
 load_dotenv(_backend_dir / ".env")
 
+# mysql (default) or sqlite (embedded, see app.sqlite_database)
+DB_BACKEND = os.getenv("DB_BACKEND", "mysql").strip().lower()
+
 def get_connection():
     return connect(
         host=os.getenv("MYSQL_HOST", "localhost"),
         user=os.getenv("MYSQL_USER", "root"),
         password=os.getenv("MYSQL_PASSWORD", ""),
         database=os.getenv("MYSQL_DATABASE", "gate_pass_db"),
-        cursorclass=DictCursor,
+        cursorclass=TimedDictCursor,
         autocommit=False,
     )
 
+_pool = None
+_pool_lock = threading.Lock()
+
+def get_pool() -> ConnectionPool:
+    """Process-wide connection pool, created on first use. Sized via MYSQL_POOL_* env vars."""
+    global _pool
+    if _pool is None:
+        with _pool_lock:
+            if _pool is None:
+                _pool = ConnectionPool(
+                    get_connection,
+                    size=int(os.getenv("MYSQL_POOL_SIZE", "10")),
+                    max_overflow=int(os.getenv("MYSQL_POOL_MAX_OVERFLOW", "20")),
+                    timeout=float(os.getenv("MYSQL_POOL_TIMEOUT", "30")),
+                    recycle=int(os.getenv("MYSQL_POOL_RECYCLE", "3600")),
+                    ping_interval=int(os.getenv("MYSQL_POOL_PING_INTERVAL", "30")),
+                )
+    return _pool
+
+def close_pool():
+    global _pool
+    if DB_BACKEND == "sqlite":
+        from app.sqlite_database import close_engine
+        close_engine()
+    with _pool_lock:
+        if _pool is not None:
+            _pool.close()
+            _pool = None
+
+def pool_stats():
+    """Connection stats for /health/db from whichever backend is in use."""
+    if DB_BACKEND == "sqlite":
+        from app.sqlite_database import get_engine
+        return get_engine().stats()
+    return get_pool().stats()
+
+def warm_pool():
+    """Open the pool's connections (SQLite: readers) ahead of traffic; returns how many were opened."""
+    if DB_BACKEND == "sqlite":
+        from app.sqlite_database import get_engine
+        return get_engine().warm()
+    return get_pool().fill()
+
+def get_db(write=False):
+    """
+    Transaction context: `with get_db() as conn:` commits on success and rolls back on error.
+    write=True marks a transaction that checks rows and then writes: SQLite runs all of it on the writer so the
+    checks see what the writes commit on (MySQL transactions already do).
+    """
+    if DB_BACKEND == "sqlite":
+        from app import sqlite_database
+        return sqlite_database.get_db(write)
+    return _mysql_db()
+
 @contextmanager
-def get_db():
-    conn = get_connection()
+def _mysql_db():
+    pool = get_pool()
+    conn = pool.acquire()
+    discard = False
     try:
         yield conn
         conn.commit()
-    except Exception:
-        conn.rollback()
+    except Exception as e:
+        # Connection-level errors mean the link may be dead; don't hand it out again
+        discard = isinstance(e, (OperationalError, InterfaceError))
+        try:
+            conn.rollback()
+        except Exception:
+            discard = True
         raise
     finally:
-        conn.close()
+        pool.release(conn, discard=discard)
 
-def init_db():
-    """Create tables if they don't exist."""
-    with get_db() as conn:
-        with conn.cursor() as cur:
-            cur.execute("""
-                CREATE TABLE IF NOT EXISTS users (
-                    id INT AUTO_INCREMENT PRIMARY KEY,
-                    username VARCHAR(100) UNIQUE NOT NULL,
-                    password_hash VARCHAR(255) NOT NULL,
-                    full_name VARCHAR(255),
-                    role VARCHAR(50) DEFAULT 'user',
-                    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-                )
-            """)
-            cur.execute("""
-                CREATE TABLE IF NOT EXISTS products (
-                    id INT AUTO_INCREMENT PRIMARY KEY,
-                    item_code VARCHAR(100) UNIQUE NOT NULL,
-                    item_description VARCHAR(500) NOT NULL,
-                    item_group VARCHAR(100),
-                    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-                )
-            """)
-            cur.execute("""
-                CREATE TABLE IF NOT EXISTS gate_passes (
-                    id INT AUTO_INCREMENT PRIMARY KEY,
-                    gp_number VARCHAR(50) UNIQUE NOT NULL,
-                    pass_date DATE NOT NULL,
-                    authorized_name VARCHAR(255) NOT NULL,
-                    purpose_delivery TINYINT(1) DEFAULT 1,
-                    purpose_return TINYINT(1) DEFAULT 0,
-                    purpose_inter_warehouse TINYINT(1) DEFAULT 0,
-                    purpose_others TINYINT(1) DEFAULT 0,
-                    vehicle_type VARCHAR(100),
-                    plate_no VARCHAR(50),
-                    prepared_by VARCHAR(255),
-                    checked_by VARCHAR(255),
-                    recommended_by VARCHAR(255),
-                    approved_by VARCHAR(255),
-                    time_out VARCHAR(20),
-                    time_in VARCHAR(20),
-                    date_approved DATE NULL,
-                    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-                )
-            """)
-            cur.execute("""
-                CREATE TABLE IF NOT EXISTS gate_pass_items (
-                    id INT AUTO_INCREMENT PRIMARY KEY,
-                    gate_pass_id INT NOT NULL,
-                    item_code VARCHAR(100),
-                    item_description VARCHAR(500) NOT NULL,
-                    qty INT NOT NULL,
-                    ref_doc_no VARCHAR(100),
-                    destination VARCHAR(255),
-                    FOREIGN KEY (gate_pass_id) REFERENCES gate_passes(id) ON DELETE CASCADE
-                )
-            """)
-            # Default admin if no users
-            cur.execute("SELECT COUNT(*) as c FROM users")
-            if cur.fetchone()["c"] == 0:
-                from app.routes.auth import hash_password
-                cur.execute(
-                    "INSERT INTO users (username, password_hash, full_name, role) VALUES (%s, %s, %s, %s)",
-                    ("admin", hash_password("admin123"), "Administrator", "admin")
-                )
+# Baseline tables for a database without schema_version (see app.migrations); indexes and
+# later changes come from backend/migrations/, so add new ones there rather than here
+SCHEMA = [
+    """
+    CREATE TABLE IF NOT EXISTS users (
+        id INT AUTO_INCREMENT PRIMARY KEY,
+        username VARCHAR(100) UNIQUE NOT NULL,
+        password_hash VARCHAR(255) NOT NULL,
+        full_name VARCHAR(255),
+        role VARCHAR(50) DEFAULT 'user',
+        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS products (
+        id INT AUTO_INCREMENT PRIMARY KEY,
+        item_code VARCHAR(100) UNIQUE NOT NULL,
+        item_description VARCHAR(500) NOT NULL,
+        item_group VARCHAR(100),
+        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS gate_passes (
+        id INT AUTO_INCREMENT PRIMARY KEY,
+        gp_number VARCHAR(50) UNIQUE NOT NULL,
+        pass_date DATE NOT NULL,
+        authorized_name VARCHAR(255) NOT NULL,
+        in_or_out VARCHAR(10) DEFAULT 'out',
+        status VARCHAR(20) DEFAULT 'pending',
+        rejected_remarks TEXT,
+        purpose_delivery TINYINT(1) DEFAULT 1,
+        purpose_return TINYINT(1) DEFAULT 0,
+        purpose_inter_warehouse TINYINT(1) DEFAULT 0,
+        purpose_others TINYINT(1) DEFAULT 0,
+        vehicle_type VARCHAR(100),
+        plate_no VARCHAR(50),
+        attention VARCHAR(255),
+        prepared_by VARCHAR(255),
+        checked_by VARCHAR(255),
+        recommended_by VARCHAR(255),
+        approved_by VARCHAR(255),
+        time_out VARCHAR(20),
+        time_in VARCHAR(20),
+        date_approved DATE NULL,
+        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS gate_pass_items (
+        id INT AUTO_INCREMENT PRIMARY KEY,
+        gate_pass_id INT NOT NULL,
+        item_code VARCHAR(100),
+        item_description VARCHAR(500) NOT NULL,
+        qty INT NOT NULL,
+        ref_doc_no VARCHAR(100),
+        destination VARCHAR(255),
+        FOREIGN KEY (gate_pass_id) REFERENCES gate_passes(id) ON DELETE CASCADE
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS gp_sequences (
+        year INT PRIMARY KEY,
+        last_seq INT UNSIGNED NOT NULL
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS cache_versions (
+        name VARCHAR(50) PRIMARY KEY,
+        version BIGINT UNSIGNED NOT NULL
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS report_daily_passes (
+        pass_date DATE NOT NULL,
+        status VARCHAR(20) NOT NULL,
+        in_or_out VARCHAR(10) NOT NULL,
+        passes INT NOT NULL,
+        PRIMARY KEY (pass_date, status, in_or_out)
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS report_daily_items (
+        pass_date DATE NOT NULL,
+        status VARCHAR(20) NOT NULL,
+        item_code VARCHAR(100) NOT NULL,
+        qty BIGINT NOT NULL,
+        line_count INT NOT NULL,
+        PRIMARY KEY (pass_date, status, item_code)
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS report_daily_destinations (
+        pass_date DATE NOT NULL,
+        status VARCHAR(20) NOT NULL,
+        destination VARCHAR(255) NOT NULL,
+        qty BIGINT NOT NULL,
+        line_count INT NOT NULL,
+        PRIMARY KEY (pass_date, status, destination)
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS gate_pass_events (
+        id BIGINT UNSIGNED PRIMARY KEY,
+        type VARCHAR(20) NOT NULL,
+        data MEDIUMTEXT NOT NULL,
+        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+        INDEX idx_gate_pass_events_created_at (created_at)
+    )
+    """,
+]
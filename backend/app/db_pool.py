@@ -0,0 +1,159 @@
+import threading
+import time
+from collections import deque
+
+
+class PoolTimeout(Exception):
+    """No connection became available within the checkout timeout."""
+
+
+class ConnectionPool:
+    """
+    Bounded, thread-safe pool of DB-API connections.
+
+    Keeps up to `size` idle connections and opens at most `size + max_overflow` in total.
+    Checkouts beyond that wait up to `timeout` seconds. Connections older than `recycle`
+    seconds are replaced, and connections idle longer than `ping_interval` seconds are
+    pinged (reconnecting if the server dropped them) before being handed out.
+    """
+
+    def __init__(self, creator, size=5, max_overflow=10, timeout=30.0, recycle=3600, ping_interval=30):
+        self._creator = creator
+        self.size = size
+        self.max_overflow = max_overflow
+        self.timeout = timeout
+        self.recycle = recycle
+        self.ping_interval = ping_interval
+        self._cond = threading.Condition()
+        self._idle = deque()  # (conn, created_at, returned_at); newest at the right
+        self._created_at = {}  # id(conn) -> created_at for checked-out connections
+        self._open = 0
+        self._in_use = 0
+        self._checkouts = 0
+        self._waits = 0
+        self._wait_time = 0.0
+        self._timeouts = 0
+        self._recycled = 0
+        self._closed = False
+
+    def acquire(self):
+        """Check out a connection, opening or validating one as needed."""
+        wait_start = None
+        with self._cond:
+            while True:
+                if self._closed:
+                    raise PoolTimeout("Connection pool is closed")
+                if self._idle:
+                    conn, created_at, returned_at = self._idle.pop()
+                    break
+                if self._open < self.size + self.max_overflow:
+                    self._open += 1
+                    conn = created_at = returned_at = None
+                    break
+                now = time.monotonic()
+                if wait_start is None:
+                    wait_start = now
+                    self._waits += 1
+                remaining = self.timeout - (now - wait_start)
+                if remaining <= 0:
+                    self._timeouts += 1
+                    self._wait_time += now - wait_start
+                    raise PoolTimeout(f"No DB connection available within {self.timeout}s")
+                self._cond.wait(remaining)
+            if wait_start is not None:
+                self._wait_time += time.monotonic() - wait_start
+            self._in_use += 1
+            self._checkouts += 1
+        try:
+            conn, created_at = self._prepare(conn, created_at, returned_at)
+        except Exception:
+            with self._cond:
+                self._open -= 1
+                self._in_use -= 1
+                self._cond.notify()
+            raise
+        self._created_at[id(conn)] = created_at
+        return conn
+
+    def _prepare(self, conn, created_at, returned_at):
+        now = time.monotonic()
+        if conn is not None and self.recycle and now - created_at > self.recycle:
+            _close_quietly(conn)
+            conn = None
+            with self._cond:
+                self._recycled += 1
+        if conn is None:
+            return self._creator(), now
+        if self.ping_interval is not None and now - returned_at >= self.ping_interval:
+            conn.ping(reconnect=True)
+        return conn, created_at
+
+    def release(self, conn, discard=False):
+        """Return a connection. Pass discard=True if it may be broken; it is closed instead of reused."""
+        created_at = self._created_at.pop(id(conn), time.monotonic())
+        close = discard
+        with self._cond:
+            self._in_use -= 1
+            if not close and not self._closed and len(self._idle) < self.size:
+                self._idle.append((conn, created_at, time.monotonic()))
+            else:
+                close = True
+                self._open -= 1
+            self._cond.notify()
+        if close:
+            _close_quietly(conn)
+
+    def fill(self, count=None):
+        """Open connections until `count` (default: size) are open, ahead of traffic; returns how many were opened."""
+        count = self.size if count is None else min(count, self.size + self.max_overflow)
+        opened = 0
+        while True:
+            with self._cond:
+                if self._closed or self._open >= count:
+                    return opened
+                self._open += 1
+            try:
+                conn = self._creator()
+            except Exception:
+                with self._cond:
+                    self._open -= 1
+                    self._cond.notify()
+                raise
+            now = time.monotonic()
+            with self._cond:
+                self._idle.appendleft((conn, now, now))
+                self._cond.notify()
+            opened += 1
+
+    def close(self):
+        """Close idle connections and refuse new checkouts; checked-out connections close on release."""
+        with self._cond:
+            self._closed = True
+            idle = list(self._idle)
+            self._idle.clear()
+            self._open -= len(idle)
+            self._cond.notify_all()
+        for conn, _, _ in idle:
+            _close_quietly(conn)
+
+    def stats(self):
+        with self._cond:
+            return {
+                "size": self.size,
+                "max_overflow": self.max_overflow,
+                "open": self._open,
+                "idle": len(self._idle),
+                "in_use": self._in_use,
+                "checkouts": self._checkouts,
+                "waits": self._waits,
+                "wait_time_seconds": round(self._wait_time, 6),
+                "timeouts": self._timeouts,
+                "recycled": self._recycled,
+            }
+
+
+def _close_quietly(conn):
+    try:
+        conn.close()
+    except Exception:
+        pass
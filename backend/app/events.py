@@ -0,0 +1,277 @@
+"""
+Gate pass change events for GET /gate-passes/events (server-sent events).
+
+Writers call record() inside their transaction and committed() after the commit. Each event's id is
+the "gate_passes" cache version bumped by that transaction (see app.cache_versions), so ids are
+gap-free and a client reconnecting with Last-Event-ID gets exactly the events it missed, or a
+"reset" event if they are no longer kept (the client then reloads its list).
+
+Every worker fans events out to its own streams through a Broadcaster. Where the events come from
+is set by EVENTS_BACKEND:
+  memory  events are published in-process and kept in a ring buffer for resume. Only sees this
+          worker's writes, so use it with a single worker (or locally).
+  mysql   record() also inserts into gate_pass_events; each worker polls that table every
+          EVENTS_POLL_INTERVAL seconds (one query per worker, not per client) and publishes what is new.
+"""
+import asyncio
+import logging
+import os
+from bisect import insort
+from typing import NamedTuple, Optional
+import orjson
+from app import cache_versions
+from app.async_database import get_db_async
+
+EVENTS_BACKEND = os.getenv("EVENTS_BACKEND", "memory").strip().lower()
+# Events kept per worker (memory) or returned per resume (mysql)
+EVENTS_BUFFER = int(os.getenv("EVENTS_BUFFER", "1000"))
+EVENTS_POLL_INTERVAL = float(os.getenv("EVENTS_POLL_INTERVAL", "1"))
+EVENTS_RETENTION_HOURS = int(os.getenv("EVENTS_RETENTION_HOURS", "24"))
+# Streams end after this long and the browser reconnects with Last-Event-ID (bounds shutdown and token expiry)
+EVENTS_STREAM_SECONDS = float(os.getenv("EVENTS_STREAM_SECONDS", "300"))
+HEARTBEAT_SECONDS = 15
+RETRY_MS = 3000
+# Undelivered events per stream; a client that falls further behind is disconnected and resumes
+SUBSCRIBER_QUEUE_SIZE = 256
+PRUNE_EVERY_SECONDS = 600
+
+logger = logging.getLogger(__name__)
+
+
+class Event(NamedTuple):
+    id: int
+    type: str
+    data: bytes  # JSON
+
+    @property
+    def frame(self) -> bytes:
+        return b"id: %d\nevent: %s\ndata: %s\n\n" % (self.id, self.type.encode(), self.data)
+
+
+class _Subscription:
+    __slots__ = ("queue", "dropped")
+
+    def __init__(self):
+        self.queue = asyncio.Queue(maxsize=SUBSCRIBER_QUEUE_SIZE)
+        self.dropped = False
+
+
+class Broadcaster:
+    """In-process fan-out of events to the open streams of this worker."""
+
+    def __init__(self):
+        self._subscriptions = set()
+
+    def subscribe(self) -> _Subscription:
+        sub = _Subscription()
+        self._subscriptions.add(sub)
+        return sub
+
+    def unsubscribe(self, sub):
+        self._subscriptions.discard(sub)
+
+    def publish(self, event: Event):
+        for sub in list(self._subscriptions):
+            try:
+                sub.queue.put_nowait(event)
+            except asyncio.QueueFull:
+                # Too slow: end its stream once drained; the client resumes from its Last-Event-ID
+                sub.dropped = True
+                self._subscriptions.discard(sub)
+
+    def close(self):
+        for sub in list(self._subscriptions):
+            sub.dropped = True
+            try:
+                sub.queue.put_nowait(None)
+            except asyncio.QueueFull:
+                pass
+        self._subscriptions.clear()
+
+    def __len__(self):
+        return len(self._subscriptions)
+
+
+class MemoryBackend:
+    """Events from this process only, kept in a ring buffer of EVENTS_BUFFER for resume."""
+
+    def __init__(self, broadcaster):
+        self.broadcaster = broadcaster
+        self._buffer = []
+
+    async def append(self, cur, event):
+        pass
+
+    def committed(self, event):
+        # Concurrent requests can finish out of version order; keep the buffer sorted for since()
+        insort(self._buffer, event)
+        del self._buffer[:-EVENTS_BUFFER]
+        self.broadcaster.publish(event)
+
+    async def since(self, last_id):
+        return [e for e in self._buffer if e.id > last_id]
+
+    def start(self):
+        pass
+
+    async def stop(self):
+        self._buffer.clear()
+
+
+class MySQLBackend:
+    """Events stored in gate_pass_events with the change; a per-worker poller publishes new rows."""
+
+    def __init__(self, broadcaster):
+        self.broadcaster = broadcaster
+        self._task = None
+        self._last_id = None
+
+    async def append(self, cur, event):
+        # Upsert: a rebuilt cache_versions table can hand out an id again
+        await cur.execute(
+            "INSERT INTO gate_pass_events (id, type, data) VALUES (%s, %s, %s) AS new "
+            "ON DUPLICATE KEY UPDATE type = new.type, data = new.data, created_at = CURRENT_TIMESTAMP",
+            (event.id, event.type, event.data),
+        )
+
+    def committed(self, event):
+        # Delivered by the poller, in id order, to every worker alike
+        pass
+
+    async def _fetch(self, cur, last_id, limit):
+        await cur.execute("SELECT id, type, data FROM gate_pass_events WHERE id > %s ORDER BY id LIMIT %s", (last_id, limit))
+        return [Event(int(r["id"]), r["type"], r["data"].encode("utf-8")) for r in await cur.fetchall()]
+
+    async def since(self, last_id):
+        async with get_db_async() as conn:
+            async with conn.cursor() as cur:
+                return await self._fetch(cur, last_id, EVENTS_BUFFER)
+
+    async def _poll(self):
+        loop = asyncio.get_running_loop()
+        last_prune = loop.time()
+        while True:
+            try:
+                async with get_db_async() as conn:
+                    async with conn.cursor() as cur:
+                        if self._last_id is None:
+                            await cur.execute("SELECT COALESCE(MAX(id), 0) AS id FROM gate_pass_events")
+                            self._last_id = int((await cur.fetchone())["id"])
+                        events = await self._fetch(cur, self._last_id, EVENTS_BUFFER)
+                        if loop.time() - last_prune >= PRUNE_EVERY_SECONDS:
+                            last_prune = loop.time()
+                            await cur.execute(
+                                "DELETE FROM gate_pass_events WHERE created_at < NOW() - INTERVAL %s HOUR",
+                                (EVENTS_RETENTION_HOURS,),
+                            )
+                for event in events:
+                    self._last_id = event.id
+                    self.broadcaster.publish(event)
+                if len(events) == EVENTS_BUFFER:
+                    continue
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                logger.exception("Polling gate_pass_events failed")
+            await asyncio.sleep(EVENTS_POLL_INTERVAL)
+
+    def start(self):
+        if self._task is None:
+            self._task = asyncio.get_running_loop().create_task(self._poll())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+
+_BACKENDS = {"memory": MemoryBackend, "mysql": MySQLBackend}
+broadcaster = Broadcaster()
+_backend = None
+_draining = False
+
+
+def get_backend():
+    global _backend
+    if _backend is None:
+        if EVENTS_BACKEND not in _BACKENDS:
+            raise RuntimeError(f"EVENTS_BACKEND must be one of {', '.join(_BACKENDS)}, not {EVENTS_BACKEND!r}")
+        _backend = _BACKENDS[EVENTS_BACKEND](broadcaster)
+    return _backend
+
+
+async def record(cur, version: int, event_type: str, data) -> Event:
+    """Create the event for a change in the caller's transaction; version is the gate_passes version it bumped."""
+    event = Event(version, event_type, orjson.dumps(data))
+    await get_backend().append(cur, event)
+    return event
+
+
+def committed(event: Event):
+    """Publish an event once its transaction has committed."""
+    get_backend().committed(event)
+
+
+async def stream(last_event_id: Optional[int]):
+    """SSE frames: missed events after last_event_id (or "reset"), then live events and heartbeats."""
+    if _draining:
+        # Shutting down: the client reconnects after RETRY_MS, to whichever server is still up
+        yield b"retry: %d\n\n" % RETRY_MS
+        return
+    backend = get_backend()
+    backend.start()
+    # Subscribe before replaying so nothing published in between is lost; replayed ids are skipped live
+    sub = broadcaster.subscribe()
+    replayed = set()
+    try:
+        yield b"retry: %d\n\n" % RETRY_MS
+        if last_event_id is not None:
+            events = await backend.since(last_event_id)
+            current = await cache_versions.current("gate_passes")
+            expected = last_event_id + 1
+            # current may lag by CACHE_VERSION_TTL, so only a version ahead of last_event_id counts as missed
+            if (events and events[0].id != expected) or (not events and last_event_id < current):
+                # The missed events are no longer kept: the client reloads its list and resumes from here
+                yield Event(max(current, events[-1].id if events else 0), "reset", b"{}").frame
+            else:
+                for event in events:
+                    replayed.add(event.id)
+                    yield event.frame
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + EVENTS_STREAM_SECONDS
+        while True:
+            if sub.dropped and sub.queue.empty():
+                break
+            remaining = deadline - loop.time()
+            if remaining <= 0:
+                break
+            try:
+                event = await asyncio.wait_for(sub.queue.get(), min(HEARTBEAT_SECONDS, remaining))
+            except asyncio.TimeoutError:
+                yield b": ping\n\n"
+                continue
+            if event is None:
+                break
+            if event.id in replayed:
+                continue
+            yield event.frame
+    finally:
+        broadcaster.unsubscribe(sub)
+
+
+def drain():
+    """Ends open streams and refuses new ones so a shutting-down server isn't held up by them (see app.server)."""
+    global _draining
+    _draining = True
+    broadcaster.close()
+
+
+async def close():
+    """Ends open streams and stops the backend (called on shutdown)."""
+    broadcaster.close()
+    if _backend is not None:
+        await _backend.stop()
@@ -0,0 +1,212 @@
+"""
+Server-side rendering of the printable gate pass (PDF) and its Code 128 barcode (PNG).
+
+Mirrors frontend/src/components/GatePassPrintView.jsx. Rendering is CPU-bound, so the routes run
+it in a per-process worker pool (PRINT_WORKERS) and cache the results (see gate_passes.py).
+Inputs are GatePassResponse-shaped dicts so they pickle cheaply into the workers.
+"""
+import asyncio
+import hashlib
+import io
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+import orjson
+
+COMPANY = "CHERENZ GLOBAL MFG. INC."
+# Processes for PDF/PNG rendering per app worker (0 = render in the request's threadpool thread)
+PRINT_WORKERS = int(os.getenv("PRINT_WORKERS", str(min(4, os.cpu_count() or 1))))
+
+_pool_lock = threading.Lock()
+_render_pool = None
+
+
+def _get_render_pool():
+    """Per-process render pool, created on first use (so each uvicorn worker gets its own)."""
+    global _render_pool
+    if _render_pool is None and PRINT_WORKERS > 0:
+        with _pool_lock:
+            if _render_pool is None:
+                _render_pool = ProcessPoolExecutor(max_workers=PRINT_WORKERS)
+    return _render_pool
+
+
+def shutdown_render_pool():
+    global _render_pool
+    with _pool_lock:
+        if _render_pool is not None:
+            _render_pool.shutdown(wait=False, cancel_futures=True)
+            _render_pool = None
+
+
+async def run_render(fn, *args):
+    """Run a render function in the pool without blocking the event loop."""
+    pool = _get_render_pool()
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(pool, fn, *args)
+
+
+def content_hash(*parts) -> str:
+    """Short stable hash of the data an artifact is rendered from; part of the cache key and the ETag."""
+    digest = hashlib.sha256()
+    for part in parts:
+        digest.update(orjson.dumps(part, option=orjson.OPT_SORT_KEYS))
+    return digest.hexdigest()[:20]
+
+
+def _code128_bars(value: str):
+    """(is_bar, width in modules) runs for value, from reportlab's Code 128 encoder."""
+    from reportlab.graphics.barcode.code128 import Code128
+    code = Code128(value)
+    code.validate()
+    code.encode()
+    code.decompose()
+    # Upper case letters are bars, lower case spaces; A/a = 1 module wide
+    return [(c.isupper(), ord(c.lower()) - ord("a") + 1) for c in code.decomposed]
+
+
+def barcode_png(value: str, module: int = 2, height: int = 50, quiet: int = 10) -> bytes:
+    """Code 128 PNG with the value printed underneath (like the JsBarcode canvas on the print page)."""
+    from PIL import Image, ImageDraw, ImageFont
+    bars = _code128_bars(value)
+    font = ImageFont.load_default()
+    text_box = font.getbbox(value)
+    text_height = text_box[3] - text_box[1] + 6
+    width = (sum(w for _, w in bars) + 2 * quiet) * module
+    image = Image.new("L", (width, height + text_height + 8), 255)
+    draw = ImageDraw.Draw(image)
+    x = quiet * module
+    for is_bar, w in bars:
+        if is_bar:
+            draw.rectangle([x, 4, x + w * module - 1, 4 + height - 1], fill=0)
+        x += w * module
+    draw.text(((width - (text_box[2] - text_box[0])) / 2, height + 8), value, fill=0, font=font)
+    out = io.BytesIO()
+    image.convert("1").save(out, format="PNG", optimize=True)
+    return out.getvalue()
+
+
+def _pass_flowables(gp, variant, styles):
+    from reportlab.graphics.barcode.code128 import Code128
+    from reportlab.lib import colors
+    from reportlab.lib.units import mm
+    from reportlab.platypus import Paragraph, Spacer, Table, TableStyle
+    from xml.sax.saxutils import escape
+
+    def text(value, default="—"):
+        return escape(str(value)) if value not in (None, "") else default
+
+    normal, small = styles["Normal"], styles["small"]
+    pass_date = text(gp.get("pass_date"), "")
+    date_approved = text(gp.get("date_approved"))
+    box = lambda flag: "[X]" if flag else "[ ]"
+    barcode = Code128(gp["gp_number"], barWidth=0.33 * mm, barHeight=12 * mm, humanReadable=True)
+    barcode.hAlign = "CENTER"
+    flow = [
+        Paragraph(COMPANY, styles["company"]),
+        Paragraph("GATE PASS", styles["title"]),
+        Paragraph(f"<b>GP CGMI NO.</b> {text(gp['gp_number'])} &nbsp;&nbsp;&nbsp; <b>DATE:</b> {pass_date}", styles["center"]),
+        Spacer(1, 2 * mm),
+        barcode,
+        Spacer(1, 4 * mm),
+        Paragraph(f"This is to authorize <b>{text(gp.get('authorized_name'))}</b>", normal),
+        Paragraph("PRINTED NAME OF DRIVER / HELPERS / CUSTOMER", small),
+        Spacer(1, 2 * mm),
+        Paragraph(
+            f"{box(gp.get('purpose_delivery'))} For Delivery &nbsp;&nbsp; {box(gp.get('purpose_return'))} Return to Supplier "
+            f"&nbsp;&nbsp; {box(gp.get('purpose_inter_warehouse'))} Inter-Warehouse &nbsp;&nbsp; {box(gp.get('purpose_others'))} Others",
+            normal,
+        ),
+        Spacer(1, 2 * mm),
+        Paragraph(
+            f"<b>Vehicle Type:</b> {text(gp.get('vehicle_type'))} &nbsp;&nbsp; <b>Plate No.</b> {text(gp.get('plate_no'))} "
+            f"&nbsp;&nbsp; <b>Attention:</b> {text(gp.get('attention'))}",
+            normal,
+        ),
+        Spacer(1, 3 * mm),
+    ]
+    rows = [["ITEM CODE", "ITEM DESCRIPTION", "QTY.", "REF. DOCS/OR No.", "DESTINATION"]]
+    for it in gp.get("items") or []:
+        rows.append([
+            Paragraph(text(it.get("item_code"), ""), small), Paragraph(text(it.get("item_description"), ""), small),
+            str(it.get("qty", "")), Paragraph(text(it.get("ref_doc_no"), ""), small), Paragraph(text(it.get("destination"), ""), small),
+        ])
+    table = Table(rows, colWidths=[30 * mm, 62 * mm, 14 * mm, 32 * mm, 42 * mm], repeatRows=1)
+    table.setStyle(TableStyle([
+        ("GRID", (0, 0), (-1, -1), 0.5, colors.black),
+        ("FONTNAME", (0, 0), (-1, 0), "Helvetica-Bold"),
+        ("FONTSIZE", (0, 0), (-1, -1), 8),
+        ("VALIGN", (0, 0), (-1, -1), "TOP"),
+        ("ALIGN", (2, 1), (2, -1), "RIGHT"),
+    ]))
+    flow += [table, Spacer(1, 6 * mm)]
+    signatures = [
+        ("Prepared by:", gp.get("prepared_by"), "Signature Over Printed Name"),
+        ("Checked by:", gp.get("checked_by"), "Signature Over Printed Name (Warehouse)"),
+        ("Recommended by:", gp.get("recommended_by"), "Signature Over Printed Name"),
+        ("Approved by:", gp.get("approved_by"), "Signature Over Printed Name"),
+    ]
+    sig_table = Table(
+        [[Paragraph(f"<b>{label}</b><br/><br/>{text(name, '&nbsp;')}<br/>______________________<br/>{sub}", small)
+          for label, name, sub in signatures]],
+        colWidths=[45 * mm] * 4,
+    )
+    sig_table.setStyle(TableStyle([("VALIGN", (0, 0), (-1, -1), "TOP")]))
+    flow += [
+        sig_table,
+        Spacer(1, 3 * mm),
+        Paragraph(f"Date Prepared: {pass_date} &nbsp;&nbsp; Date Recommended: — &nbsp;&nbsp; Date Approved: {date_approved}", small),
+        Spacer(1, 4 * mm),
+    ]
+    guard = "Signature Over Printed Name — Guard On Duty"
+    times = Table([[
+        Paragraph(f"<b>DEPARTURE</b><br/>Time Out: {text(gp.get('time_out'))}<br/><br/>{guard}", small),
+        Paragraph(f"<b>ARRIVAL</b><br/>Time In: {text(gp.get('time_in'))}<br/><br/>{guard}", small),
+    ]], colWidths=[90 * mm, 90 * mm])
+    times.setStyle(TableStyle([("BOX", (0, 0), (0, 0), 0.5, colors.black), ("BOX", (1, 0), (1, 0), 0.5, colors.black),
+                               ("VALIGN", (0, 0), (-1, -1), "TOP")]))
+    flow.append(times)
+    if variant == "release":
+        tag = Table([[Paragraph(
+            f"<b>RELEASE TAG</b><br/><b>Approved by:</b> {text(gp.get('approved_by'))}<br/>"
+            f"<b>Date Approved:</b> {date_approved}<br/><b>GP Number:</b> {text(gp['gp_number'])}", normal,
+        )]], colWidths=[180 * mm])
+        tag.setStyle(TableStyle([("BOX", (0, 0), (-1, -1), 1.5, colors.black)]))
+        flow += [Spacer(1, 5 * mm), tag]
+    return flow
+
+
+def gate_passes_pdf(passes, variant: str = "form") -> bytes:
+    """One A4 page (more if the items overflow) per gate pass dict, in order."""
+    from reportlab.lib.enums import TA_CENTER
+    from reportlab.lib.pagesizes import A4
+    from reportlab.lib.styles import ParagraphStyle, getSampleStyleSheet
+    from reportlab.lib.units import mm
+    from reportlab.platypus import PageBreak, SimpleDocTemplate
+
+    styles = getSampleStyleSheet()
+    styles.add(ParagraphStyle("company", parent=styles["Title"], fontSize=14, spaceAfter=0))
+    styles.add(ParagraphStyle("center", parent=styles["Normal"], alignment=TA_CENTER))
+    styles.add(ParagraphStyle("small", parent=styles["Normal"], fontSize=8, leading=10))
+    styles["Title"].fontSize = 12
+    out = io.BytesIO()
+    doc = SimpleDocTemplate(out, pagesize=A4, leftMargin=15 * mm, rightMargin=15 * mm, topMargin=12 * mm, bottomMargin=12 * mm,
+                            title="Gate Pass", author=COMPANY)
+    story = []
+    for i, gp in enumerate(passes):
+        if i:
+            story.append(PageBreak())
+        story += _pass_flowables(gp, variant, styles)
+    doc.build(story)
+    return out.getvalue()
+
+
+def merge_pdfs(documents) -> bytes:
+    """Concatenate already rendered PDFs (bytes) into one document."""
+    from pypdf import PdfWriter
+    writer = PdfWriter()
+    for doc in documents:
+        writer.append(io.BytesIO(doc))
+    out = io.BytesIO()
+    writer.write(out)
+    return out.getvalue()
@@ -0,0 +1,65 @@
+"""
+GP number allocation from the per-year gp_sequences table.
+
+Each allocation is a single-row UPDATE using LAST_INSERT_ID(expr), committed on its own
+short transaction, so the row lock is held for one statement instead of the whole
+create_gate_pass transaction and concurrent writers (threads or uvicorn workers) never
+get the same number. A pass that fails after allocation just leaves a gap.
+
+With GP_SEQUENCE_BLOCK_SIZE > 1 each worker process reserves a block of numbers per
+round trip and hands them out from memory; numbers then interleave across workers and
+unused parts of a block are skipped when the process exits.
+"""
+import os
+import asyncio
+from app.async_database import get_db_async
+
+BLOCK_SIZE = max(1, int(os.getenv("GP_SEQUENCE_BLOCK_SIZE", "1")))
+
+_lock = asyncio.Lock()
+_blocks = {}  # year -> [next_seq, last_seq] reserved by this process
+
+
+def format_gp_number(year: int, seq: int) -> str:
+    """Year + at least 4-digit sequence, e.g. 20260001; grows to 202610000 past 9999."""
+    return f"{year}{seq:04d}"
+
+
+async def _reserve(cur, year: int, count: int) -> int:
+    """Advance the year's sequence by count and return the new last_seq."""
+    await cur.execute(
+        "UPDATE gp_sequences SET last_seq = LAST_INSERT_ID(last_seq + %s) WHERE year = %s",
+        (count, year),
+    )
+    if cur.rowcount == 0:
+        # First pass of the year (or first run after upgrading): seed from existing numbers once
+        prefix = str(year)
+        await cur.execute(
+            "SELECT COALESCE(MAX(CAST(SUBSTRING(gp_number, 5) AS UNSIGNED)), 0) AS max_seq "
+            "FROM gate_passes WHERE gp_number LIKE %s AND gp_number REGEXP %s",
+            (f"{prefix}%", f"^{prefix}[0-9]+$"),
+        )
+        await cur.execute(
+            "INSERT IGNORE INTO gp_sequences (year, last_seq) VALUES (%s, %s)",
+            (year, (await cur.fetchone())["max_seq"]),
+        )
+        await cur.execute(
+            "UPDATE gp_sequences SET last_seq = LAST_INSERT_ID(last_seq + %s) WHERE year = %s",
+            (count, year),
+        )
+    await cur.execute("SELECT LAST_INSERT_ID() AS last_seq")
+    return int((await cur.fetchone())["last_seq"])
+
+
+async def next_gp_number(year: int) -> str:
+    """Allocate the next GP number for year. Call outside the caller's own transaction."""
+    async with _lock:
+        block = _blocks.get(year)
+        if block is None or block[0] > block[1]:
+            async with get_db_async() as conn:
+                async with conn.cursor() as cur:
+                    last_seq = await _reserve(cur, year, BLOCK_SIZE)
+            block = _blocks[year] = [last_seq - BLOCK_SIZE + 1, last_seq]
+        seq = block[0]
+        block[0] += 1
+    return format_gp_number(year, seq)
@@ -1,8 +1,18 @@
+import logging
 import os
+import time
+from contextlib import asynccontextmanager
+import anyio.to_thread
 from fastapi import FastAPI
+from fastapi.responses import PlainTextResponse
 from fastapi.middleware.cors import CORSMiddleware
-from app.database import init_db
-from app.routes import auth, users, products, gate_passes
+from starlette.concurrency import run_in_threadpool
+from app.async_database import DB_MODE, close_async_pool, warm_async_pool
+from app import events, gate_pass_print, metrics, product_search
+from app.compression import CompressionMiddleware
+from app.database import DB_BACKEND, close_pool, pool_stats, warm_pool
+from app.migrations import migrate
+from app.routes import auth, users, products, gate_passes, reports
 
 # CORS: default localhost; set BACKEND_CORS_ORIGINS for LAN (e.g. http://192.168.1.100:5173,http://localhost:5173)
 _default_origins = ["http://localhost:5173", "http://127.0.0.1:5173"]
@@ -12,22 +22,82 @@ if _cors_origins:
 else:
     _origins = _default_origins
 
-app = FastAPI(title="Gate Pass API")
+# app.server runs migrations once before starting its workers and sets this to 0 for them
+MIGRATE_ON_STARTUP = os.getenv("MIGRATE_ON_STARTUP", "1") == "1"
+# Open DB connections and fill the caches before taking traffic (0 for faster restarts in development)
+WARM_UP = os.getenv("WARM_UP", "1") == "1"
+# Threads for sync routes and run_in_threadpool (anyio's default is 40)
+THREADPOOL_SIZE = int(os.getenv("THREADPOOL_SIZE", "40"))
+
+logger = logging.getLogger(__name__)
+
+
+async def warm_up():
+    """Open this worker's DB connections and fill its caches so the first requests don't pay for them."""
+    t0 = time.perf_counter()
+    await warm_async_pool()
+    if DB_BACKEND == "sqlite" or DB_MODE == "sync":
+        # With DB_MODE=async the pymysql pool only serves users/auth and opens its connections on demand
+        await run_in_threadpool(warm_pool)
+    for name, warm in (
+        ("scan cache", gate_passes.warm_scan_cache),
+        ("product list", products.warm_catalog_cache),
+        ("product search index", product_search.warm_index),
+        ("bcrypt pool", auth.warm_hash_pool),
+    ):
+        try:
+            await warm()
+        except Exception:
+            logger.exception("Warming the %s failed; continuing with it cold", name)
+    logger.info("Worker %d warmed up in %.0f ms", os.getpid(), (time.perf_counter() - t0) * 1000)
+
+
+@asynccontextmanager
+async def lifespan(app):
+    anyio.to_thread.current_default_thread_limiter().total_tokens = THREADPOOL_SIZE
+    if MIGRATE_ON_STARTUP:
+        await migrate()
+    if WARM_UP:
+        try:
+            await warm_up()
+        except Exception:
+            # The DB may be briefly unreachable; requests open connections on demand
+            logger.exception("Warm-up failed; starting cold")
+    yield
+    await events.close()
+    await close_async_pool()
+    close_pool()
+    auth.shutdown_hash_pool()
+    gate_pass_print.shutdown_render_pool()
+
+
+app = FastAPI(title="Gate Pass API", lifespan=lifespan)
 app.add_middleware(
     CORSMiddleware,
     allow_origins=_origins,
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Next-After-Id", "ETag"],
 )
+# Outermost last: metrics time the whole request, including compression
+app.add_middleware(CompressionMiddleware)
+app.add_middleware(metrics.MetricsMiddleware)
 app.include_router(auth.router)
 app.include_router(users.router)
 app.include_router(products.router)
 app.include_router(gate_passes.router)
+app.include_router(reports.router)
+
+@app.get("/health/db")
+def db_health():
+    """Connection pool metrics: open/idle/in-use connections, waits and cumulative wait time."""
+    return pool_stats()
 
-@app.on_event("startup")
-def startup():
-    init_db()
+@app.get("/metrics", response_class=PlainTextResponse)
+def prometheus_metrics():
+    """Per-worker request latency, DB time and query-count histograms in Prometheus text format."""
+    return PlainTextResponse(metrics.render(), media_type="text/plain; version=0.0.4")
 
 @app.get("/")
 def root():
@@ -0,0 +1,217 @@
+"""
+Per-process request metrics and slow request/query logging.
+
+MetricsMiddleware times each request and keeps latency, DB time and query-count histograms per
+(method, route template, status). Queries are counted by the cursor classes used by get_db and
+get_db_async (TimedDictCursor etc.), which report to the request in progress through a context
+variable. GET /metrics renders everything in the Prometheus text format; each uvicorn worker keeps
+its own numbers, so scrape every worker (or run one) for totals.
+
+Requests slower than SLOW_REQUEST_MS and queries slower than SLOW_QUERY_MS are logged with their SQL.
+A route whose queries-per-request keeps growing with page size (N+1) stands out in
+http_request_queries.
+"""
+import logging
+import os
+import threading
+import time
+from bisect import bisect_left
+from contextvars import ContextVar
+from functools import lru_cache
+from pymysql.cursors import DictCursor, SSDictCursor
+
+SLOW_REQUEST_MS = float(os.getenv("SLOW_REQUEST_MS", "1000"))
+SLOW_QUERY_MS = float(os.getenv("SLOW_QUERY_MS", "200"))
+# Longest SQL text kept in slow-query log lines
+SLOW_QUERY_SQL_CHARS = 2000
+
+logger = logging.getLogger("app.slow")
+
+
+class _RequestStats:
+    __slots__ = ("queries", "db_seconds")
+
+    def __init__(self):
+        self.queries = 0
+        self.db_seconds = 0.0
+
+
+# Mutable per-request stats; copied contexts (threadpool, tasks) share the same object
+_current = ContextVar("request_stats", default=None)
+
+
+class Histogram:
+    """Cumulative-bucket histogram keyed by a label tuple, rendered in Prometheus text format."""
+
+    def __init__(self, name, help_text, label_names, buckets):
+        self.name = name
+        self.help = help_text
+        self.label_names = label_names
+        self.buckets = sorted(buckets)
+        self._series = {}  # labels -> [bucket counts..., sum, count]
+        self._lock = threading.Lock()
+
+    def observe(self, labels, value):
+        i = bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(labels)
+            if series is None:
+                series = self._series[labels] = [0] * (len(self.buckets) + 2)
+            if i < len(self.buckets):
+                series[i] += 1
+            series[-2] += value
+            series[-1] += 1
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} histogram"]
+        with self._lock:
+            snapshot = {labels: list(series) for labels, series in self._series.items()}
+        for labels, series in sorted(snapshot.items()):
+            base = ",".join(f'{n}="{_escape(v)}"' for n, v in zip(self.label_names, labels))
+            cumulative = 0
+            for bound, count in zip(self.buckets, series):
+                cumulative += count
+                lines.append(f'{self.name}_bucket{{{base},le="{bound:g}"}} {cumulative}')
+            lines.append(f'{self.name}_bucket{{{base},le="+Inf"}} {series[-1]}')
+            lines.append(f"{self.name}_sum{{{base}}} {series[-2]:.6f}")
+            lines.append(f"{self.name}_count{{{base}}} {series[-1]}")
+        return lines
+
+
+class Counter:
+    def __init__(self, name, help_text):
+        self.name = name
+        self.help = help_text
+        self.value = 0
+        self._lock = threading.Lock()
+
+    def inc(self, amount=1):
+        with self._lock:
+            self.value += amount
+
+    def render(self):
+        return [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} counter", f"{self.name} {self.value}"]
+
+
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+_LABELS = ("method", "route", "status")
+REQUEST_SECONDS = Histogram(
+    "http_request_duration_seconds", "Request latency until the response is fully sent.", _LABELS,
+    [0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30],
+)
+REQUEST_DB_SECONDS = Histogram(
+    "http_request_db_seconds", "Time spent in database calls per request.", _LABELS,
+    [0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10],
+)
+REQUEST_QUERIES = Histogram(
+    "http_request_queries", "Database statements executed per request.", _LABELS,
+    [0, 1, 2, 3, 5, 10, 20, 50, 100, 500, 1000],
+)
+QUERIES_TOTAL = Counter("db_queries_total", "Database statements executed (including outside requests).")
+SLOW_QUERIES_TOTAL = Counter("db_slow_queries_total", f"Statements slower than SLOW_QUERY_MS ({SLOW_QUERY_MS:g} ms).")
+SLOW_REQUESTS_TOTAL = Counter("http_slow_requests_total", f"Requests slower than SLOW_REQUEST_MS ({SLOW_REQUEST_MS:g} ms).")
+
+
+def record_query(sql, args, seconds):
+    """Called by the timed cursors after each execute()."""
+    QUERIES_TOTAL.inc()
+    stats = _current.get()
+    if stats is not None:
+        stats.queries += 1
+        stats.db_seconds += seconds
+    if seconds * 1000 >= SLOW_QUERY_MS:
+        SLOW_QUERIES_TOTAL.inc()
+        text = " ".join(str(sql).split())[:SLOW_QUERY_SQL_CHARS]
+        logger.warning("Slow query %.1f ms: %s | args=%.200r", seconds * 1000, text, args)
+
+
+class _TimedMixin:
+    # executemany() goes through execute() for every statement it sends, so it is counted too
+    def execute(self, query, args=None):
+        t0 = time.perf_counter()
+        try:
+            return super().execute(query, args)
+        finally:
+            record_query(query, args, time.perf_counter() - t0)
+
+
+class TimedDictCursor(_TimedMixin, DictCursor):
+    """pymysql DictCursor that reports each statement to the metrics."""
+
+
+class TimedSSDictCursor(_TimedMixin, SSDictCursor):
+    """Unbuffered variant; time covers sending the query and the first packet, not the row fetches."""
+
+
+@lru_cache(maxsize=None)
+def async_cursor_classes():
+    """(buffered, unbuffered) aiomysql dict cursor classes with the same timing."""
+    import aiomysql
+
+    class _AsyncTimedMixin:
+        async def execute(self, query, args=None):
+            t0 = time.perf_counter()
+            try:
+                return await super().execute(query, args)
+            finally:
+                record_query(query, args, time.perf_counter() - t0)
+
+    class TimedAsyncDictCursor(_AsyncTimedMixin, aiomysql.DictCursor):
+        pass
+
+    class TimedAsyncSSDictCursor(_AsyncTimedMixin, aiomysql.SSDictCursor):
+        pass
+
+    return TimedAsyncDictCursor, TimedAsyncSSDictCursor
+
+
+class MetricsMiddleware:
+    """ASGI middleware: per-request latency, DB time and query count, plus the slow-request log."""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+        stats = _RequestStats()
+        token = _current.set(stats)
+        status = [500]
+        streaming = [False]
+        t0 = time.perf_counter()
+
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start":
+                status[0] = message["status"]
+                # Event streams stay open by design; they are not slow requests
+                streaming[0] = any(k == b"content-type" and v.startswith(b"text/event-stream") for k, v in message.get("headers", ()))
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            elapsed = time.perf_counter() - t0
+            _current.reset(token)
+            route = scope.get("route")
+            # Route templates (not raw paths) keep label cardinality bounded
+            labels = (scope["method"], getattr(route, "path", "<unmatched>"), str(status[0]))
+            REQUEST_SECONDS.observe(labels, elapsed)
+            REQUEST_DB_SECONDS.observe(labels, stats.db_seconds)
+            REQUEST_QUERIES.observe(labels, stats.queries)
+            if elapsed * 1000 >= SLOW_REQUEST_MS and not streaming[0]:
+                SLOW_REQUESTS_TOTAL.inc()
+                logger.warning(
+                    "Slow request %.1f ms: %s %s -> %s (%d queries, %.1f ms in DB)",
+                    elapsed * 1000, scope["method"], scope["path"], status[0], stats.queries, stats.db_seconds * 1000,
+                )
+
+
+def render():
+    """All metrics in the Prometheus text exposition format."""
+    lines = []
+    for metric in (REQUEST_SECONDS, REQUEST_DB_SECONDS, REQUEST_QUERIES, QUERIES_TOTAL, SLOW_QUERIES_TOTAL, SLOW_REQUESTS_TOTAL):
+        lines.extend(metric.render())
+    return "\n".join(lines) + "\n"
@@ -0,0 +1,192 @@
+"""
+Schema migrations: backend/migrations/NNN_name.sql applied in order and recorded in schema_version.
+
+On startup migrate() costs two queries when the schema is current (the version and a check that a
+user exists, for databases built from init_db.sql). Otherwise it takes a MySQL named
+lock (so several uvicorn workers don't migrate at once), applies the pending files and records
+each version. A database without schema_version (fresh, or migrated by hand before this runner)
+first gets the baseline tables from database.SCHEMA and then every migration; "already exists"
+errors are ignored, so statements a hand-migrated database already has are skipped.
+
+With DB_BACKEND=sqlite the baseline is app.sqlite_database.SCHEMA, which already covers migrations
+up to its SCHEMA_VERSION; a later migration needs a SQLite twin, NNN_name.sqlite.sql, next to it.
+
+New schema changes go in a new numbered file under backend/migrations/. Check or apply by hand:
+
+    cd backend
+    python -m app.migrations            # apply pending migrations
+    python -m app.migrations --status
+"""
+import argparse
+import asyncio
+import logging
+import re
+from pathlib import Path
+from pymysql.err import MySQLError
+from starlette.concurrency import run_in_threadpool
+from app.async_database import close_async_pool, get_db_async
+from app import sqlite_database
+from app.database import DB_BACKEND, SCHEMA
+
+MIGRATIONS_DIR = Path(__file__).resolve().parent.parent / "migrations"
+LOCK_NAME = "gate_pass_schema_migrations"
+LOCK_TIMEOUT = 120
+
+# Table exists, duplicate column, duplicate index name, nothing to drop: the change is already there
+_ALREADY_APPLIED = {1050, 1060, 1061, 1091}
+_NO_SUCH_TABLE = 1146
+
+logger = logging.getLogger(__name__)
+
+
+def _read_statements(path: Path):
+    lines = [ln for ln in path.read_text(encoding="utf-8").splitlines() if not ln.strip().startswith("--")]
+    statements, trigger = [], None
+    for part in "\n".join(lines).split(";"):
+        # A trigger body's statements end in ";" too: keep CREATE TRIGGER ... END together
+        if trigger is not None:
+            trigger.append(part)
+            if part.strip().upper() == "END":
+                statements.append(";".join(trigger).strip())
+                trigger = None
+        elif re.match(r"\s*CREATE\s+TRIGGER\b", part, re.IGNORECASE):
+            trigger = [part]
+        elif part.strip():
+            statements.append(part.strip())
+    # The database comes from MYSQL_DATABASE, not from the file
+    return [s for s in statements if not re.match(r"USE\s", s, re.IGNORECASE)]
+
+
+def load_migrations(directory: Path = MIGRATIONS_DIR, backend: str = None):
+    """[(version, filename, [statements])] sorted by version. Comment lines and USE statements are dropped."""
+    sqlite = (backend or DB_BACKEND) == "sqlite"
+    migrations = []
+    for path in directory.glob("*.sql"):
+        match = re.match(r"(\d+)_", path.name)
+        if not match or path.name.endswith(".sqlite.sql"):
+            continue
+        number = int(match.group(1))
+        if sqlite:
+            twin = path.with_name(path.name[:-len(".sql")] + ".sqlite.sql")
+            if twin.exists():
+                migrations.append((number, twin.name, _read_statements(twin)))
+            elif number <= sqlite_database.SCHEMA_VERSION:
+                # Already part of the SQLite baseline schema
+                migrations.append((number, path.name, []))
+            else:
+                raise RuntimeError(f"Migration {path.name} has no SQLite version ({twin.name})")
+            continue
+        migrations.append((number, path.name, _read_statements(path)))
+    migrations.sort()
+    return migrations
+
+
+async def _current_version(cur):
+    """Highest applied version, or None if schema_version doesn't exist yet."""
+    try:
+        await cur.execute("SELECT MAX(version) AS v FROM schema_version")
+    except MySQLError as e:
+        if e.args and e.args[0] == _NO_SUCH_TABLE:
+            return None
+        raise
+    return (await cur.fetchone())["v"] or 0
+
+
+async def _execute_idempotent(cur, statement):
+    try:
+        await cur.execute(statement)
+    except MySQLError as e:
+        if not (e.args and e.args[0] in _ALREADY_APPLIED):
+            raise
+        logger.info("Skipping already applied statement (%s): %s", e.args[1], statement.splitlines()[0])
+
+
+async def _ensure_default_admin(cur):
+    await cur.execute("SELECT 1 FROM users LIMIT 1")
+    if not await cur.fetchone():
+        from app.routes.auth import hash_password
+        password_hash = await run_in_threadpool(hash_password, "admin123")
+        await cur.execute(
+            # IGNORE: another worker may be creating it at the same time
+            "INSERT IGNORE INTO users (username, password_hash, full_name, role) VALUES (%s, %s, %s, %s)",
+            ("admin", password_hash, "Administrator", "admin"),
+        )
+
+
+async def _apply_pending(conn, cur, migrations):
+    applied = []
+    version = await _current_version(cur)
+    if version is None:
+        for statement in (sqlite_database.SCHEMA if DB_BACKEND == "sqlite" else SCHEMA):
+            await cur.execute(statement)
+        await cur.execute(
+            "CREATE TABLE IF NOT EXISTS schema_version ("
+            "version INT PRIMARY KEY, name VARCHAR(255) NOT NULL, applied_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP)"
+        )
+        version = 0
+    for number, name, statements in migrations:
+        if number <= version:
+            continue
+        logger.info("Applying migration %s", name)
+        for statement in statements:
+            await _execute_idempotent(cur, statement)
+        # MySQL commits DDL implicitly; record each version as soon as it is done
+        await cur.execute("INSERT INTO schema_version (version, name) VALUES (%s, %s)", (number, name))
+        await conn.commit()
+        applied.append(name)
+    if applied:
+        await _ensure_default_admin(cur)
+    return applied
+
+
+async def migrate(migrations=None):
+    """Apply pending migrations; returns the applied filenames (empty when the schema was current)."""
+    migrations = load_migrations() if migrations is None else migrations
+    latest = migrations[-1][0] if migrations else 0
+    async with get_db_async() as conn:
+        async with conn.cursor() as cur:
+            version = await _current_version(cur)
+            if version is not None and version >= latest:
+                # A schema built from init_db.sql is current but has no users yet
+                await _ensure_default_admin(cur)
+                return []
+            await cur.execute("SELECT GET_LOCK(%s, %s) AS locked", (LOCK_NAME, LOCK_TIMEOUT))
+            if not (await cur.fetchone())["locked"]:
+                raise RuntimeError(f"Timed out waiting for the {LOCK_NAME} lock held by another migrator")
+            try:
+                # Re-read under the lock: another worker may have just finished
+                return await _apply_pending(conn, cur, migrations)
+            finally:
+                await cur.execute("SELECT RELEASE_LOCK(%s)", (LOCK_NAME,))
+
+
+async def status():
+    """[(version, filename, applied)] for every migration file."""
+    async with get_db_async() as conn:
+        async with conn.cursor() as cur:
+            version = await _current_version(cur) or 0
+    return [(number, name, number <= version) for number, name, _ in load_migrations()]
+
+
+def main():
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
+    parser = argparse.ArgumentParser(description="Apply schema migrations from backend/migrations")
+    parser.add_argument("--status", action="store_true", help="list migrations and whether they are applied")
+    args = parser.parse_args()
+
+    async def run():
+        try:
+            if args.status:
+                for number, name, applied in await status():
+                    print(f"{'applied' if applied else 'pending':<8} {name}")
+            else:
+                applied = await migrate()
+                print(f"applied {len(applied)} migration(s)" if applied else "schema is current")
+        finally:
+            await close_async_pool()
+
+    asyncio.run(run())
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,263 @@
+"""
+Typeahead search over the product catalog.
+
+ProductIndex keeps two sorted arrays per worker: lowercased item codes and lowercased description
+words. A query matches products whose code starts with it, or whose description has a word starting
+with every query token. Lookups are binary searches, so they stay sub-millisecond on large catalogs.
+This worker's own product writes are applied to the index as deltas (apply_changes); it is rebuilt
+from the DB only on cold start or when the "products" cache version moved past it some other way
+(another worker's write, see app.cache_versions). Searches during a rebuild use the previous index.
+
+Set PRODUCT_SEARCH_INDEX=mysql to skip the in-memory index and query MySQL directly
+(item_code prefix via its unique index, item_description via the FULLTEXT index).
+"""
+import os
+import re
+import asyncio
+from bisect import bisect_left, bisect_right
+from starlette.concurrency import run_in_threadpool
+from app import cache_versions
+from app.async_database import get_db_async
+
+SEARCH_BACKEND = os.getenv("PRODUCT_SEARCH_INDEX", "memory").strip().lower()
+# InnoDB ignores shorter FULLTEXT tokens by default (innodb_ft_min_token_size)
+FULLTEXT_MIN_TOKEN = 3
+# Changes up to this many products are applied to the index in place; larger batches (imports) are
+# merged into a copy in the threadpool while searches keep using the current one
+DELTA_INLINE_MAX = 50
+
+_TOKEN_RE = re.compile(r"\w+", re.UNICODE)
+
+
+def _tokens(text):
+    return _TOKEN_RE.findall((text or "").lower())
+
+
+def _row_text(row):
+    # " word1 word2 ..." per row, so a token prefix check is a substring test for " " + token
+    return " " + " ".join(_tokens(row[2]))
+
+
+def _spliced(keys, rows, remove, insert):
+    """Copies of the parallel sorted arrays without the positions in remove, with (pos, key, row) entries inserted before pos."""
+    out_keys, out_rows, prev = [], [], 0
+    for pos, kind, key, row in sorted([(p, 0, k, r) for p, k, r in insert] + [(p, 1, None, None) for p in remove]):
+        out_keys += keys[prev:pos]
+        out_rows += rows[prev:pos]
+        if kind:
+            prev = pos + 1
+        else:
+            prev = pos
+            out_keys.append(key)
+            out_rows.append(row)
+    out_keys += keys[prev:]
+    out_rows += rows[prev:]
+    return out_keys, out_rows
+
+
+class ProductIndex:
+    """Sorted-array prefix index over (id, item_code, item_description, item_group) tuples."""
+
+    def __init__(self, rows):
+        self.rows = list(rows)  # None where a product was deleted
+        self._pos = {r[0]: i for i, r in enumerate(self.rows)}
+        self._row_text = [_row_text(r) for r in self.rows]
+        codes = sorted(((r[1] or "").lower(), i) for i, r in enumerate(self.rows))
+        words = sorted((w, i) for i, text in enumerate(self._row_text) for w in set(text.split()))
+        self._code_keys = [c for c, _ in codes]
+        self._code_rows = [i for _, i in codes]
+        self._word_keys = [w for w, _ in words]
+        self._word_rows = [i for _, i in words]
+
+    def _entries(self, i):
+        """("code" or "word", key) for every sorted-array entry of row i."""
+        yield "code", (self.rows[i][1] or "").lower()
+        for w in set(self._row_text[i].split()):
+            yield "word", w
+
+    def _arrays(self, name):
+        return (self._code_keys, self._code_rows) if name == "code" else (self._word_keys, self._word_rows)
+
+    @staticmethod
+    def _entry_pos(keys, rows, key, i):
+        # Entries are sorted by (key, row), so within the run of equal keys the rows are ascending
+        return bisect_left(rows, i, bisect_left(keys, key), bisect_right(keys, key))
+
+    def _stage(self, upserts, deleted):
+        """Update rows for the changes; returns (rows whose old entries go, rows whose new entries come)."""
+        dropped, added = set(), set()
+        for product_id in deleted:
+            i = self._pos.pop(product_id, None)
+            if i is not None:
+                dropped.add(i)
+                self.rows[i], self._row_text[i] = None, ""
+        for row in upserts:
+            i = self._pos.get(row[0])
+            if i is None:
+                i = self._pos[row[0]] = len(self.rows)
+                self.rows.append(None)
+                self._row_text.append("")
+            else:
+                dropped.add(i)
+            self.rows[i], self._row_text[i] = row, _row_text(row)
+            added.add(i)
+        return dropped, added
+
+    def apply(self, upserts, deleted):
+        """Apply changed rows and deleted product ids in place; each entry is one list insert or delete."""
+        for i in {self._pos[p] for p in deleted if p in self._pos} | {self._pos[r[0]] for r in upserts if r[0] in self._pos}:
+            if self.rows[i] is not None:
+                for name, key in self._entries(i):
+                    keys, rows = self._arrays(name)
+                    pos = self._entry_pos(keys, rows, key, i)
+                    del keys[pos], rows[pos]
+        _, added = self._stage(upserts, deleted)
+        for i in added:
+            for name, key in self._entries(i):
+                keys, rows = self._arrays(name)
+                pos = self._entry_pos(keys, rows, key, i)
+                keys.insert(pos, key)
+                rows.insert(pos, i)
+
+    def merged(self, upserts, deleted):
+        """Copy with the changes applied; the sorted arrays are rebuilt from slices, never re-sorted."""
+        new = ProductIndex.__new__(ProductIndex)
+        new.rows, new._row_text, new._pos = list(self.rows), list(self._row_text), dict(self._pos)
+        dropped, added = new._stage(upserts, deleted)
+        # Positions in this index's arrays: old entries of changed rows to drop, new entries to insert before
+        remove, insert = {"code": [], "word": []}, {"code": [], "word": []}
+        for i in dropped:
+            for name, key in self._entries(i):
+                remove[name].append(self._entry_pos(*self._arrays(name), key, i))
+        for i in added:
+            for name, key in new._entries(i):
+                insert[name].append((self._entry_pos(*self._arrays(name), key, i), key, i))
+        codes = _spliced(self._code_keys, self._code_rows, remove["code"], insert["code"])
+        words = _spliced(self._word_keys, self._word_rows, remove["word"], insert["word"])
+        (new._code_keys, new._code_rows), (new._word_keys, new._word_rows) = codes, words
+        return new
+
+    @staticmethod
+    def _prefix_range(keys, prefix):
+        start = bisect_left(keys, prefix)
+        end = bisect_left(keys, prefix + "\uffff", start)
+        return start, end
+
+    def search(self, q, limit):
+        q = (q or "").strip().lower()
+        if not q:
+            return []
+        seen = set()
+        result = []
+        start, end = self._prefix_range(self._code_keys, q)
+        for pos in range(start, min(end, start + limit)):
+            i = self._code_rows[pos]
+            seen.add(i)
+            result.append(self.rows[i])
+        tokens = _tokens(q)
+        if len(result) >= limit or not tokens:
+            return result
+        # Drive from the most selective token, then check the rest against each candidate's words
+        ranges = {t: self._prefix_range(self._word_keys, t) for t in tokens}
+        ranked = sorted(ranges, key=lambda t: ranges[t][1] - ranges[t][0])
+        start, end = ranges[ranked[0]]
+        rest = [" " + t for t in ranked[1:]]
+        for pos in range(start, end):
+            i = self._word_rows[pos]
+            if i in seen:
+                continue
+            if rest and not all(t in self._row_text[i] for t in rest):
+                continue
+            seen.add(i)
+            result.append(self.rows[i])
+            if len(result) >= limit:
+                break
+        return result
+
+
+_index_lock = asyncio.Lock()
+_index = None  # (version, ProductIndex)
+
+
+async def _get_index():
+    global _index
+    version = await cache_versions.current("products")
+    cached = _index
+    if cached and (cached[0] >= version or _index_lock.locked()):
+        # Current, or a rebuild/merge is under way: answer from the index we have meanwhile
+        return cached[1]
+    async with _index_lock:
+        if _index and _index[0] >= version:
+            return _index[1]
+        async with get_db_async() as conn:
+            async with conn.cursor() as cur:
+                await cur.execute("SELECT id, item_code, item_description, item_group FROM products")
+                rows = [(r["id"], r["item_code"], r["item_description"], r.get("item_group")) for r in await cur.fetchall()]
+        # Sorting a large catalog takes a while; keep it off the event loop
+        index = await run_in_threadpool(ProductIndex, rows)
+        _index = (version, index)
+        return index
+
+
+async def apply_changes(version, upserts=(), deleted=()):
+    """
+    Apply one committed product write to this worker's index: version is what cache_versions.bump returned
+    for it, upserts the written (id, item_code, item_description, item_group) rows, deleted the removed ids.
+    Versions are gap-free and commit-ordered, so this is exact when the index is at version - 1; otherwise
+    it is skipped and the next search rebuilds.
+    """
+    global _index
+    if SEARCH_BACKEND != "memory" or not _index or _index[0] != version - 1:
+        return
+    async with _index_lock:
+        if not _index or _index[0] != version - 1:
+            return
+        index = _index[1]
+        if len(upserts) + len(deleted) <= DELTA_INLINE_MAX:
+            index.apply(upserts, deleted)
+        else:
+            index = await run_in_threadpool(index.merged, upserts, deleted)
+        _index = (version, index)
+
+
+async def _search_mysql(q, limit):
+    q = q.strip()
+    like = q.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+    async with get_db_async() as conn:
+        async with conn.cursor() as cur:
+            await cur.execute(
+                "SELECT id, item_code, item_description, item_group FROM products WHERE item_code LIKE %s ORDER BY item_code LIMIT %s",
+                (like + "%", limit),
+            )
+            rows = list(await cur.fetchall())
+            if len(rows) < limit:
+                tokens = _tokens(q)
+                exclude = [r["id"] for r in rows] or [0]
+                placeholders = ", ".join(["%s"] * len(exclude))
+                if tokens and all(len(t) >= FULLTEXT_MIN_TOKEN for t in tokens):
+                    await cur.execute(
+                        "SELECT id, item_code, item_description, item_group FROM products "
+                        f"WHERE MATCH(item_description) AGAINST (%s IN BOOLEAN MODE) AND id NOT IN ({placeholders}) LIMIT %s",
+                        (" ".join(f"+{t}*" for t in tokens), *exclude, limit - len(rows)),
+                    )
+                else:
+                    await cur.execute(
+                        "SELECT id, item_code, item_description, item_group FROM products "
+                        f"WHERE item_description LIKE %s AND id NOT IN ({placeholders}) LIMIT %s",
+                        ("%" + like + "%", *exclude, limit - len(rows)),
+                    )
+                rows.extend(await cur.fetchall())
+    return [(r["id"], r["item_code"], r["item_description"], r.get("item_group")) for r in rows]
+
+
+async def warm_index():
+    """Build the in-memory index ahead of the first search (called on startup); no-op for the mysql backend."""
+    if SEARCH_BACKEND == "memory":
+        await _get_index()
+
+
+async def search_products(q: str, limit: int):
+    """Returns up to limit (id, item_code, item_description, item_group) tuples; code-prefix matches first."""
+    if SEARCH_BACKEND == "mysql":
+        return await _search_mysql(q, limit)
+    return (await _get_index()).search(q, limit)
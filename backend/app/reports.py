@@ -0,0 +1,134 @@
+"""
+Daily rollups behind the /reports endpoints.
+
+report_daily_passes counts passes per (pass_date, status, in_or_out); report_daily_items and
+report_daily_destinations sum item qty and line count per (pass_date, status, item_code / destination).
+create_gate_pass and the status updates call record() / record_many() inside their own transaction, so the
+rollups commit together with the pass. Item groups are not stored; reports join the current
+products table, so regrouping a product applies to past days too.
+
+Backfill or repair with:
+
+    cd backend
+    python -m app.reports rebuild [--from 2026-01-01] [--to 2026-12-31]
+"""
+import argparse
+from datetime import date
+from app.database import get_db
+
+
+# Blank counts as the default, like NULLIF(TRIM(...), '') in the rebuild SQL
+def _status(value):
+    return (value or "").strip().lower() or "pending"
+
+
+def _in_or_out(value):
+    return (value or "").strip().lower() or "out"
+
+
+def _add(totals, key, values):
+    entry = totals.setdefault(key, [0] * len(values))
+    for i, v in enumerate(values):
+        entry[i] += v
+
+
+async def _upsert(cur, table, key_columns, value_columns, deltas):
+    """Add deltas {key tuple: value list} to table. Keys are applied sorted so concurrent writers lock rows in the same order."""
+    rows = [(*key, *values) for key, values in sorted(deltas.items()) if any(values)]
+    if not rows:
+        return
+    columns = key_columns + value_columns
+    await cur.execute(
+        f"INSERT INTO {table} ({', '.join(columns)}) VALUES "
+        + ", ".join(["(" + ", ".join(["%s"] * len(columns)) + ")"] * len(rows))
+        + " AS new ON DUPLICATE KEY UPDATE " + ", ".join(f"{c} = {c} + new.{c}" for c in value_columns),
+        tuple(v for row in rows for v in row),
+    )
+
+
+async def record(cur, gp, items, old_status=None):
+    """
+    Count gate pass gp (a gate_passes row with its current status) and its item rows in the rollups.
+    For a status change pass old_status; the pass then moves from that status to the current one.
+    """
+    await record_many(cur, [(gp, items, old_status)])
+
+
+async def record_many(cur, changes):
+    """record() for many (gp, items, old_status) at once: the deltas are summed and written in one upsert per table."""
+    passes, by_item, by_destination = {}, {}, {}
+    for gp, items, old_status in changes:
+        moves = [(_status(gp.get("status")), 1)]
+        if old_status is not None:
+            if _status(old_status) == moves[0][0]:
+                continue
+            moves.append((_status(old_status), -1))
+        day, direction = gp["pass_date"], _in_or_out(gp.get("in_or_out"))
+        for status, sign in moves:
+            _add(passes, (day, status, direction), (sign,))
+            for it in items:
+                qty = (sign * it["qty"], sign)
+                _add(by_item, (day, status, it.get("item_code") or ""), qty)
+                _add(by_destination, (day, status, it.get("destination") or ""), qty)
+    await _upsert(cur, "report_daily_passes", ["pass_date", "status", "in_or_out"], ["passes"], passes)
+    await _upsert(cur, "report_daily_items", ["pass_date", "status", "item_code"], ["qty", "line_count"], by_item)
+    await _upsert(cur, "report_daily_destinations", ["pass_date", "status", "destination"], ["qty", "line_count"], by_destination)
+
+
+_STATUS_SQL = "LOWER(COALESCE(NULLIF(TRIM(g.status), ''), 'pending'))"
+_REBUILD = {
+    "report_daily_passes": (
+        "INSERT INTO report_daily_passes (pass_date, status, in_or_out, passes) "
+        f"SELECT g.pass_date, {_STATUS_SQL}, LOWER(COALESCE(NULLIF(TRIM(g.in_or_out), ''), 'out')), COUNT(*) "
+        "FROM gate_passes g{where} GROUP BY 1, 2, 3"
+    ),
+    "report_daily_items": (
+        "INSERT INTO report_daily_items (pass_date, status, item_code, qty, line_count) "
+        f"SELECT g.pass_date, {_STATUS_SQL}, COALESCE(i.item_code, ''), SUM(i.qty), COUNT(*) "
+        "FROM gate_pass_items i JOIN gate_passes g ON g.id = i.gate_pass_id{where} GROUP BY 1, 2, 3"
+    ),
+    "report_daily_destinations": (
+        "INSERT INTO report_daily_destinations (pass_date, status, destination, qty, line_count) "
+        f"SELECT g.pass_date, {_STATUS_SQL}, COALESCE(i.destination, ''), SUM(i.qty), COUNT(*) "
+        "FROM gate_pass_items i JOIN gate_passes g ON g.id = i.gate_pass_id{where} GROUP BY 1, 2, 3"
+    ),
+}
+
+
+def rebuild(date_from: date = None, date_to: date = None):
+    """
+    Recompute the rollups for pass_date in [date_from, date_to] (all dates if omitted) from the base tables,
+    in one transaction. INSERT ... SELECT locks the rows it reads, so passes written meanwhile wait for it.
+    """
+    where, params = [], []
+    if date_from:
+        where.append("pass_date >= %s")
+        params.append(date_from)
+    if date_to:
+        where.append("pass_date <= %s")
+        params.append(date_to)
+    delete_where = (" WHERE " + " AND ".join(where)) if where else ""
+    select_where = (" WHERE " + " AND ".join("g." + w for w in where)) if where else ""
+    counts = {}
+    with get_db() as conn:
+        with conn.cursor() as cur:
+            for table, insert_sql in _REBUILD.items():
+                cur.execute(f"DELETE FROM {table}{delete_where}", tuple(params))
+                cur.execute(insert_sql.format(where=select_where), tuple(params))
+                counts[table] = cur.rowcount
+    return counts
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Daily report rollups")
+    sub = parser.add_subparsers(dest="command", required=True)
+    p = sub.add_parser("rebuild", help="recompute rollups from gate_passes and gate_pass_items")
+    p.add_argument("--from", dest="date_from", type=date.fromisoformat, help="first pass_date (YYYY-MM-DD)")
+    p.add_argument("--to", dest="date_to", type=date.fromisoformat, help="last pass_date (YYYY-MM-DD)")
+    args = parser.parse_args()
+    for table, rows in rebuild(args.date_from, args.date_to).items():
+        print(f"{table}: {rows} rows")
+
+
+if __name__ == "__main__":
+    main()
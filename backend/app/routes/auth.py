@@ -1,31 +1,119 @@
+import asyncio
+import os
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
 import bcrypt
 from datetime import datetime, timedelta
 from fastapi import APIRouter, HTTPException, Request
 from fastapi.responses import Response
 from jose import JWTError, jwt
+from starlette.concurrency import run_in_threadpool
 from app.database import get_db
 from app.schemas import LoginRequest, TokenResponse, UserResponse
+from app.ttl_cache import TTLCache
 
 SECRET_KEY = "your-secret-key-change-in-production"
 ALGORITHM = "HS256"
 ACCESS_TOKEN_EXPIRE_MINUTES = 60 * 24
 
+# bcrypt cost factor; existing hashes with a different cost are rehashed on next successful login
+BCRYPT_ROUNDS = int(os.getenv("BCRYPT_ROUNDS", "12"))
+# Processes for bcrypt work (0 = hash inline in the calling thread)
+BCRYPT_WORKERS = int(os.getenv("BCRYPT_WORKERS", str(min(4, os.cpu_count() or 1))))
+# Login attempts allowed per window, per username and per client IP. Counted per worker process, so with
+# N workers up to N times these get through; set LOGIN_RATE_PER_IP for clients behind one NAT or proxy
+LOGIN_RATE_WINDOW = int(os.getenv("LOGIN_RATE_WINDOW", "60"))
+LOGIN_RATE_PER_USERNAME = int(os.getenv("LOGIN_RATE_PER_USERNAME", "10"))
+LOGIN_RATE_PER_IP = int(os.getenv("LOGIN_RATE_PER_IP", "60"))
+
 router = APIRouter(prefix="/auth", tags=["auth"])
 
-def hash_password(password: str) -> str:
-    """Bcrypt hash; input truncated to 72 bytes (bcrypt limit)."""
-    pw = (password or "")[:72].encode("utf-8")
-    return bcrypt.hashpw(pw, bcrypt.gensalt()).decode("utf-8")
+_pool_lock = threading.Lock()
+_hash_pool = None
 
-def verify_password(password: str, hashed: str) -> bool:
-    """Verify password against bcrypt hash."""
-    if not hashed:
-        return False
+def _get_hash_pool():
+    """Per-process bcrypt worker pool, created on first use (so each uvicorn worker gets its own)."""
+    global _hash_pool
+    if _hash_pool is None and BCRYPT_WORKERS > 0:
+        with _pool_lock:
+            if _hash_pool is None:
+                _hash_pool = ProcessPoolExecutor(max_workers=BCRYPT_WORKERS)
+    return _hash_pool
+
+async def warm_hash_pool():
+    """Start the bcrypt worker processes ahead of the first login (called on startup)."""
+    pool = _get_hash_pool()
+    if pool is not None:
+        await asyncio.gather(*(asyncio.wrap_future(pool.submit(int)) for _ in range(BCRYPT_WORKERS)))
+
+def shutdown_hash_pool():
+    global _hash_pool
+    with _pool_lock:
+        if _hash_pool is not None:
+            _hash_pool.shutdown(wait=False, cancel_futures=True)
+            _hash_pool = None
+
+def _hashpw(pw: bytes, rounds: int) -> str:
+    return bcrypt.hashpw(pw, bcrypt.gensalt(rounds)).decode("utf-8")
+
+def _checkpw(pw: bytes, hashed: bytes) -> bool:
     try:
-        return bcrypt.checkpw((password or "").encode("utf-8"), hashed.encode("utf-8"))
+        return bcrypt.checkpw(pw, hashed)
     except Exception:
         return False
 
+def _password_bytes(password: str) -> bytes:
+    """Input truncated to 72 bytes (bcrypt limit)."""
+    return (password or "")[:72].encode("utf-8")
+
+async def _run_hash(fn, *args):
+    """Await bcrypt work without holding a request threadpool thread."""
+    pool = _get_hash_pool()
+    if pool is None:
+        return await run_in_threadpool(fn, *args)
+    return await asyncio.get_running_loop().run_in_executor(pool, fn, *args)
+
+async def hash_password_async(password: str) -> str:
+    """Bcrypt hash at BCRYPT_ROUNDS, awaited from the bcrypt process pool (for request handlers)."""
+    return await _run_hash(_hashpw, _password_bytes(password), BCRYPT_ROUNDS)
+
+def hash_password(password: str) -> str:
+    """Blocking hash_password_async for scripts (datagen) and migrations; waits for the process pool."""
+    pool = _get_hash_pool()
+    if pool is None:
+        return _hashpw(_password_bytes(password), BCRYPT_ROUNDS)
+    return pool.submit(_hashpw, _password_bytes(password), BCRYPT_ROUNDS).result()
+
+def _needs_rehash(hashed: str) -> bool:
+    try:
+        return int(hashed.split("$")[2]) != BCRYPT_ROUNDS
+    except (IndexError, ValueError):
+        return False
+
+class RateLimiter:
+    """Fixed-window attempt counter per key, bounded in memory."""
+
+    def __init__(self, limit: int, window: int, maxsize: int = 10000):
+        self.limit = limit
+        self.window = window
+        self._counts = TTLCache(maxsize=maxsize, ttl=window)
+        self._lock = threading.Lock()
+
+    def hit(self, key) -> int:
+        """Record an attempt; returns seconds until retry is allowed, or 0 if within the limit."""
+        now = time.time()
+        bucket = int(now // self.window)
+        with self._lock:
+            count = self._counts.get((key, bucket), 0) + 1
+            self._counts.set((key, bucket), count)
+        if count > self.limit:
+            return int((bucket + 1) * self.window - now) + 1
+        return 0
+
+_username_limiter = RateLimiter(LOGIN_RATE_PER_USERNAME, LOGIN_RATE_WINDOW)
+_ip_limiter = RateLimiter(LOGIN_RATE_PER_IP, LOGIN_RATE_WINDOW)
+
 def create_access_token(data: dict):
     to_encode = data.copy()
     expire = datetime.utcnow() + timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES)
@@ -53,14 +141,33 @@ def login_options(request: Request):
         },
     )
 
-@router.post("/login", response_model=TokenResponse)
-def login(req: LoginRequest):
+def _fetch_login_row(username: str):
     with get_db() as conn:
         with conn.cursor() as cur:
-            cur.execute("SELECT id, username, password_hash, full_name, role FROM users WHERE username = %s", (req.username,))
-            row = cur.fetchone()
-    if not row or not verify_password(req.password, row["password_hash"]):
+            cur.execute("SELECT id, username, password_hash, full_name, role FROM users WHERE username = %s", (username,))
+            return cur.fetchone()
+
+def _store_rehash(user_id: int, old_hash: str, new_hash: str):
+    with get_db() as conn:
+        with conn.cursor() as cur:
+            # Only replace the hash we verified, in case the password changed meanwhile
+            cur.execute("UPDATE users SET password_hash = %s WHERE id = %s AND password_hash = %s", (new_hash, user_id, old_hash))
+
+@router.post("/login", response_model=TokenResponse)
+async def login(req: LoginRequest, request: Request):
+    """Async so bcrypt runs in the process pool without tying up a threadpool thread; DB calls use the threadpool."""
+    client_ip = request.client.host if request.client else "unknown"
+    retry_after = max(_ip_limiter.hit(client_ip), _username_limiter.hit((req.username or "").lower()))
+    if retry_after:
+        raise HTTPException(status_code=429, detail="Too many login attempts. Try again later.", headers={"Retry-After": str(retry_after)})
+    row = await run_in_threadpool(_fetch_login_row, req.username)
+    if not row or not row["password_hash"]:
+        raise HTTPException(status_code=401, detail="Invalid username or password")
+    if not await _run_hash(_checkpw, _password_bytes(req.password), row["password_hash"].encode("utf-8")):
         raise HTTPException(status_code=401, detail="Invalid username or password")
+    if _needs_rehash(row["password_hash"]):
+        new_hash = await _run_hash(_hashpw, _password_bytes(req.password), BCRYPT_ROUNDS)
+        await run_in_threadpool(_store_rehash, row["id"], row["password_hash"], new_hash)
     role = row["role"] or "admin"
     user = UserResponse(id=row["id"], username=row["username"], full_name=row["full_name"], role=role)
     token = create_access_token({"sub": str(row["id"]), "username": row["username"], "role": role})
@@ -1,87 +1,519 @@
-from fastapi import APIRouter, Header, HTTPException
-from app.database import get_db
-from app.schemas import GatePassCreate, GatePassResponse, GatePassItemResponse, GatePassStatusUpdate
-from app.routes.users import get_current_user_id
+import asyncio
+import base64
+import csv
+import hashlib
+import io
+import os
+from datetime import date
+from typing import List, Literal, Optional
+from fastapi import APIRouter, Depends, Header, HTTPException, Query, Request
+from fastapi.responses import Response, StreamingResponse
+from starlette.concurrency import run_in_threadpool
+import orjson
+from app import cache_versions, events, gate_pass_print, reports
+from app.async_database import get_db_async, unbuffered_cursor
+from app.gp_sequence import next_gp_number
+from app.schemas import (
+    GatePassCreate, GatePassResponse, GatePassItemResponse, GatePassPrintBatch, GatePassScanResponse, GatePassStatusBatch,
+    GatePassStatusOutcome, GatePassStatusUpdate,
+)
+from app.ttl_cache import TTLCache
+from app.routes.users import get_current_user_id, resolve_user
 
 router = APIRouter(prefix="/gate-passes", tags=["gate-passes"])
 
+# Max gate pass ids per batched item query (keeps the IN list well under max_allowed_packet)
+ITEM_BATCH_SIZE = 1000
+# Page size of the list endpoint when ?limit= is omitted, and its upper bound
+DEFAULT_PAGE_SIZE = 100
+MAX_PAGE_SIZE = 500
+# Longer pages are built and encoded in the threadpool so they don't stall the event loop
+LIST_INLINE_ROWS = 200
+# Scanner lookups by GP number: recent/today's passes kept per worker
+SCAN_CACHE_SIZE = int(os.getenv("SCAN_CACHE_SIZE", "5000"))
+_scan_cache = TTLCache(maxsize=SCAN_CACHE_SIZE, ttl=float(os.getenv("SCAN_CACHE_TTL", "3600")))
+# gp_number -> (change_version, response). Passes changed up to gate_passes version _scan_synced have been evicted
+_scan_synced = 0
+_scan_sync_lock = asyncio.Lock()
+# /export: rows per fetch from the server-side cursor, and bytes buffered per streamed chunk
+EXPORT_FETCH_SIZE = 500
+EXPORT_CHUNK_BYTES = 64 * 1024
+_EXPORT_PASS_FIELDS = [f for f in GatePassResponse.model_fields if f != "items"]
+_EXPORT_ITEM_FIELDS = list(GatePassItemResponse.model_fields)
+# Rendered PDFs/barcodes per worker: key -> (content hash, bytes); a hash mismatch means the pass changed
+_print_cache = TTLCache(maxsize=int(os.getenv("PRINT_CACHE_SIZE", "1000")), ttl=float(os.getenv("PRINT_CACHE_TTL", "86400")))
+PRINT_VARIANTS = ("form", "release")
+# /sync: passes per page
+SYNC_PAGE_SIZE = 1000
+SYNC_MAX_PAGE_SIZE = 5000
+_SYNC_PASS_FIELDS = [f for f in GatePassScanResponse.model_fields if f != "items"]
+_SYNC_ITEM_FIELDS = [f for f in GatePassItemResponse.model_fields if f != "id"]
+
+def _row_to_dict(gp_row, items_rows):
+    """GatePassResponse-shaped dict straight from DB rows, without building models."""
+    return {
+        "id": gp_row["id"],
+        "gp_number": gp_row["gp_number"],
+        "pass_date": gp_row["pass_date"],
+        "authorized_name": gp_row["authorized_name"],
+        "in_or_out": gp_row["in_or_out"] or "out",
+        "purpose_delivery": bool(gp_row["purpose_delivery"]),
+        "purpose_return": bool(gp_row["purpose_return"]),
+        "purpose_inter_warehouse": bool(gp_row["purpose_inter_warehouse"]),
+        "purpose_others": bool(gp_row["purpose_others"]),
+        "vehicle_type": gp_row["vehicle_type"],
+        "plate_no": gp_row["plate_no"],
+        "attention": gp_row["attention"],
+        "prepared_by": gp_row["prepared_by"],
+        "checked_by": gp_row["checked_by"],
+        "recommended_by": gp_row["recommended_by"],
+        "approved_by": gp_row["approved_by"],
+        "time_out": gp_row["time_out"],
+        "time_in": gp_row["time_in"],
+        "status": gp_row["status"],
+        "rejected_remarks": gp_row["rejected_remarks"],
+        "date_approved": gp_row["date_approved"],
+        "items": [{"id": r["id"], "item_code": r["item_code"], "item_description": r["item_description"],
+                   "qty": r["qty"], "ref_doc_no": r["ref_doc_no"], "destination": r["destination"]}
+                  for r in items_rows],
+    }
+
 def _row_to_response(gp_row, items_rows):
-    return GatePassResponse(
-        id=gp_row["id"],
-        gp_number=gp_row["gp_number"],
-        pass_date=gp_row["pass_date"],
-        authorized_name=gp_row["authorized_name"],
-        in_or_out=gp_row.get("in_or_out") or "out",
-        purpose_delivery=bool(gp_row["purpose_delivery"]),
-        purpose_return=bool(gp_row["purpose_return"]),
-        purpose_inter_warehouse=bool(gp_row["purpose_inter_warehouse"]),
-        purpose_others=bool(gp_row["purpose_others"]),
-        vehicle_type=gp_row["vehicle_type"],
-        plate_no=gp_row["plate_no"],
-        attention=gp_row.get("attention"),
-        prepared_by=gp_row["prepared_by"],
-        checked_by=gp_row["checked_by"],
-        recommended_by=gp_row["recommended_by"],
-        approved_by=gp_row["approved_by"],
-        time_out=gp_row["time_out"],
-        time_in=gp_row["time_in"],
-        status=gp_row.get("status"),
-        rejected_remarks=gp_row.get("rejected_remarks"),
-        date_approved=gp_row.get("date_approved"),
-        items=[GatePassItemResponse(id=r["id"], item_code=r["item_code"], item_description=r["item_description"],
-                                    qty=r["qty"], ref_doc_no=r["ref_doc_no"], destination=r["destination"])
-               for r in items_rows]
-    )
+    return GatePassResponse.model_validate(_row_to_dict(gp_row, items_rows))
+
+def _event_pass(gp, old_status=None):
+    """Compact pass summary carried by /events; clients fetch the full pass by id if they need it."""
+    summary = {k: gp.get(k) for k in (
+        "id", "gp_number", "pass_date", "authorized_name", "in_or_out", "plate_no",
+        "status", "approved_by", "date_approved", "rejected_remarks",
+    )}
+    if old_status is not None:
+        summary["old_status"] = old_status
+    return summary
+
+async def _load_items(cur, gate_pass_ids):
+    """Fetch items for many gate passes in batched IN queries. Returns {gate_pass_id: [item rows ordered by id]}."""
+    items_by_pass = {gp_id: [] for gp_id in gate_pass_ids}
+    ids = list(items_by_pass)
+    for start in range(0, len(ids), ITEM_BATCH_SIZE):
+        chunk = ids[start:start + ITEM_BATCH_SIZE]
+        placeholders = ", ".join(["%s"] * len(chunk))
+        await cur.execute(
+            f"SELECT * FROM gate_pass_items WHERE gate_pass_id IN ({placeholders}) ORDER BY gate_pass_id, id",
+            tuple(chunk),
+        )
+        for r in await cur.fetchall():
+            items_by_pass[r["gate_pass_id"]].append(r)
+    return items_by_pass
+
+async def _rows_to_dicts(cur, gp_rows):
+    """Response dicts for gate pass rows, loading their items in batches instead of one query per pass."""
+    items_by_pass = await _load_items(cur, [gp["id"] for gp in gp_rows])
+    return [_row_to_dict(gp, items_by_pass[gp["id"]]) for gp in gp_rows]
+
+def _encode_dicts(gp_rows, items_by_pass):
+    return orjson.dumps([_row_to_dict(gp, items_by_pass[gp["id"]]) for gp in gp_rows])
+
+async def _rows_to_responses(cur, gp_rows):
+    return [GatePassResponse.model_validate(d) for d in await _rows_to_dicts(cur, gp_rows)]
+
+async def _insert_items(cur, gate_pass_id, items):
+    """Insert items with multi-row INSERTs of up to ITEM_BATCH_SIZE rows; returns item rows including their ids."""
+    for start in range(0, len(items), ITEM_BATCH_SIZE):
+        chunk = items[start:start + ITEM_BATCH_SIZE]
+        params = []
+        for it in chunk:
+            params.extend((gate_pass_id, it.item_code, it.item_description, it.qty, it.ref_doc_no, it.destination))
+        await cur.execute(
+            "INSERT INTO gate_pass_items (gate_pass_id, item_code, item_description, qty, ref_doc_no, destination) VALUES "
+            + ", ".join(["(%s, %s, %s, %s, %s, %s)"] * len(chunk)),
+            tuple(params),
+        )
+    if len(items) == 1:
+        ids = [cur.lastrowid]
+    else:
+        # Ids of a multi-row INSERT need not be consecutive (innodb_autoinc_lock_mode=2, the MySQL 8 default):
+        # read them back, in insert order, from the gate_pass_id index
+        await cur.execute("SELECT id FROM gate_pass_items WHERE gate_pass_id = %s ORDER BY id", (gate_pass_id,))
+        ids = [r["id"] for r in await cur.fetchall()]
+    return [dict(it.model_dump(), id=item_id, gate_pass_id=gate_pass_id) for it, item_id in zip(items, ids)]
+
+def _like_prefix(value: str) -> str:
+    """Escape LIKE wildcards so user input is matched literally as a prefix."""
+    return value.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_") + "%"
 
 @router.get("", response_model=list[GatePassResponse])
-def list_gate_passes(authorization: str = Header(None, alias="Authorization")):
-    get_current_user_id(authorization)
-    with get_db() as conn:
-        with conn.cursor() as cur:
-            cur.execute("SELECT * FROM gate_passes ORDER BY id DESC")
-            passes = cur.fetchall()
-            result = []
-            for gp in passes:
-                cur.execute("SELECT * FROM gate_pass_items WHERE gate_pass_id = %s ORDER BY id", (gp["id"],))
-                items = cur.fetchall()
-                result.append(_row_to_response(gp, items))
-    return result
+async def list_gate_passes(
+    request: Request,
+    after_id: Optional[int] = Query(None, ge=1, description="Keyset cursor: return passes with id < after_id"),
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE, description="Page size"),
+    status: Optional[List[str]] = Query(None, description="Repeat for several, e.g. status=approved&status=rejected"),
+    in_or_out: Optional[str] = None,
+    pass_date_from: Optional[date] = None,
+    pass_date_to: Optional[date] = None,
+    authorized_name: Optional[str] = Query(None, description="Prefix match"),
+    plate_no: Optional[str] = Query(None, description="Prefix match"),
+    _=Depends(get_current_user_id),
+    if_none_match: Optional[str] = Header(None, alias="If-None-Match"),
+):
+    """
+    List gate passes newest first, a page of `limit` at a time; the X-Next-After-Id header carries the cursor for the next page
+    (pass it as after_id) and is missing on the last one. /export streams the full history.
+    The weak ETag comes from the gate_passes version and the query string, so If-None-Match answers 304 without querying.
+    """
+    version = await cache_versions.current("gate_passes")
+    query_hash = hashlib.blake2b(request.url.query.encode(), digest_size=8).hexdigest()
+    headers = {"ETag": f'W/"gate-passes-{version}-{query_hash}"', "Cache-Control": "private, no-cache"}
+    if if_none_match and headers["ETag"] in [t.strip() for t in if_none_match.split(",")]:
+        return Response(status_code=304, headers=headers)
+    where, params = [], []
+    if after_id is not None:
+        where.append("id < %s")
+        params.append(after_id)
+    statuses = [s.strip().lower() for s in (status or []) if s.strip()]
+    if statuses:
+        where.append(f"status IN ({', '.join(['%s'] * len(statuses))})")
+        params.extend(statuses)
+    if in_or_out:
+        where.append("in_or_out = %s")
+        params.append(in_or_out.strip().lower())
+    if pass_date_from:
+        where.append("pass_date >= %s")
+        params.append(pass_date_from)
+    if pass_date_to:
+        where.append("pass_date <= %s")
+        params.append(pass_date_to)
+    if authorized_name and authorized_name.strip():
+        where.append("authorized_name LIKE %s")
+        params.append(_like_prefix(authorized_name.strip()))
+    if plate_no and plate_no.strip():
+        where.append("plate_no LIKE %s")
+        params.append(_like_prefix(plate_no.strip()))
+    sql = "SELECT * FROM gate_passes"
+    if where:
+        sql += " WHERE " + " AND ".join(where)
+    sql += " ORDER BY id DESC LIMIT %s"
+    params.append(limit)
+    async with get_db_async() as conn:
+        async with conn.cursor() as cur:
+            await cur.execute(sql, tuple(params))
+            passes = await cur.fetchall()
+            items_by_pass = await _load_items(cur, [gp["id"] for gp in passes])
+    if len(passes) == limit:
+        headers["X-Next-After-Id"] = str(passes[-1]["id"])
+    # Dicts already match GatePassResponse (response_model documents it); skip re-validation and encode with orjson
+    if len(passes) > LIST_INLINE_ROWS:
+        body = await run_in_threadpool(_encode_dicts, passes, items_by_pass)
+    else:
+        body = _encode_dicts(passes, items_by_pass)
+    return Response(body, media_type="application/json", headers=headers)
 
-@router.get("/by-number/{gp_number}", response_model=GatePassResponse)
-def get_by_gp_number(gp_number: str, authorization: str = None):
-    """Used by scanner: look up gate pass by GP number (barcode value). No auth required for scanning."""
-    with get_db() as conn:
-        with conn.cursor() as cur:
-            cur.execute("SELECT * FROM gate_passes WHERE gp_number = %s", (gp_number.strip(),))
-            gp = cur.fetchone()
+async def _export_passes(where, params):
+    """Yield GatePassResponse objects one at a time from a streaming join of passes and items (oldest first)."""
+    item_columns = ", ".join(f"i.{f} AS item_{f}" for f in _EXPORT_ITEM_FIELDS)
+    sql = f"SELECT g.*, {item_columns} FROM gate_passes g LEFT JOIN gate_pass_items i ON i.gate_pass_id = g.id"
+    if where:
+        sql += " WHERE " + " AND ".join(where)
+    sql += " ORDER BY g.id, i.id"
+    async with get_db_async() as conn:
+        async with unbuffered_cursor(conn) as cur:
+            await cur.execute(sql, tuple(params))
+            gp, items = None, []
+            while True:
+                rows = await cur.fetchmany(EXPORT_FETCH_SIZE)
+                if not rows:
+                    break
+                for r in rows:
+                    if gp is None or r["id"] != gp["id"]:
+                        if gp is not None:
+                            yield _row_to_response(gp, items)
+                        gp, items = r, []
+                    if r["item_id"] is not None:
+                        items.append({f: r[f"item_{f}"] for f in _EXPORT_ITEM_FIELDS})
+            if gp is not None:
+                yield _row_to_response(gp, items)
+
+async def _export_chunks(passes, fmt):
+    """Serialize passes as NDJSON (one pass per line) or CSV (one row per item), yielding ~EXPORT_CHUNK_BYTES at a time."""
+    buf = io.StringIO()
+    writer = csv.writer(buf)
+    if fmt == "csv":
+        writer.writerow(_EXPORT_PASS_FIELDS + ["item_" + f if f == "id" else f for f in _EXPORT_ITEM_FIELDS])
+    async for gp in passes:
+        if fmt == "ndjson":
+            buf.write(gp.model_dump_json())
+            buf.write("\n")
+        else:
+            head = [int(v) if isinstance(v, bool) else v for v in (getattr(gp, f) for f in _EXPORT_PASS_FIELDS)]
+            # A pass without items still gets one row
+            for item in gp.items or [None]:
+                writer.writerow(head + ([getattr(item, f) for f in _EXPORT_ITEM_FIELDS] if item else [None] * len(_EXPORT_ITEM_FIELDS)))
+        if buf.tell() >= EXPORT_CHUNK_BYTES:
+            yield buf.getvalue().encode("utf-8")
+            buf.seek(0)
+            buf.truncate()
+    if buf.tell():
+        yield buf.getvalue().encode("utf-8")
+
+@router.get("/export")
+async def export_gate_passes(
+    fmt: Literal["csv", "ndjson"] = Query("ndjson", alias="format"),
+    date_from: Optional[date] = Query(None, alias="from", description="pass_date on or after"),
+    date_to: Optional[date] = Query(None, alias="to", description="pass_date on or before"),
+    _=Depends(get_current_user_id),
+):
+    """Full gate pass history with items, streamed from a server-side cursor so memory stays flat for any size."""
+    where, params = [], []
+    if date_from:
+        where.append("g.pass_date >= %s")
+        params.append(date_from)
+    if date_to:
+        where.append("g.pass_date <= %s")
+        params.append(date_to)
+    filename = "gate-passes" + (f"-{date_from}" if date_from else "") + (f"-to-{date_to}" if date_to else "") + f".{fmt}"
+    return StreamingResponse(
+        _export_chunks(_export_passes(where, params), fmt),
+        media_type="text/csv" if fmt == "csv" else "application/x-ndjson",
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'},
+    )
+
+@router.get("/events")
+async def gate_pass_events(
+    request: Request,
+    last_event_id: Optional[int] = Query(None, description="resume after this event id (EventSource sends the Last-Event-ID header itself)"),
+    access_token: Optional[str] = Query(None, description="JWT, for EventSource which cannot set headers"),
+    authorization: Optional[str] = Header(None),
+    last_event_id_header: Optional[str] = Header(None, alias="Last-Event-ID"),
+):
+    """
+    Server-sent events for new passes ("created") and status changes ("status", one per change or batch),
+    each with data {"passes": [summary, ...]}. Reconnect with Last-Event-ID to get only what was missed;
+    a "reset" event means the missed events are gone and the list should be reloaded.
+    """
+    await resolve_user(authorization or (f"Bearer {access_token}" if access_token else None))
+    if last_event_id_header and last_event_id_header.strip().isdigit():
+        last_event_id = int(last_event_id_header)
+    return StreamingResponse(
+        events.stream(last_event_id),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+def _encode_sync_cursor(position):
+    return base64.urlsafe_b64encode("{},{}".format(*position).encode()).decode().rstrip("=")
+
+def _decode_sync_cursor(cursor: str):
+    """(change_version, id) from a /sync cursor; 400 if it was not issued by /sync."""
+    try:
+        text = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)).decode()
+        change_version, gate_pass_id = text.split(",")
+        return int(change_version), int(gate_pass_id)
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid sync cursor")
+
+@router.get("/sync")
+async def sync_gate_passes(
+    since: Optional[str] = Query(None, description="cursor from the previous response; omit to start from the beginning"),
+    limit: int = Query(SYNC_PAGE_SIZE, ge=1, le=SYNC_MAX_PAGE_SIZE),
+    _=Depends(get_current_user_id),
+):
+    """
+    Delta feed for scanners keeping a local copy: passes created or changed after the cursor, oldest change
+    first, as {"cursor", "more", "fields", "item_fields", "passes": [[...values, [[...item values], ...]], ...]}
+    with the scan fields. Poll with the returned cursor, straight away while "more" is true; apply passes by id.
+    The cursor is the (change_version, id) of the last pass sent. change_version is commit-ordered, so a
+    transaction still running when a page is read commits with a higher version and comes on a later poll.
+    """
+    after = _decode_sync_cursor(since) if since else (-1, 0)
+    async with get_db_async() as conn:
+        async with conn.cursor() as cur:
+            # Range on the (change_version, id) index
+            await cur.execute(
+                "SELECT * FROM gate_passes WHERE change_version >= %s AND (change_version > %s OR id > %s) "
+                "ORDER BY change_version, id LIMIT %s",
+                (after[0], after[0], after[1], limit),
+            )
+            rows = await cur.fetchall()
+            items_by_pass = await _load_items(cur, [r["id"] for r in rows])
+    position = (rows[-1]["change_version"], rows[-1]["id"]) if rows else after
+    passes = []
+    for r in rows:
+        d = _row_to_dict(r, items_by_pass[r["id"]])
+        passes.append([d[f] for f in _SYNC_PASS_FIELDS] + [[[it[f] for f in _SYNC_ITEM_FIELDS] for it in d["items"]]])
+    body = orjson.dumps({
+        "cursor": _encode_sync_cursor(position),
+        "more": len(rows) == limit,
+        "fields": _SYNC_PASS_FIELDS,
+        "item_fields": _SYNC_ITEM_FIELDS,
+        "passes": passes,
+    })
+    # Compressed (br/gzip) by CompressionMiddleware like other JSON responses
+    return Response(body, media_type="application/json", headers={"Cache-Control": "no-store"})
+
+async def _sync_scan_cache():
+    """
+    Evict the cached passes that changed (in any worker) since the last sync, found by their change_version;
+    entries for passes nobody touched stay cached. Costs a query only when the gate_passes version moved.
+    """
+    global _scan_synced
+    version = await cache_versions.current("gate_passes")
+    if version <= _scan_synced:
+        return
+    async with _scan_sync_lock:
+        if version <= _scan_synced:
+            return
+        if not len(_scan_cache):
+            _scan_synced = version  # nothing to evict
+            return
+        async with get_db_async() as conn:
+            async with conn.cursor() as cur:
+                await cur.execute("SELECT gp_number, change_version FROM gate_passes WHERE change_version > %s", (_scan_synced,))
+                changed = await cur.fetchall()
+        for row in changed:
+            entry = _scan_cache.peek(row["gp_number"])
+            if entry and entry[0] < row["change_version"]:
+                _scan_cache.pop(row["gp_number"])
+        _scan_synced = max([version] + [row["change_version"] for row in changed])
+
+def _scan_cache_put(response, change_version, synced):
+    """
+    Cache a pass read (or committed) when _scan_synced was `synced`. Changes it can't reflect have higher
+    versions than both; if a sync already went past them their eviction is gone, so don't cache.
+    """
+    if _scan_synced <= max(synced, change_version):
+        _scan_cache.set(response.gp_number, (change_version, response))
+
+async def _scan_lookup(gp_number: str) -> GatePassResponse:
+    """Gate pass by GP number from the scan cache; a pass's entry is evicted once that pass changes."""
+    key = gp_number.strip()
+    await _sync_scan_cache()
+    entry = _scan_cache.get(key)
+    if entry:
+        return entry[1]
+    synced = _scan_synced
+    async with get_db_async() as conn:
+        async with conn.cursor() as cur:
+            await cur.execute("SELECT * FROM gate_passes WHERE gp_number = %s", (key,))
+            gp = await cur.fetchone()
             if not gp:
                 raise HTTPException(status_code=404, detail="Gate pass not found")
-            cur.execute("SELECT * FROM gate_pass_items WHERE gate_pass_id = %s ORDER BY id", (gp["id"],))
-            items = cur.fetchall()
-    return _row_to_response(gp, items)
+            items = (await _load_items(cur, [gp["id"]]))[gp["id"]]
+    response = _row_to_response(gp, items)
+    _scan_cache_put(response, gp["change_version"], synced)
+    return response
+
+async def warm_scan_cache():
+    """Preload today's passes into the scan cache (called on startup)."""
+    await _sync_scan_cache()
+    synced = _scan_synced
+    async with get_db_async() as conn:
+        async with conn.cursor() as cur:
+            await cur.execute("SELECT * FROM gate_passes WHERE pass_date = CURDATE() ORDER BY id DESC LIMIT %s", (SCAN_CACHE_SIZE,))
+            rows = await cur.fetchall()
+            responses = await _rows_to_responses(cur, rows)
+    for row, response in zip(rows, responses):
+        _scan_cache_put(response, row["change_version"], synced)
+    return len(responses)
+
+@router.get("/by-number/{gp_number}", response_model=GatePassResponse)
+async def get_by_gp_number(gp_number: str, authorization: str = None):
+    """Used by scanner: look up gate pass by GP number (barcode value). No auth required for scanning."""
+    return await _scan_lookup(gp_number)
+
+@router.get("/scan/{gp_number}", response_model=GatePassScanResponse)
+async def scan_gate_pass(gp_number: str):
+    """Compact scanner lookup: only the fields the Scan page shows. No auth required, like by-number."""
+    return await _scan_lookup(gp_number)
+
+async def _load_print_dicts(gate_pass_ids):
+    """Response dicts for the given ids in that order; 404 if any is missing."""
+    async with get_db_async() as conn:
+        async with conn.cursor() as cur:
+            placeholders = ", ".join(["%s"] * len(gate_pass_ids))
+            await cur.execute(f"SELECT * FROM gate_passes WHERE id IN ({placeholders})", tuple(gate_pass_ids))
+            by_id = {d["id"]: d for d in await _rows_to_dicts(cur, await cur.fetchall())}
+    missing = [i for i in gate_pass_ids if i not in by_id]
+    if missing:
+        raise HTTPException(status_code=404, detail=f"Gate pass not found: {', '.join(map(str, missing[:20]))}")
+    return [by_id[i] for i in gate_pass_ids]
+
+async def _pass_pdf(gp, variant):
+    """(content hash, PDF bytes) for one pass, rendered in the print pool unless cached for the same content."""
+    key = ("pdf", gp["id"], variant)
+    digest = gate_pass_print.content_hash(gp, variant)
+    entry = _print_cache.get(key)
+    if entry and entry[0] == digest:
+        return entry
+    entry = (digest, await gate_pass_print.run_render(gate_pass_print.gate_passes_pdf, [gp], variant))
+    _print_cache.set(key, entry)
+    return entry
+
+def _cached_file(entry, media_type, if_none_match, filename=None):
+    etag = f'"{entry[0]}"'
+    headers = {"ETag": etag, "Cache-Control": "private, no-cache"}
+    if if_none_match and etag in [t.strip() for t in if_none_match.split(",")]:
+        return Response(status_code=304, headers=headers)
+    if filename:
+        headers["Content-Disposition"] = f'inline; filename="{filename}"'
+    return Response(entry[1], media_type=media_type, headers=headers)
+
+def _drop_print_cache(gate_pass_id):
+    for variant in PRINT_VARIANTS:
+        _print_cache.pop(("pdf", gate_pass_id, variant))
+
+@router.post("/print")
+async def print_gate_passes(body: GatePassPrintBatch, _=Depends(get_current_user_id)):
+    """Many passes in one PDF (one or more pages each, in the requested order); passes render in parallel across the print pool."""
+    ids = list(dict.fromkeys(body.ids))
+    passes = await _load_print_dicts(ids)
+    entries = await asyncio.gather(*(_pass_pdf(gp, body.variant) for gp in passes))
+    by_id = {gp["id"]: entry[1] for gp, entry in zip(passes, entries)}
+    pdf = await gate_pass_print.run_render(gate_pass_print.merge_pdfs, [by_id[i] for i in body.ids])
+    return Response(pdf, media_type="application/pdf", headers={"Content-Disposition": 'inline; filename="gate-passes.pdf"'})
+
+@router.get("/{gate_pass_id}/print.pdf")
+async def gate_pass_pdf(
+    gate_pass_id: int,
+    variant: Literal["form", "release"] = "form",
+    if_none_match: Optional[str] = Header(None),
+    _=Depends(get_current_user_id),
+):
+    """Printable gate pass rendered server-side (same layout as the print page); release adds the release tag."""
+    (gp,) = await _load_print_dicts([gate_pass_id])
+    entry = await _pass_pdf(gp, variant)
+    return _cached_file(entry, "application/pdf", if_none_match, f"gate-pass-{gp['gp_number']}.pdf")
+
+@router.get("/{gate_pass_id}/barcode.png")
+async def gate_pass_barcode(gate_pass_id: int, if_none_match: Optional[str] = Header(None), _=Depends(get_current_user_id)):
+    """Code 128 barcode of the GP number as PNG."""
+    async with get_db_async() as conn:
+        async with conn.cursor() as cur:
+            await cur.execute("SELECT gp_number FROM gate_passes WHERE id = %s", (gate_pass_id,))
+            row = await cur.fetchone()
+    if not row:
+        raise HTTPException(status_code=404, detail="Gate pass not found")
+    key = ("barcode", gate_pass_id)
+    digest = gate_pass_print.content_hash(row["gp_number"])
+    entry = _print_cache.get(key)
+    if not entry or entry[0] != digest:
+        entry = (digest, await gate_pass_print.run_render(gate_pass_print.barcode_png, row["gp_number"]))
+        _print_cache.set(key, entry)
+    return _cached_file(entry, "image/png", if_none_match)
 
 @router.get("/{gate_pass_id}", response_model=GatePassResponse)
-def get_gate_pass(gate_pass_id: int, authorization: str = Header(None, alias="Authorization")):
-    get_current_user_id(authorization)
-    with get_db() as conn:
-        with conn.cursor() as cur:
-            cur.execute("SELECT * FROM gate_passes WHERE id = %s", (gate_pass_id,))
-            gp = cur.fetchone()
+async def get_gate_pass(gate_pass_id: int, _=Depends(get_current_user_id)):
+    async with get_db_async() as conn:
+        async with conn.cursor() as cur:
+            await cur.execute("SELECT * FROM gate_passes WHERE id = %s", (gate_pass_id,))
+            gp = await cur.fetchone()
             if not gp:
                 raise HTTPException(status_code=404, detail="Gate pass not found")
-            cur.execute("SELECT * FROM gate_pass_items WHERE gate_pass_id = %s ORDER BY id", (gate_pass_id,))
-            items = cur.fetchall()
+            items = (await _load_items(cur, [gate_pass_id]))[gate_pass_id]
     return _row_to_response(gp, items)
 
 
-@router.patch("/{gate_pass_id}/status", response_model=GatePassResponse)
-def update_gate_pass_status(
-    gate_pass_id: int,
-    body: GatePassStatusUpdate,
-    authorization: str = Header(None, alias="Authorization"),
-):
-    """Update gate pass status (e.g. approved, rejected) and optional rejected_remarks. On approve, set approved_by and date_approved."""
-    get_current_user_id(authorization)
+def _parse_status_update(body: GatePassStatusUpdate):
+    """Validated (status, rejected_remarks, approved_by, date_approved) for a status change."""
     status = (body.status or "").strip().lower() or None
     if not status:
         raise HTTPException(status_code=400, detail="status is required")
@@ -89,77 +521,154 @@ def update_gate_pass_status(
         raise HTTPException(status_code=400, detail="status must be pending, approved, or rejected")
     rejected_remarks = body.rejected_remarks if status == "rejected" else None
     approved_by = (body.approved_by or "").strip() or None if status == "approved" else None
-    from datetime import date as date_type
-    date_approved = date_type.today() if status == "approved" else None
-    with get_db() as conn:
-        with conn.cursor() as cur:
-            cur.execute("SELECT id FROM gate_passes WHERE id = %s", (gate_pass_id,))
-            if not cur.fetchone():
-                raise HTTPException(status_code=404, detail="Gate pass not found")
-            if status == "approved":
-                cur.execute(
-                    "UPDATE gate_passes SET status = %s, rejected_remarks = NULL, approved_by = COALESCE(%s, approved_by), date_approved = %s WHERE id = %s",
-                    (status, approved_by, date_approved, gate_pass_id),
-                )
-            else:
-                cur.execute(
-                    "UPDATE gate_passes SET status = %s, rejected_remarks = %s WHERE id = %s",
-                    (status, rejected_remarks, gate_pass_id),
-                )
-            cur.execute("SELECT * FROM gate_passes WHERE id = %s", (gate_pass_id,))
-            gp = cur.fetchone()
-            cur.execute("SELECT * FROM gate_pass_items WHERE gate_pass_id = %s ORDER BY id", (gate_pass_id,))
-            items = cur.fetchall()
-    return _row_to_response(gp, items)
-
+    date_approved = date.today() if status == "approved" else None
+    return status, rejected_remarks, approved_by, date_approved
 
-def _next_gp_number_for_year(cursor, year: int) -> str:
-    """Generate next GP number as year + 4-digit sequence, e.g. 20260001, 20260002."""
-    prefix = str(year)
-    cursor.execute(
-        "SELECT MAX(gp_number) AS max_gp FROM gate_passes WHERE gp_number LIKE %s AND LENGTH(gp_number) = 8",
-        (f"{prefix}%",),
-    )
-    row = cursor.fetchone()
-    max_gp = row.get("max_gp") if row else None
-    if max_gp and max_gp.startswith(prefix):
-        try:
-            seq = int(max_gp[4:], 10) + 1
-        except ValueError:
-            seq = 1
+async def _apply_status(cur, gp_rows, status, rejected_remarks, approved_by, date_approved):
+    """
+    Set-based status UPDATE for locked gate_passes rows; the rows are patched in memory instead of re-selected.
+    Returns their items by id, after counting the change in the report rollups.
+    """
+    ids = [gp["id"] for gp in gp_rows]
+    placeholders = ", ".join(["%s"] * len(ids))
+    if status == "approved":
+        await cur.execute(
+            "UPDATE gate_passes SET status = %s, rejected_remarks = NULL, approved_by = COALESCE(%s, approved_by), date_approved = %s "
+            f"WHERE id IN ({placeholders})",
+            (status, approved_by, date_approved, *ids),
+        )
     else:
-        seq = 1
-    return f"{prefix}{seq:04d}"
+        await cur.execute(
+            f"UPDATE gate_passes SET status = %s, rejected_remarks = %s WHERE id IN ({placeholders})",
+            (status, rejected_remarks, *ids),
+        )
+    changes = []
+    for gp in gp_rows:
+        changes.append((gp, gp.get("status")))
+        gp["status"] = status
+        if status == "approved":
+            gp.update(rejected_remarks=None, approved_by=approved_by or gp["approved_by"], date_approved=date_approved)
+        else:
+            gp["rejected_remarks"] = rejected_remarks
+    items_by_pass = await _load_items(cur, ids)
+    await reports.record_many(cur, [(gp, items_by_pass[gp["id"]], old_status) for gp, old_status in changes])
+    return items_by_pass
+
+async def _bump_change_version(cur, gate_pass_ids):
+    """
+    Bump the gate_passes version and stamp it on the changed passes as their change_version (for /sync).
+    The bump locks the version row until commit, so versions commit in order.
+    """
+    version = await cache_versions.bump(cur, "gate_passes")
+    placeholders = ", ".join(["%s"] * len(gate_pass_ids))
+    await cur.execute(f"UPDATE gate_passes SET change_version = %s WHERE id IN ({placeholders})", (version, *gate_pass_ids))
+    return version
+
+def _status_differs(gp, status, rejected_remarks, approved_by):
+    """Whether applying the change to gp would modify it (re-approving without an approver or re-rejecting with the same remarks doesn't)."""
+    if (gp.get("status") or "pending").strip().lower() != status:
+        return True
+    if status == "rejected":
+        return gp["rejected_remarks"] != rejected_remarks
+    if status == "approved":
+        return approved_by is not None and gp["approved_by"] != approved_by
+    return False
+
+@router.patch("/{gate_pass_id}/status", response_model=GatePassResponse)
+async def update_gate_pass_status(
+    gate_pass_id: int,
+    body: GatePassStatusUpdate,
+    _=Depends(get_current_user_id),
+):
+    """Update gate pass status (e.g. approved, rejected) and optional rejected_remarks. On approve, set approved_by and date_approved."""
+    change = _parse_status_update(body)
+    async with get_db_async() as conn:
+        async with conn.cursor() as cur:
+            # Lock and read the row up front; the response is patched in memory instead of re-selected
+            await cur.execute("SELECT * FROM gate_passes WHERE id = %s FOR UPDATE", (gate_pass_id,))
+            gp = await cur.fetchone()
+            if not gp:
+                raise HTTPException(status_code=404, detail="Gate pass not found")
+            old_status = gp.get("status")
+            items = (await _apply_status(cur, [gp], *change))[gate_pass_id]
+            version = await _bump_change_version(cur, [gate_pass_id])
+            event = await events.record(cur, version, "status", {"passes": [_event_pass(gp, old_status)]})
+    response = _row_to_response(gp, items)
+    # Only cache once the commit succeeded; version is the one committed with this change
+    _scan_cache_put(response, version, version)
+    _drop_print_cache(gate_pass_id)
+    events.committed(event)
+    return response
+
+@router.post("/status:batch", response_model=list[GatePassStatusOutcome])
+async def update_gate_pass_status_batch(body: GatePassStatusBatch, _=Depends(get_current_user_id)):
+    """
+    Apply one status change to many passes in a single transaction (one locking SELECT, one UPDATE ... WHERE id IN,
+    one items query). Returns an outcome per id in request order; only updated passes include the full gate pass.
+    """
+    status, rejected_remarks, approved_by, date_approved = _parse_status_update(body)
+    ids = list(dict.fromkeys(body.ids))
+    updated = {}
+    async with get_db_async() as conn:
+        async with conn.cursor() as cur:
+            placeholders = ", ".join(["%s"] * len(ids))
+            # Locks taken in id order, so overlapping batches can't deadlock each other
+            await cur.execute(f"SELECT * FROM gate_passes WHERE id IN ({placeholders}) ORDER BY id FOR UPDATE", tuple(ids))
+            rows = {gp["id"]: gp for gp in await cur.fetchall()}
+            changed = [gp for gp in rows.values() if _status_differs(gp, status, rejected_remarks, approved_by)]
+            if changed:
+                old_statuses = [gp.get("status") for gp in changed]
+                items_by_pass = await _apply_status(cur, changed, status, rejected_remarks, approved_by, date_approved)
+                version = await _bump_change_version(cur, [gp["id"] for gp in changed])
+                event = await events.record(
+                    cur, version, "status", {"passes": [_event_pass(gp, old) for gp, old in zip(changed, old_statuses)]},
+                )
+                updated = {gp["id"]: _row_to_response(gp, items_by_pass[gp["id"]]) for gp in changed}
+    for gate_pass_id, response in updated.items():
+        _scan_cache_put(response, version, version)
+        _drop_print_cache(gate_pass_id)
+    if updated:
+        events.committed(event)
+    outcomes = []
+    for gate_pass_id in ids:
+        if gate_pass_id in updated:
+            outcomes.append({"id": gate_pass_id, "outcome": "updated", "status": status, "gate_pass": updated[gate_pass_id]})
+        elif gate_pass_id in rows:
+            outcomes.append({"id": gate_pass_id, "outcome": "unchanged", "status": rows[gate_pass_id]["status"]})
+        else:
+            outcomes.append({"id": gate_pass_id, "outcome": "not_found"})
+    return outcomes
 
 
 @router.post("", response_model=GatePassResponse)
-def create_gate_pass(body: GatePassCreate, authorization: str = Header(None, alias="Authorization")):
-    get_current_user_id(authorization)
-    with get_db() as conn:
-        with conn.cursor() as cur:
-            year = body.pass_date.year if hasattr(body.pass_date, "year") else int(str(body.pass_date)[:4])
-            gp_number = _next_gp_number_for_year(cur, year)
+async def create_gate_pass(body: GatePassCreate, _=Depends(get_current_user_id)):
+    year = body.pass_date.year if hasattr(body.pass_date, "year") else int(str(body.pass_date)[:4])
+    gp_number = await next_gp_number(year)
+    async with get_db_async() as conn:
+        async with conn.cursor() as cur:
             in_out = (body.in_or_out or "out").strip().lower()[:10]
             if in_out not in ("in", "out"):
                 in_out = "out"
-            # Omit 'attention' unless DB has it (run migrations/004_add_gatepass_attention.sql to add)
-            cur.execute("""
+            await cur.execute("""
                 INSERT INTO gate_passes (gp_number, pass_date, authorized_name, in_or_out,
                     purpose_delivery, purpose_return, purpose_inter_warehouse, purpose_others,
-                    vehicle_type, plate_no, prepared_by, checked_by, recommended_by, approved_by, time_out, time_in)
-                VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s)
+                    vehicle_type, plate_no, attention, prepared_by, checked_by, recommended_by, approved_by, time_out, time_in)
+                VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s)
             """, (gp_number, body.pass_date, body.authorized_name, in_out,
                   int(body.purpose_delivery), int(body.purpose_return), int(body.purpose_inter_warehouse), int(body.purpose_others),
-                  body.vehicle_type, body.plate_no, body.prepared_by, body.checked_by, body.recommended_by, body.approved_by,
-                  body.time_out, body.time_in))
+                  body.vehicle_type, body.plate_no, body.attention, body.prepared_by, body.checked_by, body.recommended_by,
+                  body.approved_by, body.time_out, body.time_in))
             gate_pass_id = cur.lastrowid
-            for it in body.items:
-                cur.execute("""
-                    INSERT INTO gate_pass_items (gate_pass_id, item_code, item_description, qty, ref_doc_no, destination)
-                    VALUES (%s, %s, %s, %s, %s, %s)
-                """, (gate_pass_id, it.item_code, it.item_description, it.qty, it.ref_doc_no, it.destination))
-            cur.execute("SELECT * FROM gate_passes WHERE id = %s", (gate_pass_id,))
-            gp = cur.fetchone()
-            cur.execute("SELECT * FROM gate_pass_items WHERE gate_pass_id = %s ORDER BY id", (gate_pass_id,))
-            items = cur.fetchall()
-    return _row_to_response(gp, items)
+            items = await _insert_items(cur, gate_pass_id, body.items)
+            gp = dict(
+                body.model_dump(exclude={"items"}),
+                id=gate_pass_id, gp_number=gp_number, in_or_out=in_out,
+                status="pending", rejected_remarks=None, date_approved=None,
+            )
+            await reports.record(cur, gp, items)
+            version = await _bump_change_version(cur, [gate_pass_id])
+            event = await events.record(cur, version, "created", {"passes": [_event_pass(gp)]})
+    response = _row_to_response(gp, items)
+    _scan_cache_put(response, version, version)
+    events.committed(event)
+    return response
@@ -1,82 +1,264 @@
-from fastapi import APIRouter, Header, HTTPException
-from app.database import get_db
-from app.schemas import ProductCreate, ProductResponse, ProductsBulkCreate, ProductsBulkResponse
+import csv
+import io
+import asyncio
+import json
+from typing import Literal, Optional
+from fastapi import APIRouter, Depends, File, Header, HTTPException, Query, Response, UploadFile
+from app import cache_versions, product_search
+from starlette.concurrency import run_in_threadpool
+from app.async_database import get_db_async
+from app.schemas import ProductCreate, ProductResponse, ProductsBulkCreate, ProductsBulkResponse, ProductsImportResponse
 from app.routes.users import get_current_user_id
 
 router = APIRouter(prefix="/products", tags=["products"])
 
+# Rows per multi-row INSERT (and per commit) for bulk/import
+IMPORT_CHUNK_SIZE = 1000
+# Accepted header names (lowercased) for uploaded files; the first two match the Excel template
+_IMPORT_COLUMNS = {
+    "item_code": ("item no.", "item no", "item_code", "item code"),
+    "item_description": ("item description", "item_description", "description"),
+    "item_group": ("item group", "item_group", "group"),
+}
+
+_catalog_lock = asyncio.Lock()
+_catalog = None  # (version, serialized JSON body) of the last full product list
+
+def _encode_catalog(rows) -> bytes:
+    return json.dumps(
+        [{"id": r["id"], "item_code": r["item_code"], "item_description": r["item_description"], "item_group": r.get("item_group")} for r in rows],
+        separators=(",", ":"),
+    ).encode("utf-8")
+
+def _product_tuple(r):
+    return r["id"], r["item_code"], r["item_description"], r.get("item_group")
+
+async def _catalog_body(version: int) -> bytes:
+    """Serialized product list for version, rebuilt from the DB only when the version changed."""
+    global _catalog
+    cached = _catalog
+    if cached and cached[0] == version:
+        return cached[1]
+    async with _catalog_lock:
+        if _catalog and _catalog[0] == version:
+            return _catalog[1]
+        async with get_db_async() as conn:
+            async with conn.cursor() as cur:
+                await cur.execute("SELECT id, item_code, item_description, item_group FROM products ORDER BY item_group, item_code")
+                rows = await cur.fetchall()
+        body = await run_in_threadpool(_encode_catalog, rows)
+        _catalog = (version, body)
+        return body
+
+async def warm_catalog_cache():
+    """Serialize the product list ahead of the first GET /products (called on startup)."""
+    await _catalog_body(await cache_versions.current("products"))
+
 @router.get("", response_model=list[ProductResponse])
-def list_products(authorization: str = Header(None, alias="Authorization")):
-    get_current_user_id(authorization)
-    with get_db() as conn:
-        with conn.cursor() as cur:
-            cur.execute("SELECT id, item_code, item_description, item_group FROM products ORDER BY item_group, item_code")
-            rows = cur.fetchall()
-    return [ProductResponse(id=r["id"], item_code=r["item_code"], item_description=r["item_description"], item_group=r.get("item_group")) for r in rows]
+async def list_products(
+    _=Depends(get_current_user_id),
+    if_none_match: Optional[str] = Header(None, alias="If-None-Match"),
+):
+    """Full catalog, served from an in-process cache keyed by the products version. Supports If-None-Match (304)."""
+    version = await cache_versions.current("products")
+    headers = {"ETag": f'W/"products-{version}"', "Cache-Control": "private, no-cache"}
+    if if_none_match and headers["ETag"] in [t.strip() for t in if_none_match.split(",")]:
+        return Response(status_code=304, headers=headers)
+    return Response(content=await _catalog_body(version), media_type="application/json", headers=headers)
+
+@router.get("/search", response_model=list[ProductResponse])
+async def search_products(
+    q: str = Query(..., min_length=1, description="Item code prefix or description word prefixes"),
+    limit: int = Query(20, ge=1, le=100),
+    _=Depends(get_current_user_id),
+):
+    """Typeahead lookup: item codes starting with q first, then descriptions containing words starting with each token of q."""
+    return [ProductResponse(id=r[0], item_code=r[1], item_description=r[2], item_group=r[3]) for r in await product_search.search_products(q, limit)]
 
 @router.post("", response_model=ProductResponse)
-def create_product(product: ProductCreate, authorization: str = Header(None, alias="Authorization")):
-    get_current_user_id(authorization)
-    with get_db() as conn:
-        with conn.cursor() as cur:
-            cur.execute("SELECT id FROM products WHERE item_code = %s", (product.item_code,))
-            if cur.fetchone():
+async def create_product(product: ProductCreate, _=Depends(get_current_user_id)):
+    async with get_db_async(write=True) as conn:
+        async with conn.cursor() as cur:
+            await cur.execute("SELECT id FROM products WHERE item_code = %s", (product.item_code,))
+            if await cur.fetchone():
                 raise HTTPException(status_code=400, detail="Item code already exists")
-            cur.execute(
+            await cur.execute(
                 "INSERT INTO products (item_code, item_description, item_group) VALUES (%s, %s, %s)",
                 (product.item_code, product.item_description, product.item_group or None)
             )
-            cur.execute("SELECT id, item_code, item_description, item_group FROM products WHERE id = LAST_INSERT_ID()")
-            row = cur.fetchone()
+            version = await cache_versions.bump(cur, "products")
+            await cur.execute("SELECT id, item_code, item_description, item_group FROM products WHERE id = LAST_INSERT_ID()")
+            row = await cur.fetchone()
+    await product_search.apply_changes(version, upserts=[_product_tuple(row)])
     return ProductResponse(id=row["id"], item_code=row["item_code"], item_description=row["item_description"], item_group=row.get("item_group"))
 
+async def _load_chunk(cur, rows, mode):
+    """
+    Load (item_code, item_description, item_group) rows with one existence query and one multi-row INSERT.
+    mode "skip" leaves existing codes untouched; "upsert" overwrites their description and group.
+    Returns (created, updated, existing_codes, change), change being (version, written rows) for
+    product_search.apply_changes once committed, or None. Codes compare case-insensitively, like the column collation.
+    """
+    deduped = {}
+    for row in rows:
+        deduped[row[0].lower()] = row
+    rows = list(deduped.values())
+    if not rows:
+        return 0, 0, [], None
+    placeholders = ", ".join(["%s"] * len(rows))
+    await cur.execute(
+        f"SELECT item_code, item_description, item_group FROM products WHERE item_code IN ({placeholders})",
+        tuple(r[0] for r in rows),
+    )
+    existing = {r["item_code"].lower(): r for r in await cur.fetchall()}
+    existing_codes = [r["item_code"] for r in existing.values()]
+    if mode == "skip":
+        rows = [r for r in rows if r[0].lower() not in existing]
+        # No-op update instead of INSERT IGNORE so other errors (e.g. data too long) still raise
+        on_duplicate = "id = id"
+    else:
+        # Unchanged rows are left out so they don't count as updates (or bump the version)
+        rows = [r for r in rows if r[0].lower() not in existing
+                or (existing[r[0].lower()]["item_description"], existing[r[0].lower()]["item_group"]) != (r[1], r[2])]
+        on_duplicate = "item_description = new.item_description, item_group = new.item_group"
+    if not rows:
+        return 0, 0, existing_codes, None
+    await cur.execute(
+        "INSERT INTO products (item_code, item_description, item_group) VALUES "
+        + ", ".join(["(%s, %s, %s)"] * len(rows))
+        + " AS new ON DUPLICATE KEY UPDATE " + on_duplicate,
+        tuple(v for r in rows for v in r),
+    )
+    version = await cache_versions.bump(cur, "products")
+    placeholders = ", ".join(["%s"] * len(rows))
+    await cur.execute(
+        f"SELECT id, item_code, item_description, item_group FROM products WHERE item_code IN ({placeholders})",
+        tuple(r[0] for r in rows),
+    )
+    written = [_product_tuple(r) for r in await cur.fetchall()]
+    # Counted from the existence check rather than affected rows, whose meaning differs per backend
+    updated = sum(1 for r in rows if r[0].lower() in existing)
+    return len(rows) - updated, updated, existing_codes, (version, written)
+
+def _clean_row(item_code, item_description, item_group):
+    """Strip fields; returns None when code or description is missing."""
+    item_code = str(item_code if item_code is not None else "").strip()
+    item_description = str(item_description if item_description is not None else "").strip()
+    if not item_code or not item_description:
+        return None
+    return item_code, item_description, str(item_group if item_group is not None else "").strip() or None
+
 @router.post("/bulk", response_model=ProductsBulkResponse)
-def create_products_bulk(body: ProductsBulkCreate, authorization: str = Header(None, alias="Authorization")):
+async def create_products_bulk(body: ProductsBulkCreate, _=Depends(get_current_user_id)):
     """Insert multiple products. Skips rows whose item_code already exists; returns created and skipped counts."""
-    get_current_user_id(authorization)
+    rows = [r for r in (_clean_row(p.item_code, p.item_description, p.item_group) for p in body.items) if r]
     created = 0
     skipped_codes = []
-    with get_db() as conn:
-        with conn.cursor() as cur:
-            for p in body.items:
-                item_code = (p.item_code or "").strip()
-                item_description = (p.item_description or "").strip()
-                if not item_code or not item_description:
-                    continue
-                cur.execute("SELECT id FROM products WHERE item_code = %s", (item_code,))
-                if cur.fetchone():
-                    skipped_codes.append(item_code)
-                    continue
-                cur.execute(
-                    "INSERT INTO products (item_code, item_description, item_group) VALUES (%s, %s, %s)",
-                    (item_code, item_description, (p.item_group or "").strip() or None),
-                )
-                created += 1
+    changes = []
+    async with get_db_async(write=True) as conn:
+        async with conn.cursor() as cur:
+            for start in range(0, len(rows), IMPORT_CHUNK_SIZE):
+                chunk_created, _, existing, change = await _load_chunk(cur, rows[start:start + IMPORT_CHUNK_SIZE], "skip")
+                created += chunk_created
+                skipped_codes.extend(existing)
+                if change:
+                    changes.append(change)
+    for version, written in changes:
+        await product_search.apply_changes(version, upserts=written)
     return ProductsBulkResponse(created=created, skipped=len(skipped_codes), skipped_codes=skipped_codes)
 
+def _iter_upload_rows(upload: UploadFile):
+    """Yield raw rows (header first) from a CSV or XLSX upload without materializing the whole sheet."""
+    name = (upload.filename or "").lower()
+    if name.endswith(".xlsx") or "spreadsheetml" in (upload.content_type or ""):
+        from openpyxl import load_workbook
+        wb = load_workbook(upload.file, read_only=True, data_only=True)
+        try:
+            yield from wb.worksheets[0].iter_rows(values_only=True)
+        finally:
+            wb.close()
+    else:
+        yield from csv.reader(io.TextIOWrapper(upload.file, encoding="utf-8-sig", newline=""))
+
+@router.post("/import", response_model=ProductsImportResponse)
+async def import_products(
+    file: UploadFile = File(...),
+    mode: Literal["skip", "upsert"] = Query("skip", description="skip: keep existing item codes; upsert: overwrite them"),
+    _=Depends(get_current_user_id),
+):
+    """
+    Import products from a CSV or XLSX file (headers Item No., Item Description, Item Group).
+    Rows are parsed and loaded in chunks of IMPORT_CHUNK_SIZE, each committed on its own.
+    """
+    rows_iter = _iter_upload_rows(file)
+    header = [str(h or "").strip().lower() for h in await run_in_threadpool(next, rows_iter, None) or []]
+    cols = {}
+    for field, names in _IMPORT_COLUMNS.items():
+        cols[field] = next((header.index(n) for n in names if n in header), None)
+    if cols["item_code"] is None or cols["item_description"] is None:
+        raise HTTPException(status_code=400, detail='File must have columns "Item No." and "Item Description".')
+
+    def cell(row, field):
+        idx = cols[field]
+        return row[idx] if idx is not None and idx < len(row) else None
+
+    invalid = 0
+
+    def read_chunk():
+        """Parse up to IMPORT_CHUNK_SIZE valid rows (file reads and XLSX parsing block, so this runs in the threadpool)."""
+        nonlocal invalid
+        chunk = []
+        for raw in rows_iter:
+            if not raw or all(v is None or str(v).strip() == "" for v in raw):
+                continue
+            row = _clean_row(cell(raw, "item_code"), cell(raw, "item_description"), cell(raw, "item_group"))
+            if row is None:
+                invalid += 1
+                continue
+            chunk.append(row)
+            if len(chunk) >= IMPORT_CHUNK_SIZE:
+                break
+        return chunk
+
+    created = updated = skipped = 0
+    async with get_db_async(write=True) as conn:
+        async with conn.cursor() as cur:
+            while True:
+                chunk = await run_in_threadpool(read_chunk)
+                if not chunk:
+                    break
+                c, u, _, change = await _load_chunk(cur, chunk, mode)
+                created, updated, skipped = created + c, updated + u, skipped + len(chunk) - c - u
+                await conn.commit()
+                if change:
+                    await product_search.apply_changes(change[0], upserts=change[1])
+    return ProductsImportResponse(created=created, updated=updated, skipped=skipped, invalid=invalid)
+
 
 @router.put("/{product_id}", response_model=ProductResponse)
-def update_product(product_id: int, product: ProductCreate, authorization: str = Header(None, alias="Authorization")):
-    get_current_user_id(authorization)
-    with get_db() as conn:
-        with conn.cursor() as cur:
-            cur.execute("SELECT id FROM products WHERE id = %s", (product_id,))
-            if not cur.fetchone():
+async def update_product(product_id: int, product: ProductCreate, _=Depends(get_current_user_id)):
+    async with get_db_async(write=True) as conn:
+        async with conn.cursor() as cur:
+            await cur.execute("SELECT id FROM products WHERE id = %s", (product_id,))
+            if not await cur.fetchone():
                 raise HTTPException(status_code=404, detail="Product not found")
-            cur.execute(
+            await cur.execute(
                 "UPDATE products SET item_code=%s, item_description=%s, item_group=%s WHERE id=%s",
                 (product.item_code, product.item_description, product.item_group or None, product_id)
             )
-            cur.execute("SELECT id, item_code, item_description, item_group FROM products WHERE id = %s", (product_id,))
-            row = cur.fetchone()
+            version = await cache_versions.bump(cur, "products")
+            await cur.execute("SELECT id, item_code, item_description, item_group FROM products WHERE id = %s", (product_id,))
+            row = await cur.fetchone()
+    await product_search.apply_changes(version, upserts=[_product_tuple(row)])
     return ProductResponse(id=row["id"], item_code=row["item_code"], item_description=row["item_description"], item_group=row.get("item_group"))
 
 @router.delete("/{product_id}")
-def delete_product(product_id: int, authorization: str = Header(None, alias="Authorization")):
-    get_current_user_id(authorization)
-    with get_db() as conn:
-        with conn.cursor() as cur:
-            cur.execute("DELETE FROM products WHERE id = %s", (product_id,))
+async def delete_product(product_id: int, _=Depends(get_current_user_id)):
+    async with get_db_async() as conn:
+        async with conn.cursor() as cur:
+            await cur.execute("DELETE FROM products WHERE id = %s", (product_id,))
             if cur.rowcount == 0:
                 raise HTTPException(status_code=404, detail="Product not found")
+            version = await cache_versions.bump(cur, "products")
+    await product_search.apply_changes(version, deleted=[product_id])
     return {"ok": True}
@@ -0,0 +1,83 @@
+from datetime import date
+from typing import List, Literal, Optional
+from fastapi import APIRouter, Depends, Query
+from app.async_database import get_db_async
+from app.schemas import DailyPassCount, QtyTotal
+from app.routes.users import get_current_user_id
+
+# Dashboards: read only the daily rollup tables maintained by app.reports
+router = APIRouter(prefix="/reports", tags=["reports"])
+
+def _filters(date_from, date_to, status):
+    where, params = [], []
+    if date_from:
+        where.append("r.pass_date >= %s")
+        params.append(date_from)
+    if date_to:
+        where.append("r.pass_date <= %s")
+        params.append(date_to)
+    statuses = [s.strip().lower() for s in (status or []) if s.strip()]
+    if statuses:
+        where.append(f"r.status IN ({', '.join(['%s'] * len(statuses))})")
+        params.extend(statuses)
+    return (" WHERE " + " AND ".join(where)) if where else "", params
+
+async def _fetch(sql, params):
+    async with get_db_async() as conn:
+        async with conn.cursor() as cur:
+            await cur.execute(sql, tuple(params))
+            return await cur.fetchall()
+
+@router.get("/daily-passes", response_model=List[DailyPassCount])
+async def daily_passes(
+    date_from: Optional[date] = Query(None, alias="from"),
+    date_to: Optional[date] = Query(None, alias="to"),
+    status: Optional[List[str]] = Query(None, description="Repeat for several"),
+    _=Depends(get_current_user_id),
+):
+    """Passes per day by status and in_or_out, oldest day first."""
+    where, params = _filters(date_from, date_to, status)
+    rows = await _fetch(
+        f"SELECT r.pass_date, r.status, r.in_or_out, r.passes FROM report_daily_passes r{where}"
+        + (" AND" if where else " WHERE") + " r.passes > 0 ORDER BY r.pass_date, r.status, r.in_or_out",
+        params,
+    )
+    return [DailyPassCount(**r) for r in rows]
+
+@router.get("/item-qty", response_model=List[QtyTotal])
+async def item_qty(
+    by: Literal["item_code", "item_group"] = "item_code",
+    date_from: Optional[date] = Query(None, alias="from"),
+    date_to: Optional[date] = Query(None, alias="to"),
+    status: Optional[List[str]] = Query(None, description="Repeat for several, e.g. status=approved"),
+    limit: int = Query(50, ge=1, le=1000),
+    _=Depends(get_current_user_id),
+):
+    """Total qty and item lines per item code or per item group (current product grouping), largest first."""
+    where, params = _filters(date_from, date_to, status)
+    if by == "item_code":
+        sql = f"SELECT r.item_code AS `key`, SUM(r.qty) AS total_qty, SUM(r.line_count) AS total_lines FROM report_daily_items r{where} GROUP BY r.item_code"
+    else:
+        sql = (
+            "SELECT COALESCE(p.item_group, '') AS `key`, SUM(r.qty) AS total_qty, SUM(r.line_count) AS total_lines "
+            f"FROM report_daily_items r LEFT JOIN products p ON p.item_code = r.item_code{where} GROUP BY 1"
+        )
+    rows = await _fetch(sql + " HAVING total_lines > 0 ORDER BY total_qty DESC LIMIT %s", params + [limit])
+    return [QtyTotal(key=r["key"], qty=int(r["total_qty"]), lines=int(r["total_lines"])) for r in rows]
+
+@router.get("/top-destinations", response_model=List[QtyTotal])
+async def top_destinations(
+    date_from: Optional[date] = Query(None, alias="from"),
+    date_to: Optional[date] = Query(None, alias="to"),
+    status: Optional[List[str]] = Query(None, description="Repeat for several, e.g. status=approved"),
+    limit: int = Query(10, ge=1, le=100),
+    _=Depends(get_current_user_id),
+):
+    """Destinations by total qty shipped, largest first."""
+    where, params = _filters(date_from, date_to, status)
+    rows = await _fetch(
+        f"SELECT r.destination AS `key`, SUM(r.qty) AS total_qty, SUM(r.line_count) AS total_lines FROM report_daily_destinations r{where} "
+        "GROUP BY r.destination HAVING total_lines > 0 ORDER BY total_qty DESC LIMIT %s",
+        params + [limit],
+    )
+    return [QtyTotal(key=r["key"], qty=int(r["total_qty"]), lines=int(r["total_lines"])) for r in rows]
@@ -1,100 +1,136 @@
-from fastapi import APIRouter, Header, HTTPException, Depends
-from app.database import get_db
+import hashlib
+import os
+import time
+from fastapi import APIRouter, Header, HTTPException, Depends, Request
+from app.async_database import get_db_async
 from app.schemas import UserCreate, UserUpdate, UserResponse
-from app.routes.auth import verify_token, hash_password
+from app.routes.auth import verify_token, hash_password_async
+from app.ttl_cache import TTLCache
 router = APIRouter(prefix="/users", tags=["users"])
 
 VALID_ROLES = {"scan_only", "encoding", "admin"}
 
+# Verified JWT claims keyed by sha256(token), so repeat requests skip signature checks
+_token_cache = TTLCache(maxsize=int(os.getenv("AUTH_TOKEN_CACHE_SIZE", "10000")), ttl=float(os.getenv("AUTH_TOKEN_CACHE_TTL", "300")))
+# DB roles for legacy tokens without a valid role claim; cleared on update_user / delete_user
+_role_cache = TTLCache(maxsize=int(os.getenv("AUTH_ROLE_CACHE_SIZE", "1000")), ttl=float(os.getenv("AUTH_ROLE_CACHE_TTL", "60")))
+
 def _normalize_role(role: str) -> str:
     """Treat legacy 'user' and 'gatepass_only' as encoding."""
     if role in ("user", "gatepass_only"):
         return "encoding"
     return role or "encoding"
 
-def get_current_user(authorization: str = Header(None, alias="Authorization")):
-    """Returns (user_id_str, role). Role is one of scan_only, encoding, admin."""
+def _verify_token_cached(token: str):
+    key = hashlib.sha256(token.encode("utf-8")).digest()
+    payload = _token_cache.get(key)
+    if payload is None:
+        payload = verify_token(token)
+        if not payload:
+            return None
+        exp = payload.get("exp")
+        _token_cache.set(key, payload, ttl=exp - time.time() if exp else None)
+    return payload
+
+async def _role_from_db(uid) -> str:
+    role = _role_cache.get(uid)
+    if role is None:
+        async with get_db_async() as conn:
+            async with conn.cursor() as cur:
+                await cur.execute("SELECT role FROM users WHERE id = %s", (uid,))
+                row = await cur.fetchone()
+        role = _normalize_role(row["role"] if row else "encoding")
+        _role_cache.set(uid, role)
+    return role
+
+async def resolve_user(authorization: str):
+    """Returns (user_id_str, role) for an Authorization header value. Role is one of scan_only, encoding, admin."""
     if not authorization or not authorization.startswith("Bearer "):
         raise HTTPException(status_code=401, detail="Not authenticated")
-    payload = verify_token(authorization.split(" ")[1])
+    payload = _verify_token_cached(authorization.split(" ")[1])
     if not payload:
         raise HTTPException(status_code=401, detail="Invalid token")
     uid = payload.get("sub")
     role = _normalize_role(payload.get("role") or "")
     if not role or role not in VALID_ROLES:
-        with get_db() as conn:
-            with conn.cursor() as cur:
-                cur.execute("SELECT role FROM users WHERE id = %s", (uid,))
-                row = cur.fetchone()
-                role = _normalize_role(row["role"] if row else "encoding")
+        role = await _role_from_db(uid)
     return uid, role
 
-def get_current_user_id(authorization: str = Header(None, alias="Authorization")):
-    uid, _ = get_current_user(authorization)
-    return uid
+async def get_current_user(request: Request, authorization: str = Header(None, alias="Authorization")):
+    """Dependency: (user_id_str, role), resolved once per request and kept on request.state.
+
+    async so it runs on the event loop: a sync dependency would cost every route a threadpool hop.
+    """
+    user = getattr(request.state, "user", None)
+    if user is None:
+        user = request.state.user = await resolve_user(authorization)
+    return user
+
+async def get_current_user_id(user=Depends(get_current_user)):
+    return user[0]
 
 def role_required(*allowed_roles: str):
-    def dep(authorization: str = Header(None, alias="Authorization")):
-        _, role = get_current_user(authorization)
-        if role not in allowed_roles:
+    async def dep(user=Depends(get_current_user)):
+        if user[1] not in allowed_roles:
             raise HTTPException(status_code=403, detail="Not allowed for your role")
     return dep
 
 @router.get("", response_model=list[UserResponse])
-def list_users(authorization: str = Header(None, alias="Authorization"), _=Depends(role_required("encoding", "admin"))):
-    get_current_user_id(authorization)
-    with get_db() as conn:
-        with conn.cursor() as cur:
-            cur.execute("SELECT id, username, full_name, role FROM users ORDER BY id")
-            rows = cur.fetchall()
+async def list_users(_=Depends(role_required("encoding", "admin"))):
+    async with get_db_async() as conn:
+        async with conn.cursor() as cur:
+            await cur.execute("SELECT id, username, full_name, role FROM users ORDER BY id")
+            rows = await cur.fetchall()
     return [UserResponse(id=r["id"], username=r["username"], full_name=r["full_name"], role=r["role"]) for r in rows]
 
 @router.post("", response_model=UserResponse)
-def create_user(user: UserCreate, authorization: str = Header(None, alias="Authorization"), _=Depends(role_required("encoding", "admin"))):
-    get_current_user_id(authorization)
+async def create_user(user: UserCreate, _=Depends(role_required("encoding", "admin"))):
     role = user.role if user.role in VALID_ROLES else "encoding"
-    with get_db() as conn:
-        with conn.cursor() as cur:
-            cur.execute("SELECT id FROM users WHERE username = %s", (user.username,))
-            if cur.fetchone():
+    # Hash before taking a connection: bcrypt takes far longer than the queries
+    password_hash = await hash_password_async(user.password)
+    async with get_db_async(write=True) as conn:
+        async with conn.cursor() as cur:
+            await cur.execute("SELECT id FROM users WHERE username = %s", (user.username,))
+            if await cur.fetchone():
                 raise HTTPException(status_code=400, detail="Username already exists")
-            cur.execute(
+            await cur.execute(
                 "INSERT INTO users (username, password_hash, full_name, role) VALUES (%s, %s, %s, %s)",
-                (user.username, hash_password(user.password), user.full_name or "", role)
+                (user.username, password_hash, user.full_name or "", role)
             )
-            cur.execute("SELECT id, username, full_name, role FROM users WHERE id = LAST_INSERT_ID()")
-            row = cur.fetchone()
+            await cur.execute("SELECT id, username, full_name, role FROM users WHERE id = LAST_INSERT_ID()")
+            row = await cur.fetchone()
     return UserResponse(id=row["id"], username=row["username"], full_name=row["full_name"], role=row["role"] or role)
 
 @router.put("/{user_id}", response_model=UserResponse)
-def update_user(user_id: int, user: UserUpdate, authorization: str = Header(None, alias="Authorization"), _=Depends(role_required("encoding", "admin"))):
-    get_current_user_id(authorization)
-    with get_db() as conn:
-        with conn.cursor() as cur:
-            cur.execute("SELECT id FROM users WHERE id = %s", (user_id,))
-            if not cur.fetchone():
+async def update_user(user_id: int, user: UserUpdate, _=Depends(role_required("encoding", "admin"))):
+    password_hash = await hash_password_async(user.password) if user.password else None
+    async with get_db_async(write=True) as conn:
+        async with conn.cursor() as cur:
+            await cur.execute("SELECT id FROM users WHERE id = %s", (user_id,))
+            if not await cur.fetchone():
                 raise HTTPException(status_code=404, detail="User not found")
             role = user.role if user.role in VALID_ROLES else "encoding"
-            if user.password:
-                cur.execute(
+            if password_hash:
+                await cur.execute(
                     "UPDATE users SET username=%s, password_hash=%s, full_name=%s, role=%s WHERE id=%s",
-                    (user.username, hash_password(user.password), user.full_name or "", role, user_id)
+                    (user.username, password_hash, user.full_name or "", role, user_id)
                 )
             else:
-                cur.execute(
+                await cur.execute(
                     "UPDATE users SET username=%s, full_name=%s, role=%s WHERE id=%s",
                     (user.username, user.full_name or "", role, user_id)
                 )
-            cur.execute("SELECT id, username, full_name, role FROM users WHERE id = %s", (user_id,))
-            row = cur.fetchone()
+            await cur.execute("SELECT id, username, full_name, role FROM users WHERE id = %s", (user_id,))
+            row = await cur.fetchone()
+    _role_cache.pop(str(user_id))
     return UserResponse(id=row["id"], username=row["username"], full_name=row["full_name"], role=row["role"])
 
 @router.delete("/{user_id}")
-def delete_user(user_id: int, authorization: str = Header(None, alias="Authorization"), _=Depends(role_required("encoding", "admin"))):
-    get_current_user_id(authorization)
-    with get_db() as conn:
-        with conn.cursor() as cur:
-            cur.execute("DELETE FROM users WHERE id = %s", (user_id,))
+async def delete_user(user_id: int, _=Depends(role_required("encoding", "admin"))):
+    async with get_db_async() as conn:
+        async with conn.cursor() as cur:
+            await cur.execute("DELETE FROM users WHERE id = %s", (user_id,))
             if cur.rowcount == 0:
                 raise HTTPException(status_code=404, detail="User not found")
+    _role_cache.pop(str(user_id))
     return {"ok": True}
@@ -1,5 +1,5 @@
-from pydantic import BaseModel
-from typing import List, Optional
+from pydantic import BaseModel, Field
+from typing import List, Literal, Optional
 from datetime import date
 
 class UserCreate(BaseModel):
@@ -42,6 +42,13 @@ class ProductsBulkResponse(BaseModel):
     skipped_codes: List[str] = []
 
 
+class ProductsImportResponse(BaseModel):
+    created: int
+    updated: int
+    skipped: int
+    invalid: int
+
+
 class ProductResponse(BaseModel):
     id: int
     item_code: str
@@ -106,11 +113,46 @@ class GatePassResponse(BaseModel):
     date_approved: Optional[date] = None
     items: List[GatePassItemResponse]
 
+class GatePassScanResponse(BaseModel):
+    """Fields the gate scanner page renders; served from the scan cache."""
+    id: int
+    gp_number: str
+    pass_date: date
+    authorized_name: str
+    in_or_out: Optional[str] = None
+    status: Optional[str] = None
+    purpose_delivery: bool
+    purpose_return: bool
+    purpose_inter_warehouse: bool
+    purpose_others: bool
+    vehicle_type: Optional[str]
+    plate_no: Optional[str]
+    prepared_by: Optional[str]
+    time_out: Optional[str]
+    time_in: Optional[str]
+    rejected_remarks: Optional[str] = None
+    items: List[GatePassItemResponse]
+
 class GatePassStatusUpdate(BaseModel):
     status: str
     rejected_remarks: Optional[str] = None
     approved_by: Optional[str] = None  # set when admin approves (e.g. current user full name)
 
+class GatePassStatusBatch(GatePassStatusUpdate):
+    ids: List[int] = Field(min_length=1, max_length=500)
+
+class GatePassStatusOutcome(BaseModel):
+    """Per-id result of a batch status change; gate_pass is only returned for passes that were updated."""
+    id: int
+    outcome: Literal["updated", "unchanged", "not_found"]
+    status: Optional[str] = None
+    gate_pass: Optional[GatePassResponse] = None
+
+class GatePassPrintBatch(BaseModel):
+    """Gate passes to print into one PDF, in this order."""
+    ids: List[int] = Field(min_length=1, max_length=500)
+    variant: Literal["form", "release"] = "form"
+
 
 class LoginRequest(BaseModel):
     username: str
@@ -120,3 +162,15 @@ class TokenResponse(BaseModel):
     access_token: str
     token_type: str = "bearer"
     user: UserResponse
+
+class DailyPassCount(BaseModel):
+    pass_date: date
+    status: str
+    in_or_out: str
+    passes: int
+
+class QtyTotal(BaseModel):
+    """One row of an item-code, item-group or destination report; key is "" for blank values."""
+    key: str
+    qty: int
+    lines: int
@@ -0,0 +1,136 @@
+"""
+Production launcher: python -m app.server (instead of running uvicorn directly).
+
+Applies pending migrations once, then starts WEB_CONCURRENCY uvicorn workers on one shared socket
+(default: one per CPU; always one with DB_BACKEND=sqlite). Each worker opens its DB connections and
+fills its caches before it accepts connections (see app.main), so no request lands on a cold worker.
+
+Per-worker pools are sized so the workers together match the machine: the bcrypt and PDF render
+process pools share the CPUs between workers, the MySQL pools of all workers together stay within
+MYSQL_CONNECTION_BUDGET connections (below MySQL's default max_connections of 151), and the threadpool
+is sized to the DB connections a worker can hold (threads beyond that would only queue for a
+connection). Any of BCRYPT_WORKERS, PRINT_WORKERS, MYSQL_POOL_SIZE, MYSQL_POOL_MAX_OVERFLOW and
+THREADPOOL_SIZE set in the environment wins.
+
+Event streams must see every worker's changes, so with more than one worker EVENTS_BACKEND=memory
+is switched to mysql.
+
+On SIGTERM (or Ctrl+C) workers stop accepting connections, end open event streams (clients
+reconnect with Last-Event-ID), finish in-flight requests for up to GRACEFUL_TIMEOUT seconds and then
+close their pools, so a rolling restart doesn't drop scans in progress.
+
+    cd backend
+    python -m app.server --host 0.0.0.0 --port 8000
+    WEB_CONCURRENCY=4 python -m app.server
+"""
+import argparse
+import asyncio
+import logging
+import os
+
+import uvicorn
+from uvicorn.supervisors import Multiprocess
+
+from app import events
+from app.async_database import DB_MODE, close_async_pool
+from app.database import DB_BACKEND
+from app.migrations import migrate
+
+GRACEFUL_TIMEOUT = float(os.getenv("GRACEFUL_TIMEOUT", "30"))
+# MySQL connections all workers together may hold (pymysql and aiomysql pools, at full overflow)
+MYSQL_CONNECTION_BUDGET = int(os.getenv("MYSQL_CONNECTION_BUDGET", "120"))
+
+logger = logging.getLogger("app.server")
+
+
+class Server(uvicorn.Server):
+    """uvicorn server that ends event streams as soon as shutdown starts.
+
+    uvicorn waits for every open response before shutting down, and an event stream stays open for
+    EVENTS_STREAM_SECONDS; without this the drain would always run into GRACEFUL_TIMEOUT.
+    """
+
+    def handle_exit(self, sig, frame):
+        if not self.should_exit:
+            events.drain()
+        super().handle_exit(sig, frame)
+
+
+def worker_count(requested=None) -> int:
+    workers = requested or int(os.getenv("WEB_CONCURRENCY", "0")) or os.cpu_count() or 1
+    if DB_BACKEND == "sqlite" and workers > 1:
+        logger.warning("DB_BACKEND=sqlite supports a single worker; starting 1 instead of %d", workers)
+        return 1
+    return workers
+
+
+def worker_settings(workers: int) -> dict:
+    """Per-worker pool sizes for `workers` workers on this machine (not overriding what the environment sets)."""
+    cpus_per_worker = max(1, (os.cpu_count() or 1) // workers)
+    settings = {
+        "BCRYPT_WORKERS": os.getenv("BCRYPT_WORKERS", str(min(4, cpus_per_worker))),
+        "PRINT_WORKERS": os.getenv("PRINT_WORKERS", str(min(4, cpus_per_worker))),
+    }
+    if DB_BACKEND == "sqlite":
+        connections = int(os.getenv("SQLITE_READERS", "8")) + 1
+    else:
+        # Each worker has a pymysql pool (users/auth, and everything with DB_MODE=sync) and, unless
+        # DB_MODE=sync, an aiomysql pool; both hold up to MYSQL_POOL_SIZE + MYSQL_POOL_MAX_OVERFLOW
+        pools = workers * (1 if DB_MODE == "sync" else 2)
+        per_pool = min(30, max(2, MYSQL_CONNECTION_BUDGET // pools))
+        size = int(os.getenv("MYSQL_POOL_SIZE", str(min(10, max(1, per_pool // 3)))))
+        overflow = int(os.getenv("MYSQL_POOL_MAX_OVERFLOW", str(max(0, per_pool - size))))
+        settings.update(MYSQL_POOL_SIZE=str(size), MYSQL_POOL_MAX_OVERFLOW=str(overflow))
+        connections = size + overflow
+        if pools * connections > MYSQL_CONNECTION_BUDGET:
+            logger.warning("%d worker(s) may open %d MySQL connections, over MYSQL_CONNECTION_BUDGET=%d",
+                           workers, pools * connections, MYSQL_CONNECTION_BUDGET)
+    settings["THREADPOOL_SIZE"] = os.getenv("THREADPOOL_SIZE", str(connections))
+    return settings
+
+
+async def _migrate():
+    try:
+        applied = await migrate()
+    finally:
+        await close_async_pool()
+    logger.info("Applied %d migration(s)", len(applied)) if applied else logger.info("Schema is current")
+
+
+def main():
+    logging.basicConfig(level=logging.INFO, format="%(levelname)s:     %(message)s")
+    parser = argparse.ArgumentParser(description="Run the API with migrations applied once and warmed-up workers")
+    parser.add_argument("--host", default=os.getenv("HOST", "127.0.0.1"))
+    parser.add_argument("--port", type=int, default=int(os.getenv("PORT", "8000")))
+    parser.add_argument("--workers", type=int, help="worker processes (default: WEB_CONCURRENCY or the CPU count)")
+    parser.add_argument("--log-level", default="info")
+    args = parser.parse_args()
+
+    asyncio.run(_migrate())
+    workers = worker_count(args.workers)
+    settings = worker_settings(workers)
+    # Workers inherit the environment (uvicorn spawns them) and must not migrate again
+    if workers > 1 and events.EVENTS_BACKEND == "memory":
+        logger.info("EVENTS_BACKEND=memory only reaches one worker's streams; using mysql for %d workers", workers)
+        settings["EVENTS_BACKEND"] = "mysql"
+    os.environ.update(settings, MIGRATE_ON_STARTUP="0")
+    logger.info("Starting %d worker(s): %s", workers, ", ".join(f"{k}={v}" for k, v in settings.items()))
+
+    config = uvicorn.Config(
+        "app.main:app",
+        host=args.host,
+        port=args.port,
+        workers=workers,
+        log_level=args.log_level,
+        timeout_graceful_shutdown=GRACEFUL_TIMEOUT,
+    )
+    server = Server(config)
+    if workers > 1:
+        sock = config.bind_socket()
+        Multiprocess(config, target=server.run, sockets=[sock]).run()
+    else:
+        server.run()
+
+
+if __name__ == "__main__":
+    main()
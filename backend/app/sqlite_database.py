@@ -0,0 +1,632 @@
+"""
+Embedded SQLite storage (DB_BACKEND=sqlite) for single-box gate houses that don't run a MySQL server.
+
+app.database.get_db and app.async_database.get_db_async dispatch here, so routes run unchanged: the
+connections and cursors mimic pymysql/aiomysql (dict rows, %s parameters, rowcount/lastrowid, commit
+on success), each statement is translated once (cached) for the few MySQL-only constructs the app
+uses, and the MySQL functions it calls (LAST_INSERT_ID, REGEXP, CURDATE, NOW, GET_LOCK) are
+registered on every connection. SQLite errors are re-raised as the matching pymysql errors.
+
+The database runs in WAL mode: readers never block the writer or each other. Each transaction
+starts on a pooled read-only connection (SQLITE_READERS) and moves to the single writer
+connection at its first write (or SELECT ... FOR UPDATE), which it holds until commit. Reads before
+that point don't share the writer's snapshot, so check-then-write transactions open with
+get_db(write=True) and run on the writer (BEGIN IMMEDIATE) from their first statement. One writer
+at a time is what SQLite allows anyway; queuing in-process avoids busy retries. Statements are
+prepared once per connection and reused from sqlite3's statement cache.
+
+PRODUCT_SEARCH_INDEX=mysql (FULLTEXT) is not available on SQLite; use the default memory index.
+"""
+import asyncio
+import os
+import queue
+import re
+import sqlite3
+import threading
+import time
+import weakref
+from contextlib import asynccontextmanager, contextmanager
+from datetime import date, datetime
+from functools import lru_cache
+from pathlib import Path
+from pymysql import err as mysql_err
+from starlette.concurrency import run_in_threadpool
+from app.metrics import record_query
+
+SQLITE_PATH = os.getenv("SQLITE_PATH", str(Path(__file__).resolve().parent.parent / "gate_pass.db"))
+# Read-only connections per process; a transaction holds one until it ends or starts writing
+SQLITE_READERS = int(os.getenv("SQLITE_READERS", "8"))
+# Seconds to wait for the writer (in this process) or a database lock (held by another process)
+SQLITE_BUSY_TIMEOUT = float(os.getenv("SQLITE_BUSY_TIMEOUT", "30"))
+# Prepared statements kept per connection
+STATEMENT_CACHE_SIZE = 512
+
+# Migrations up to this version are part of SCHEMA; later ones need a NNN_name.sqlite.sql file (see app.migrations)
+SCHEMA_VERSION = 12
+
+SCHEMA = [
+    """
+    CREATE TABLE IF NOT EXISTS users (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        username VARCHAR(100) COLLATE NOCASE UNIQUE NOT NULL,
+        password_hash VARCHAR(255) NOT NULL,
+        full_name VARCHAR(255),
+        role VARCHAR(50) DEFAULT 'user',
+        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS products (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        item_code VARCHAR(100) COLLATE NOCASE UNIQUE NOT NULL,
+        item_description VARCHAR(500) NOT NULL,
+        item_group VARCHAR(100),
+        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+    )
+    """,
+    "CREATE INDEX IF NOT EXISTS idx_products_item_group_code ON products (item_group, item_code)",
+    """
+    CREATE TABLE IF NOT EXISTS gate_passes (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        gp_number VARCHAR(50) UNIQUE NOT NULL,
+        pass_date DATE NOT NULL,
+        authorized_name VARCHAR(255) NOT NULL,
+        in_or_out VARCHAR(10) DEFAULT 'out',
+        status VARCHAR(20) DEFAULT 'pending',
+        rejected_remarks TEXT,
+        purpose_delivery TINYINT DEFAULT 1,
+        purpose_return TINYINT DEFAULT 0,
+        purpose_inter_warehouse TINYINT DEFAULT 0,
+        purpose_others TINYINT DEFAULT 0,
+        vehicle_type VARCHAR(100),
+        plate_no VARCHAR(50),
+        attention VARCHAR(255),
+        prepared_by VARCHAR(255),
+        checked_by VARCHAR(255),
+        recommended_by VARCHAR(255),
+        approved_by VARCHAR(255),
+        time_out VARCHAR(20),
+        time_in VARCHAR(20),
+        date_approved DATE NULL,
+        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+    )
+    """,
+    "CREATE INDEX IF NOT EXISTS idx_gate_passes_status_id ON gate_passes (status, id)",
+    "CREATE INDEX IF NOT EXISTS idx_gate_passes_in_or_out_id ON gate_passes (in_or_out, id)",
+    "CREATE INDEX IF NOT EXISTS idx_gate_passes_pass_date_id ON gate_passes (pass_date, id)",
+    "CREATE INDEX IF NOT EXISTS idx_gate_passes_authorized_name ON gate_passes (authorized_name)",
+    "CREATE INDEX IF NOT EXISTS idx_gate_passes_plate_no ON gate_passes (plate_no)",
+    """
+    CREATE TABLE IF NOT EXISTS gate_pass_items (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        gate_pass_id INT NOT NULL,
+        item_code VARCHAR(100),
+        item_description VARCHAR(500) NOT NULL,
+        qty INT NOT NULL,
+        ref_doc_no VARCHAR(100),
+        destination VARCHAR(255),
+        FOREIGN KEY (gate_pass_id) REFERENCES gate_passes(id) ON DELETE CASCADE
+    )
+    """,
+    "CREATE INDEX IF NOT EXISTS idx_gate_pass_items_gate_pass_id_id ON gate_pass_items (gate_pass_id, id)",
+    """
+    CREATE TABLE IF NOT EXISTS gp_sequences (
+        year INT PRIMARY KEY,
+        last_seq INT NOT NULL
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS cache_versions (
+        name VARCHAR(50) PRIMARY KEY,
+        version BIGINT NOT NULL
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS report_daily_passes (
+        pass_date DATE NOT NULL,
+        status VARCHAR(20) NOT NULL,
+        in_or_out VARCHAR(10) NOT NULL,
+        passes INT NOT NULL,
+        PRIMARY KEY (pass_date, status, in_or_out)
+    ) WITHOUT ROWID
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS report_daily_items (
+        pass_date DATE NOT NULL,
+        status VARCHAR(20) NOT NULL,
+        item_code VARCHAR(100) NOT NULL,
+        qty BIGINT NOT NULL,
+        line_count INT NOT NULL,
+        PRIMARY KEY (pass_date, status, item_code)
+    ) WITHOUT ROWID
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS report_daily_destinations (
+        pass_date DATE NOT NULL,
+        status VARCHAR(20) NOT NULL,
+        destination VARCHAR(255) NOT NULL,
+        qty BIGINT NOT NULL,
+        line_count INT NOT NULL,
+        PRIMARY KEY (pass_date, status, destination)
+    ) WITHOUT ROWID
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS gate_pass_events (
+        id BIGINT PRIMARY KEY,
+        type VARCHAR(20) NOT NULL,
+        data MEDIUMTEXT NOT NULL,
+        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+    )
+    """,
+    "CREATE INDEX IF NOT EXISTS idx_gate_pass_events_created_at ON gate_pass_events (created_at)",
+]
+
+# DATE / TIMESTAMP columns come back as date / datetime objects, like pymysql
+sqlite3.register_adapter(date, date.isoformat)
+sqlite3.register_adapter(datetime, lambda value: value.isoformat(" "))
+sqlite3.register_converter("DATE", lambda raw: date.fromisoformat(raw.decode()))
+sqlite3.register_converter("TIMESTAMP", lambda raw: datetime.fromisoformat(raw.decode()))
+sqlite3.register_converter("DATETIME", lambda raw: datetime.fromisoformat(raw.decode()))
+# No BLOB columns: bytes (e.g. orjson output) are stored as text, as MySQL does for TEXT columns
+sqlite3.register_adapter(bytes, lambda value: value.decode("utf-8"))
+
+_WRITE_RE = re.compile(r"\s*(INSERT|UPDATE|DELETE|REPLACE|CREATE|ALTER|DROP)\b", re.IGNORECASE)
+_FOR_UPDATE_RE = re.compile(r"\s+FOR\s+UPDATE\s*$", re.IGNORECASE)
+_INSERT_IGNORE_RE = re.compile(r"^\s*INSERT\s+IGNORE\b", re.IGNORECASE)
+# ON DUPLICATE KEY UPDATE, optionally after a row alias: VALUES (...) AS new ... col = new.col (MySQL 8.0.19+)
+_ON_DUPLICATE_RE = re.compile(r"(?:\s+AS\s+(\w+))?\s+ON\s+DUPLICATE\s+KEY\s+UPDATE\b", re.IGNORECASE)
+_INTERVAL_RE = re.compile(r"\bNOW\(\)\s*-\s*INTERVAL\s+(%s|\d+)\s+(SECOND|MINUTE|HOUR|DAY)\b", re.IGNORECASE)
+_LIKE_RE = re.compile(r"\bLIKE\s+%s", re.IGNORECASE)
+_INSERT_TABLE_RE = re.compile(r"^\s*INSERT\s+(?:OR\s+\w+\s+)?INTO\s+[`\"]?(\w+)", re.IGNORECASE)
+
+
+@lru_cache(maxsize=2048)
+def translate(sql: str):
+    """(SQLite statement, is_write) for a MySQL-dialect statement with %s parameters."""
+    text = sql.strip()
+    write = bool(_WRITE_RE.match(text))
+    if _FOR_UPDATE_RE.search(text):
+        # Row locks become the writer lock: the whole transaction runs on the single writer
+        text = _FOR_UPDATE_RE.sub("", text)
+        write = True
+    text = _INSERT_IGNORE_RE.sub("INSERT OR IGNORE", text)
+    match = _ON_DUPLICATE_RE.search(text)
+    if match:
+        update = text[match.end():]
+        if match.group(1):
+            update = re.sub(rf"\b{match.group(1)}\.", "excluded.", update, flags=re.IGNORECASE)
+        text = text[:match.start()] + " ON CONFLICT DO UPDATE SET" + update
+    text = _INTERVAL_RE.sub(lambda m: f"datetime('now', '-' || {m.group(1)} || ' {m.group(2).lower()}s')", text)
+    # MySQL's LIKE escapes with backslash by default; SQLite has no default escape character
+    text = _LIKE_RE.sub(r"LIKE %s ESCAPE '\\'", text)
+    return text.replace("%s", "?").replace("%%", "%"), write
+
+
+def _now(fsp=0):
+    # NOW() / NOW(6): local time, like MySQL's session time zone on a server in local time
+    return datetime.now().isoformat(" ", "microseconds" if fsp else "seconds")
+
+
+def _mysql_error(e: sqlite3.Error):
+    """The pymysql exception (with MySQL error code) callers already handle for this SQLite error."""
+    msg = str(e)
+    if isinstance(e, sqlite3.IntegrityError):
+        return mysql_err.IntegrityError(1062 if "UNIQUE" in msg else 1452 if "FOREIGN KEY" in msg else 1048, msg)
+    for text, code in (("no such table", 1146), ("duplicate column", 1060), ("no such index", 1091), ("no such column", 1054)):
+        if text in msg:
+            return mysql_err.ProgrammingError(code, msg)
+    if "already exists" in msg:
+        return mysql_err.ProgrammingError(1061 if msg.startswith("index") else 1050, msg)
+    if "syntax error" in msg:
+        return mysql_err.ProgrammingError(1064, msg)
+    if "locked" in msg or "busy" in msg:
+        return mysql_err.OperationalError(1205, msg)
+    return mysql_err.OperationalError(2000, msg)
+
+
+def _dict_row(cursor, row):
+    return dict(zip([d[0] for d in cursor.description], row))
+
+
+def _regexp(pattern, value):
+    return value is not None and re.search(pattern, str(value)) is not None
+
+
+class _RawConnection:
+    """A sqlite3 connection plus its LAST_INSERT_ID() state."""
+
+    def __init__(self, readonly):
+        self.last_insert_id = 0
+        self._autoincrement = {}  # table -> has an AUTOINCREMENT id column
+        self.conn = sqlite3.connect(
+            SQLITE_PATH, timeout=SQLITE_BUSY_TIMEOUT, isolation_level=None, check_same_thread=False,
+            detect_types=sqlite3.PARSE_DECLTYPES, cached_statements=STATEMENT_CACHE_SIZE,
+        )
+        self.conn.row_factory = _dict_row
+        for pragma in ("journal_mode = WAL", "synchronous = NORMAL", "foreign_keys = ON", "temp_store = MEMORY",
+                       "cache_size = -32000", "mmap_size = 268435456"):
+            self.conn.execute(f"PRAGMA {pragma}")
+        if readonly:
+            self.conn.execute("PRAGMA query_only = ON")
+        self.conn.create_function("LAST_INSERT_ID", -1, self._last_insert_id)
+        self.conn.create_function("REGEXP", 2, _regexp, deterministic=True)
+        self.conn.create_function("CURDATE", 0, lambda: date.today().isoformat())
+        self.conn.create_function("NOW", -1, _now)
+        # Named locks guard concurrent migrators on MySQL; SQLite's writer lock already serializes them
+        self.conn.create_function("GET_LOCK", 2, lambda name, timeout: 1)
+        self.conn.create_function("RELEASE_LOCK", 1, lambda name: 1)
+
+    def has_autoincrement(self, table):
+        """Whether table has an AUTOINCREMENT id (MySQL only sets LAST_INSERT_ID() for AUTO_INCREMENT tables)."""
+        if table not in self._autoincrement:
+            row = self.conn.execute("SELECT sql FROM sqlite_master WHERE type = 'table' AND name = ?", (table,)).fetchone()
+            self._autoincrement[table] = bool(row) and "AUTOINCREMENT" in (row["sql"] or "").upper()
+        return self._autoincrement[table]
+
+    def _last_insert_id(self, *args):
+        # LAST_INSERT_ID(expr) stores expr for the next LAST_INSERT_ID(), as in MySQL
+        if args:
+            self.last_insert_id = args[0]
+            return args[0]
+        return self.last_insert_id
+
+
+class _Engine:
+    """Per-process reader pool and single writer for SQLITE_PATH."""
+
+    def __init__(self):
+        # Created first: switches the file to WAL before readers open it
+        self._writer = _RawConnection(readonly=False)
+        self._writer_lock = threading.Lock()
+        self._readers = queue.LifoQueue()
+        self._reader_count = 0
+        self._count_lock = threading.Lock()
+        self.writer_waits = 0
+        self.writer_wait_seconds = 0.0
+
+    def acquire_reader(self):
+        try:
+            return self._readers.get_nowait()
+        except queue.Empty:
+            pass
+        with self._count_lock:
+            if self._reader_count < SQLITE_READERS:
+                self._reader_count += 1
+                create = True
+            else:
+                create = False
+        if create:
+            try:
+                return _RawConnection(readonly=True)
+            except Exception:
+                with self._count_lock:
+                    self._reader_count -= 1
+                raise
+        try:
+            return self._readers.get(timeout=SQLITE_BUSY_TIMEOUT)
+        except queue.Empty:
+            raise mysql_err.OperationalError(1205, f"No SQLite reader free after {SQLITE_BUSY_TIMEOUT:g}s") from None
+
+    def release_reader(self, raw):
+        self._readers.put(raw)
+
+    def acquire_writer(self):
+        if not self._writer_lock.acquire(blocking=False):
+            t0 = time.perf_counter()
+            if not self._writer_lock.acquire(timeout=SQLITE_BUSY_TIMEOUT):
+                raise mysql_err.OperationalError(1205, f"SQLite writer busy for {SQLITE_BUSY_TIMEOUT:g}s")
+            self.writer_waits += 1
+            self.writer_wait_seconds += time.perf_counter() - t0
+        try:
+            self._writer.conn.execute("BEGIN IMMEDIATE")
+        except sqlite3.Error as e:
+            self._writer_lock.release()
+            raise _mysql_error(e) from e
+        return self._writer
+
+    def release_writer(self, commit):
+        try:
+            self._writer.conn.execute("COMMIT" if commit else "ROLLBACK")
+        finally:
+            self._writer_lock.release()
+
+    def warm(self, count=None):
+        """Open up to `count` (default: SQLITE_READERS) reader connections ahead of traffic; returns how many are open."""
+        raws = [self.acquire_reader() for _ in range(min(count or SQLITE_READERS, SQLITE_READERS))]
+        for raw in raws:
+            self.release_reader(raw)
+        return self._reader_count
+
+    def close(self):
+        while True:
+            try:
+                self._readers.get_nowait().conn.close()
+            except queue.Empty:
+                break
+        # Don't hang shutdown on a transaction that never finished
+        locked = self._writer_lock.acquire(timeout=5)
+        try:
+            self._writer.conn.close()
+        finally:
+            if locked:
+                self._writer_lock.release()
+
+    def stats(self):
+        return {
+            "backend": "sqlite",
+            "path": SQLITE_PATH,
+            "readers_open": self._reader_count,
+            "readers_idle": self._readers.qsize(),
+            "readers_max": SQLITE_READERS,
+            "writer_busy": self._writer_lock.locked(),
+            "writer_waits": self.writer_waits,
+            "writer_wait_seconds": round(self.writer_wait_seconds, 3),
+        }
+
+
+_engine = None
+_engine_lock = threading.Lock()
+
+
+def get_engine() -> _Engine:
+    global _engine
+    if _engine is None:
+        with _engine_lock:
+            if _engine is None:
+                _engine = _Engine()
+    return _engine
+
+
+def close_engine():
+    global _engine
+    with _engine_lock:
+        if _engine is not None:
+            _engine.close()
+            _engine = None
+
+
+class Connection:
+    """
+    One transaction: reads on a pooled reader until the first write, then everything on the writer until commit.
+    With write=True every transaction on the connection runs on the writer from its first statement.
+    """
+
+    def __init__(self, engine, write=False):
+        self._engine = engine
+        self._write = write
+        self._reader = None
+        self._writer = None
+
+    def cursor(self, buffered=True):
+        return Cursor(self, buffered)
+
+    @property
+    def writing(self):
+        return self._writer is not None
+
+    def _raw(self, write):
+        if self._writer is None and (write or self._write):
+            self._writer = self._engine.acquire_writer()
+        if self._writer is not None:
+            return self._writer
+        if self._reader is None:
+            self._reader = self._engine.acquire_reader()
+        return self._reader
+
+    def _end(self, commit):
+        if self._writer is not None:
+            self._writer = None
+            try:
+                self._engine.release_writer(commit)
+            except sqlite3.Error as e:
+                raise _mysql_error(e) from e
+
+    def commit(self):
+        self._end(True)
+
+    def rollback(self):
+        self._end(False)
+
+    def close(self):
+        self._end(False)
+        if self._reader is not None:
+            self._engine.release_reader(self._reader)
+            self._reader = None
+
+
+class Cursor:
+    """pymysql-style dict cursor. Buffered cursors read all rows in execute(); unbuffered ones step on fetch."""
+
+    def __init__(self, conn, buffered=True):
+        self._conn = conn
+        self._buffered = buffered
+        self._cur = None
+        self._rows = []
+        self._pos = 0
+        self.rowcount = -1
+        self.lastrowid = None
+
+    def execute(self, query, args=None):
+        text, write = translate(query)
+        if args is None:
+            params = ()
+        elif isinstance(args, (tuple, list, dict)):
+            params = args
+        else:
+            params = (args,)
+        raw = self._conn._raw(write)
+        t0 = time.perf_counter()
+        try:
+            cur = raw.conn.execute(text, params)
+            self._rows = cur.fetchall() if self._buffered else []
+        except sqlite3.Error as e:
+            raise _mysql_error(e) from e
+        finally:
+            record_query(query, args, time.perf_counter() - t0)
+        self._cur, self._pos = cur, 0
+        self.rowcount = len(self._rows) if cur.description is not None and self._buffered else cur.rowcount
+        table = _INSERT_TABLE_RE.match(text) if write and cur.rowcount > 0 else None
+        if table and raw.has_autoincrement(table.group(1)):
+            # MySQL reports the first id of a multi-row INSERT; the writer's ids are consecutive
+            self.lastrowid = cur.lastrowid - cur.rowcount + 1 if "ON CONFLICT" not in text else cur.lastrowid
+            raw.last_insert_id = self.lastrowid
+        return self.rowcount
+
+    def executemany(self, query, args):
+        """One execute() per parameter set, all in this transaction; returns the total rowcount like pymysql."""
+        total = 0
+        for params in args:
+            total += max(self.execute(query, params), 0)
+        self.rowcount = total
+        return total
+
+    def fetchone(self):
+        if not self._buffered:
+            return self._cur.fetchone() if self._cur else None
+        if self._pos >= len(self._rows):
+            return None
+        self._pos += 1
+        return self._rows[self._pos - 1]
+
+    def fetchmany(self, size=None):
+        size = size or 1
+        if not self._buffered:
+            return self._cur.fetchmany(size) if self._cur else []
+        rows = self._rows[self._pos:self._pos + size]
+        self._pos += len(rows)
+        return rows
+
+    def fetchall(self):
+        if not self._buffered:
+            return self._cur.fetchall() if self._cur else []
+        rows = self._rows[self._pos:]
+        self._pos = len(self._rows)
+        return rows
+
+    def close(self):
+        if self._cur is not None:
+            self._cur.close()
+            self._cur = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+@contextmanager
+def get_db(write=False):
+    """Same contract as app.database.get_db: commits on success, rolls back on error."""
+    conn = Connection(get_engine(), write)
+    try:
+        yield conn
+        conn.commit()
+    except BaseException:
+        conn.rollback()
+        raise
+    finally:
+        conn.close()
+
+
+# One in-process queue for the writer per event loop, so waiting tasks don't each block a threadpool thread
+_async_writer_locks = weakref.WeakKeyDictionary()
+
+
+def _async_writer_lock():
+    loop = asyncio.get_running_loop()
+    lock = _async_writer_locks.get(loop)
+    if lock is None:
+        lock = _async_writer_locks[loop] = asyncio.Lock()
+    return lock
+
+
+class AsyncCursor:
+    """aiomysql-style facade; statements run in the threadpool, buffered rows are then read without I/O."""
+
+    def __init__(self, conn, cur):
+        self._conn = conn
+        self._cur = cur
+
+    async def execute(self, query, args=None):
+        await self._conn._before(translate(query)[1])
+        return await run_in_threadpool(self._cur.execute, query, args)
+
+    async def executemany(self, query, args):
+        await self._conn._before(translate(query)[1])
+        return await run_in_threadpool(self._cur.executemany, query, args)
+
+    async def fetchone(self):
+        return self._cur.fetchone() if self._cur._buffered else await run_in_threadpool(self._cur.fetchone)
+
+    async def fetchmany(self, size=None):
+        return self._cur.fetchmany(size) if self._cur._buffered else await run_in_threadpool(self._cur.fetchmany, size)
+
+    async def fetchall(self):
+        return self._cur.fetchall() if self._cur._buffered else await run_in_threadpool(self._cur.fetchall)
+
+    @property
+    def rowcount(self):
+        return self._cur.rowcount
+
+    @property
+    def lastrowid(self):
+        return self._cur.lastrowid
+
+
+class AsyncConnection:
+    def __init__(self, conn):
+        self._conn = conn
+        self._writer_lock = None
+
+    @asynccontextmanager
+    async def cursor(self, unbuffered=False):
+        cur = self._conn.cursor(buffered=not unbuffered)
+        try:
+            yield AsyncCursor(self, cur)
+        finally:
+            cur.close()
+
+    async def _before(self, write):
+        if (write or self._conn._write) and not self._conn.writing and self._writer_lock is None:
+            lock = _async_writer_lock()
+            await lock.acquire()
+            self._writer_lock = lock
+
+    def _release(self):
+        if self._writer_lock is not None:
+            self._writer_lock.release()
+            self._writer_lock = None
+
+    async def commit(self):
+        try:
+            await run_in_threadpool(self._conn.commit)
+        finally:
+            self._release()
+
+    async def rollback(self):
+        # Quick and must not be interrupted by cancellation: run inline
+        try:
+            self._conn.rollback()
+        finally:
+            self._release()
+
+    def close(self):
+        try:
+            self._conn.close()
+        finally:
+            self._release()
+
+
+@asynccontextmanager
+async def get_db_async(write=False):
+    """Same contract as app.async_database.get_db_async."""
+    conn = AsyncConnection(Connection(get_engine(), write))
+    try:
+        yield conn
+        await conn.commit()
+    except BaseException:
+        await conn.rollback()
+        raise
+    finally:
+        conn.close()
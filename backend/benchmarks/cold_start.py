@@ -0,0 +1,175 @@
+"""
+Benchmark: server cold start, time to first successful request and graceful drain.
+
+Launches python -m app.server (on the database in backend/.env, ideally filled by benchmarks.datagen)
+with WARM_UP=0 and WARM_UP=1, --runs times each, and measures from process start:
+  listen_s       until a TCP connection is accepted
+  first_ok_s     until the first POST /auth/login returns 200
+and the latency of the first request to each of login, list, scanner lookup, product list and
+product search against the same request repeated once the worker is warm. With --drain it then opens
+an event stream, starts a full GET /gate-passes/export, sends SIGTERM and reports how long the server took
+to exit and whether the in-flight request still completed. Medians over the runs; --json writes
+every run to a file.
+
+    cd backend
+    python -m benchmarks.cold_start --runs 5 --drain
+    python -m benchmarks.cold_start --workers 4 --json cold_start.json
+"""
+import argparse
+import http.client
+import json
+import os
+import signal
+import socket
+import statistics
+import subprocess
+import sys
+import threading
+import time
+
+from benchmarks.db_mode import _login
+
+VARIANTS = {"cold": {"WARM_UP": "0"}, "warm": {"WARM_UP": "1"}}
+
+
+def _get(port, path, token, timeout=120):
+    conn = http.client.HTTPConnection("127.0.0.1", port, timeout=timeout)
+    t0 = time.perf_counter()
+    conn.request("GET", path, headers={"Authorization": f"Bearer {token}"})
+    resp = conn.getresponse()
+    body = resp.read()
+    conn.close()
+    return resp.status, body, time.perf_counter() - t0
+
+
+def _wait_listening(port, proc, timeout=120):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if proc.poll() is not None:
+            raise SystemExit(f"server exited with {proc.returncode}")
+        try:
+            socket.create_connection(("127.0.0.1", port), timeout=1).close()
+            return
+        except OSError:
+            time.sleep(0.01)
+    raise SystemExit("server did not start listening")
+
+
+def _first_login(port, args, proc):
+    """Logs in as soon as the server answers; returns the token."""
+    while True:
+        try:
+            return _login(port, args.username, args.password)
+        except (OSError, http.client.HTTPException):
+            if proc.poll() is not None:
+                raise SystemExit(f"server exited with {proc.returncode}")
+            time.sleep(0.01)
+
+
+def _first_requests(port, token, args):
+    """{name: (first ms, warm ms)} for the read paths a client hits right after logging in."""
+    status, body, _ = _get(port, "/gate-passes?limit=1", token)
+    gp_number = json.loads(body)[0]["gp_number"] if status == 200 and body != b"[]" else "GP-NONE"
+    paths = {
+        "list": "/gate-passes?limit=50",
+        "scan": f"/gate-passes/scan/{gp_number}",
+        "products": "/products",
+        "search": "/products/search?q=bol",
+    }
+    results = {}
+    for name, path in paths.items():
+        first = _get(port, path, token)[2]
+        warm = _get(port, path, token)[2]
+        results[name] = (round(first * 1000, 2), round(warm * 1000, 2))
+    t0 = time.perf_counter()
+    _login(port, args.username, args.password)
+    results["login_again"] = (round((time.perf_counter() - t0) * 1000, 2), None)
+    return results
+
+
+def _drain(port, token, proc):
+    """SIGTERM with an event stream open and a slow request in flight."""
+    stream = http.client.HTTPConnection("127.0.0.1", port, timeout=120)
+    stream.request("GET", f"/gate-passes/events?access_token={token}")
+    stream_resp = stream.getresponse()
+    stream_resp.read1(64)
+    inflight = {}
+
+    def slow_request():
+        try:
+            inflight["status"] = _get(port, "/gate-passes/export", token)[0]
+        except (OSError, http.client.HTTPException) as e:
+            inflight["status"] = type(e).__name__
+
+    thread = threading.Thread(target=slow_request)
+    thread.start()
+    time.sleep(0.2)
+    t0 = time.perf_counter()
+    proc.send_signal(signal.SIGTERM)
+    stream_ended = None
+    try:
+        while stream_resp.read1(4096):
+            pass
+        stream_ended = round(time.perf_counter() - t0, 3)
+    except (OSError, http.client.HTTPException):
+        pass
+    proc.wait(timeout=120)
+    exit_s = time.perf_counter() - t0
+    thread.join()
+    return {"exit_s": round(exit_s, 3), "stream_ended_s": stream_ended, "inflight_status": inflight.get("status")}
+
+
+def run_once(name, args):
+    env = dict(os.environ, **VARIANTS[name])
+    cmd = [sys.executable, "-m", "app.server", "--port", str(args.port), "--log-level", "warning"]
+    if args.workers:
+        cmd += ["--workers", str(args.workers)]
+    t0 = time.perf_counter()
+    proc = subprocess.Popen(cmd, env=env, stderr=subprocess.DEVNULL)
+    try:
+        _wait_listening(args.port, proc)
+        listen_s = time.perf_counter() - t0
+        token = _first_login(args.port, args, proc)
+        result = {"listen_s": round(listen_s, 3), "first_ok_s": round(time.perf_counter() - t0, 3)}
+        result["requests_ms"] = _first_requests(args.port, token, args)
+        if args.drain:
+            result["drain"] = _drain(args.port, token, proc)
+    finally:
+        if proc.poll() is None:
+            proc.terminate()
+            proc.wait(timeout=60)
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--variants", nargs="+", choices=list(VARIANTS), default=list(VARIANTS))
+    parser.add_argument("--runs", type=int, default=3)
+    parser.add_argument("--workers", type=int, help="passed to app.server (default: its own choice)")
+    parser.add_argument("--drain", action="store_true", help="also measure a SIGTERM drain")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--username", default="admin")
+    parser.add_argument("--password", default="admin123")
+    parser.add_argument("--json", help="write every run to this file")
+    args = parser.parse_args()
+
+    results = {}
+    for name in args.variants:
+        runs = results[name] = [run_once(name, args) for _ in range(args.runs)]
+        median = lambda values: round(statistics.median(values), 3)
+        line = f"{name:<5} listen={median([r['listen_s'] for r in runs]):.3f} s  first ok={median([r['first_ok_s'] for r in runs]):.3f} s"
+        for request in runs[0]["requests_ms"]:
+            first = median([r["requests_ms"][request][0] for r in runs])
+            line += f"  {request}={first:.1f} ms"
+        print(line)
+        if args.drain:
+            drains = [r["drain"] for r in runs]
+            print(f"      drain: exit={median([d['exit_s'] for d in drains]):.3f} s  "
+                  f"in-flight={[d['inflight_status'] for d in drains]}  stream ended={[d['stream_ended_s'] for d in drains]}")
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump({"args": {k: v for k, v in vars(args).items() if k != "password"}, "results": results}, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
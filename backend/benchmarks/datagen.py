@@ -0,0 +1,177 @@
+"""
+Synthetic data for the benchmarks: users, products and gate passes with a realistic item mix.
+
+Rows go straight into the database configured in backend/.env (either DB_BACKEND) with multi-row
+INSERTs, so large volumes load in seconds; point MYSQL_DATABASE / SQLITE_PATH at a scratch
+database. Everything generated is recognisable by prefix (users bench_user_N, products BENCH-N,
+gate passes BGnnnnnnnnn) and --reset removes it again. Runs are reproducible for a given --seed.
+
+Item counts per pass follow a clipped log-normal: most passes carry 1-5 lines, a few run to 50.
+Item codes are skewed (log-uniform) so a small set of products appears on most passes, and statuses,
+dates and directions are spread like a year of production data. The report rollups are rebuilt
+afterwards and the cache versions bumped, so running servers pick the data up.
+
+    cd backend
+    python -m benchmarks.datagen --users 50 --products 5000 --passes 20000
+    python -m benchmarks.datagen --reset
+"""
+import argparse
+import asyncio
+import random
+import time
+from datetime import date, timedelta
+
+from app import cache_versions, reports
+from app.async_database import close_async_pool, get_db_async
+from app.routes.auth import hash_password
+
+USER_PREFIX = "bench_user_"
+USER_PASSWORD = "bench-pass"
+PRODUCT_PREFIX = "BENCH-"
+GP_PREFIX = "BG"
+MAX_ITEMS = 50
+BATCH_ROWS = 500
+
+GROUPS = ["FG", "RM", "PKG", "SPARE", "TOOL", "CHEM"]
+NOUNS = ["Bolt", "Nut", "Washer", "Bracket", "Panel", "Cable", "Carton", "Drum", "Pallet", "Valve", "Hose", "Sheet"]
+MATERIALS = ["steel", "brass", "aluminum", "PVC", "rubber", "copper", "plywood"]
+DESTINATIONS = [f"{site} {n}" for site in ("Warehouse", "Plant", "Customer", "Supplier") for n in range(1, 9)]
+STATUSES = (("approved", 0.6), ("pending", 0.25), ("rejected", 0.15))
+
+
+def item_count(rnd) -> int:
+    """Lines on one pass: median ~3, long tail up to MAX_ITEMS."""
+    return max(1, min(MAX_ITEMS, int(rnd.lognormvariate(1.1, 0.8))))
+
+
+def product_rows(count: int, rnd):
+    return [
+        (f"{PRODUCT_PREFIX}{i:05d}", f"{rnd.choice(NOUNS)} {rnd.randrange(1, 200)} {rnd.choice(MATERIALS)}", rnd.choice(GROUPS))
+        for i in range(count)
+    ]
+
+
+def _pick_product(products, rnd):
+    # Log-uniform index: with 5000 products the first 10 take ~27% of lines, the first 100 ~54%
+    return products[int(len(products) ** rnd.random()) - 1]
+
+
+async def _insert(cur, table, columns, rows):
+    """Multi-row INSERTs of BATCH_ROWS; returns the first id of each batch with its row count."""
+    batches = []
+    for start in range(0, len(rows), BATCH_ROWS):
+        chunk = rows[start:start + BATCH_ROWS]
+        await cur.execute(
+            f"INSERT INTO {table} ({', '.join(columns)}) VALUES "
+            + ", ".join(["(" + ", ".join(["%s"] * len(columns)) + ")"] * len(chunk)),
+            tuple(v for row in chunk for v in row),
+        )
+        batches.append((cur.lastrowid, len(chunk)))
+    return batches
+
+
+def _like(prefix):
+    return prefix.replace("_", "\\_") + "%"
+
+
+async def _count(cur, table, column, prefix):
+    await cur.execute(f"SELECT COUNT(*) AS c FROM {table} WHERE {column} LIKE %s", (_like(prefix),))
+    return int((await cur.fetchone())["c"])
+
+
+async def generate(users: int, products: int, passes: int, seed: int = 42):
+    """Add the given numbers of rows (on top of earlier runs); returns the counts inserted."""
+    rnd = random.Random(seed)
+    catalog = product_rows(max(products, 1), random.Random(seed))
+    password_hash = hash_password(USER_PASSWORD)
+    start = date.today() - timedelta(days=365)
+    lines = 0
+    async with get_db_async() as conn:
+        async with conn.cursor() as cur:
+            user_offset = await _count(cur, "users", "username", USER_PREFIX)
+            await _insert(cur, "users", ["username", "password_hash", "full_name", "role"], [
+                (f"{USER_PREFIX}{user_offset + i}", password_hash, f"Bench User {user_offset + i}",
+                 rnd.choice(("admin", "encoding", "encoding", "scan_only")))
+                for i in range(users)
+            ])
+            if products:
+                await cur.execute("DELETE FROM products WHERE item_code LIKE %s", (_like(PRODUCT_PREFIX),))
+                await _insert(cur, "products", ["item_code", "item_description", "item_group"], catalog[:products])
+            gp_offset = await _count(cur, "gate_passes", "gp_number", GP_PREFIX)
+            for batch_start in range(0, passes, BATCH_ROWS):
+                n = min(BATCH_ROWS, passes - batch_start)
+                headers = []
+                for i in range(n):
+                    status = rnd.choices([s for s, _ in STATUSES], [w for _, w in STATUSES])[0]
+                    pass_date = start + timedelta(days=rnd.randrange(366))
+                    headers.append((
+                        f"{GP_PREFIX}{gp_offset + batch_start + i:09d}", pass_date, f"Driver {rnd.randrange(500)}",
+                        rnd.choice(("out", "out", "out", "in")), status,
+                        "Incomplete documents" if status == "rejected" else None,
+                        f"ABC {rnd.randrange(9999):04d}", rnd.choice(("Truck", "Van", "L300", None)),
+                        "Bench Approver" if status == "approved" else None,
+                        pass_date + timedelta(days=rnd.randrange(3)) if status == "approved" else None,
+                    ))
+                (first_id, _), = await _insert(cur, "gate_passes", [
+                    "gp_number", "pass_date", "authorized_name", "in_or_out", "status", "rejected_remarks",
+                    "plate_no", "vehicle_type", "approved_by", "date_approved",
+                ], headers)
+                items = []
+                for i in range(n):
+                    for _ in range(item_count(rnd)):
+                        code, description, _ = _pick_product(catalog, rnd)
+                        items.append((first_id + i, code, description, rnd.randint(1, 200),
+                                      f"DR-{rnd.randrange(100000):06d}" if rnd.random() < 0.5 else None, rnd.choice(DESTINATIONS)))
+                await _insert(cur, "gate_pass_items",
+                              ["gate_pass_id", "item_code", "item_description", "qty", "ref_doc_no", "destination"], items)
+                lines += len(items)
+    return {"users": users, "products": products, "gate_passes": passes, "gate_pass_items": lines}
+
+
+async def reset():
+    """Delete everything generated (gate pass items go with their passes)."""
+    counts = {}
+    async with get_db_async() as conn:
+        async with conn.cursor() as cur:
+            for table, column, prefix in (("gate_passes", "gp_number", GP_PREFIX), ("products", "item_code", PRODUCT_PREFIX),
+                                          ("users", "username", USER_PREFIX)):
+                await cur.execute(f"DELETE FROM {table} WHERE {column} LIKE %s", (_like(prefix),))
+                counts[table] = cur.rowcount
+    return counts
+
+
+async def _run(args):
+    try:
+        if args.reset:
+            counts = await reset()
+        else:
+            counts = await generate(args.users, args.products, args.passes, args.seed)
+        reports.rebuild()
+        async with get_db_async() as conn:
+            async with conn.cursor() as cur:
+                await cache_versions.bump(cur, "products")
+                version = await cache_versions.bump(cur, "gate_passes")
+                # Generated passes reach scanner copies through /sync like any other change
+                await cur.execute("UPDATE gate_passes SET change_version = %s WHERE change_version = 0 AND gp_number LIKE %s",
+                                  (version, _like(GP_PREFIX)))
+        return counts
+    finally:
+        await close_async_pool()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--users", type=int, default=50)
+    parser.add_argument("--products", type=int, default=5000, help="catalog size (replaces earlier BENCH- products)")
+    parser.add_argument("--passes", type=int, default=20000)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--reset", action="store_true", help="delete generated rows instead of adding them")
+    args = parser.parse_args()
+
+    t0 = time.perf_counter()
+    counts = asyncio.run(_run(args))
+    print(", ".join(f"{table}: {n}" for table, n in counts.items()) + f" ({time.perf_counter() - t0:.1f} s)")
+
+
+if __name__ == "__main__":
+    main()
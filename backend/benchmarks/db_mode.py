@@ -0,0 +1,146 @@
+"""
+Benchmark: DB_MODE=sync vs DB_MODE=async under concurrent load.
+
+Starts the API once per mode (uvicorn subprocess, single worker) against the database in backend/.env,
+logs in, then keeps --concurrency requests in flight for --duration seconds (closed loop) over a mix of
+list, detail and product-search requests, and reports throughput and latency for each mode.
+
+    cd backend
+    python -m benchmarks.db_mode --concurrency 64 --duration 20
+    python -m benchmarks.db_mode --modes async --path "/gate-passes?limit=50"
+"""
+import argparse
+import http.client
+import json
+import os
+import random
+import subprocess
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from app.database import get_db
+
+DEFAULT_PATHS = ["/gate-passes?limit=50", "/gate-passes/{id}", "/products/search?q=bol"]
+
+
+def percentile(samples, p):
+    return samples[min(len(samples) - 1, int(len(samples) * p))]
+
+
+def _wait_ready(port, proc, timeout=30):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if proc.poll() is not None:
+            raise SystemExit(f"server exited with code {proc.returncode}")
+        try:
+            conn = http.client.HTTPConnection("127.0.0.1", port, timeout=1)
+            conn.request("GET", "/")
+            if conn.getresponse().status == 200:
+                return
+        except OSError:
+            time.sleep(0.2)
+    raise SystemExit("server did not start")
+
+
+def _login(port, username, password):
+    conn = http.client.HTTPConnection("127.0.0.1", port, timeout=30)
+    conn.request("POST", "/auth/login", json.dumps({"username": username, "password": password}),
+                 {"Content-Type": "application/json"})
+    resp = conn.getresponse()
+    body = resp.read()
+    if resp.status != 200:
+        raise SystemExit(f"login failed: {resp.status} {body[:200]!r}")
+    return json.loads(body)["access_token"]
+
+
+def _load(port, token, paths, ids, concurrency, duration):
+    headers = {"Authorization": f"Bearer {token}"}
+    stop = time.perf_counter() + duration
+    lock = threading.Lock()
+    latencies, errors = [], [0]
+
+    def client(seed):
+        rnd = random.Random(seed)
+        conn = http.client.HTTPConnection("127.0.0.1", port, timeout=30)
+        local, failed = [], 0
+        while time.perf_counter() < stop:
+            path = rnd.choice(paths).replace("{id}", str(rnd.choice(ids)))
+            t0 = time.perf_counter()
+            try:
+                conn.request("GET", path, headers=headers)
+                resp = conn.getresponse()
+                resp.read()
+                if resp.status != 200:
+                    failed += 1
+            except (OSError, http.client.HTTPException):
+                conn.close()
+                conn = http.client.HTTPConnection("127.0.0.1", port, timeout=30)
+                failed += 1
+            local.append(time.perf_counter() - t0)
+        with lock:
+            latencies.extend(local)
+            errors[0] += failed
+
+    t0 = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as ex:
+        list(ex.map(client, range(concurrency)))
+    return sorted(latencies), errors[0], time.perf_counter() - t0
+
+
+def run_mode(mode, args, ids):
+    env = dict(os.environ, DB_MODE=mode)
+    proc = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "app.main:app", "--port", str(args.port), "--log-level", "warning"],
+        env=env,
+    )
+    try:
+        _wait_ready(args.port, proc)
+        token = _login(args.port, args.username, args.password)
+        _load(args.port, token, args.path, ids, args.concurrency, min(3.0, args.duration))  # warm caches and pools
+        latencies, errors, elapsed = _load(args.port, token, args.path, ids, args.concurrency, args.duration)
+    finally:
+        proc.terminate()
+        proc.wait(timeout=30)
+    ms = [lat * 1000 for lat in latencies]
+    result = {
+        "mode": mode,
+        "requests": len(ms),
+        "errors": errors,
+        "rps": round(len(ms) / elapsed, 1),
+        "p50_ms": round(percentile(ms, 0.5), 2),
+        "p95_ms": round(percentile(ms, 0.95), 2),
+        "p99_ms": round(percentile(ms, 0.99), 2),
+    }
+    print(f"{mode:<6} requests={result['requests']} errors={errors} rps={result['rps']:.0f}  "
+          f"p50={result['p50_ms']:.2f} ms  p95={result['p95_ms']:.2f} ms  p99={result['p99_ms']:.2f} ms")
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--modes", nargs="+", choices=("sync", "async"), default=["sync", "async"])
+    parser.add_argument("--concurrency", type=int, default=64, help="requests kept in flight")
+    parser.add_argument("--duration", type=float, default=20, help="seconds per mode")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--path", action="append", help="GET path to request ({id} = a recent gate pass id); repeatable")
+    parser.add_argument("--username", default="admin")
+    parser.add_argument("--password", default="admin123")
+    args = parser.parse_args()
+    args.path = args.path or DEFAULT_PATHS
+
+    with get_db() as conn:
+        with conn.cursor() as cur:
+            cur.execute("SELECT id FROM gate_passes ORDER BY id DESC LIMIT 500")
+            ids = [r["id"] for r in cur.fetchall()]
+    if not ids and any("{id}" in p for p in args.path):
+        raise SystemExit("No gate passes in the database; seed some first (see benchmarks/list_gate_passes.py)")
+
+    results = {mode: run_mode(mode, args, ids) for mode in args.modes}
+    if len(results) == 2 and results["sync"]["rps"]:
+        print(f"async/sync throughput: {results['async']['rps'] / results['sync']['rps']:.2f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,72 @@
+"""
+Concurrency stress test for the GP number allocator (app.gp_sequence).
+
+Runs several worker processes (like uvicorn workers), each with several concurrent tasks, all
+allocating numbers for the same year against the database in backend/.env, then checks
+that no number was issued twice. Uses a far-future year and removes its sequence row after.
+
+    cd backend
+    python -m benchmarks.gp_number_stress --processes 4 --tasks 8 --per-task 500
+    GP_SEQUENCE_BLOCK_SIZE=50 python -m benchmarks.gp_number_stress
+"""
+import argparse
+import asyncio
+import multiprocessing
+import time
+
+from app.database import get_db
+
+
+async def _allocate(year, tasks, per_task):
+    from app.async_database import close_async_pool
+    from app.gp_sequence import next_gp_number
+
+    async def task():
+        return [await next_gp_number(year) for _ in range(per_task)]
+
+    try:
+        chunks = await asyncio.gather(*(task() for _ in range(tasks)))
+    finally:
+        await close_async_pool()
+    return [n for chunk in chunks for n in chunk]
+
+
+def _worker(year, tasks, per_task):
+    return asyncio.run(_allocate(year, tasks, per_task))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--processes", type=int, default=4)
+    parser.add_argument("--tasks", type=int, default=8)
+    parser.add_argument("--per-task", type=int, default=500)
+    parser.add_argument("--year", type=int, default=9999)
+    args = parser.parse_args()
+
+    with get_db() as conn:
+        with conn.cursor() as cur:
+            cur.execute("DELETE FROM gp_sequences WHERE year = %s", (args.year,))
+
+    t0 = time.perf_counter()
+    with multiprocessing.get_context("spawn").Pool(args.processes) as pool:
+        results = pool.starmap(_worker, [(args.year, args.tasks, args.per_task)] * args.processes)
+    elapsed = time.perf_counter() - t0
+
+    numbers = [n for r in results for n in r]
+    expected = args.processes * args.tasks * args.per_task
+    duplicates = len(numbers) - len(set(numbers))
+    seqs = sorted(int(n[len(str(args.year)):]) for n in numbers)
+    print(f"allocated={len(numbers)} expected={expected} duplicates={duplicates} "
+          f"min={seqs[0]} max={seqs[-1]} gaps={seqs[-1] - seqs[0] + 1 - len(set(seqs))} "
+          f"time={elapsed:.2f}s rate={len(numbers) / elapsed:.0f}/s")
+
+    with get_db() as conn:
+        with conn.cursor() as cur:
+            cur.execute("DELETE FROM gp_sequences WHERE year = %s", (args.year,))
+    if duplicates or len(numbers) != expected:
+        raise SystemExit("FAIL: duplicate or missing GP numbers")
+    print("OK")
+
+
+if __name__ == "__main__":
+    main()
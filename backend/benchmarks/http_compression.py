@@ -0,0 +1,107 @@
+"""
+Benchmark: bytes on the wire and time to first byte for large JSON responses, by encoding.
+
+Starts the API (uvicorn subprocess, single worker) on the database in backend/.env, ideally filled by
+benchmarks.datagen, and fetches each path --repeat times sequentially with Accept-Encoding identity
+(what every client got before CompressionMiddleware), gzip and br, then once more with the ETag from
+the last response in If-None-Match (a revalidation of an unchanged list). Reports the median time to
+first byte (status line and headers received), the median total time and the bytes read off the
+socket per variant; --json writes the results to a file.
+
+    cd backend
+    python -m benchmarks.http_compression
+    python -m benchmarks.http_compression --path "/gate-passes?limit=500" --repeat 50 --json compression.json
+"""
+import argparse
+import http.client
+import json
+import os
+import subprocess
+import sys
+import time
+
+from benchmarks.db_mode import _login, _wait_ready, percentile
+
+DEFAULT_PATHS = ["/gate-passes?limit=50", "/gate-passes?limit=500", "/products"]
+ENCODINGS = ["identity", "gzip", "br"]
+
+
+def _fetch(conn, path, headers):
+    """(status, TTFB s, total s, body bytes as sent, response headers)."""
+    t0 = time.perf_counter()
+    conn.request("GET", path, headers=headers)
+    resp = conn.getresponse()
+    ttfb = time.perf_counter() - t0
+    body = resp.read()  # http.client does not decode Content-Encoding: these are wire bytes
+    return resp.status, ttfb, time.perf_counter() - t0, len(body), resp
+
+
+def _variant(conn, path, headers, repeat):
+    ttfbs, totals = [], []
+    for _ in range(repeat):
+        status, ttfb, total, size, resp = _fetch(conn, path, headers)
+        if status not in (200, 304):
+            raise SystemExit(f"GET {path} failed: {status}")
+        ttfbs.append(ttfb * 1000)
+        totals.append(total * 1000)
+    ttfbs.sort()
+    totals.sort()
+    return {
+        "status": status,
+        "bytes": size,
+        "content_encoding": resp.getheader("Content-Encoding") or "identity",
+        "ttfb_p50_ms": round(percentile(ttfbs, 0.5), 2),
+        "total_p50_ms": round(percentile(totals, 0.5), 2),
+        "total_p95_ms": round(percentile(totals, 0.95), 2),
+    }, resp.getheader("ETag")
+
+
+def run(args):
+    proc = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "app.main:app", "--port", str(args.port), "--log-level", "warning"],
+        env=dict(os.environ),
+    )
+    results = {}
+    try:
+        _wait_ready(args.port, proc)
+        token = _login(args.port, args.username, args.password)
+        conn = http.client.HTTPConnection("127.0.0.1", args.port, timeout=120)
+        for path in args.path:
+            results[path] = variants = {}
+            etag = None
+            for encoding in ENCODINGS:
+                headers = {"Authorization": f"Bearer {token}", "Accept-Encoding": encoding}
+                _variant(conn, path, headers, 2)  # warm up
+                variants[encoding], etag = _variant(conn, path, headers, args.repeat)
+            if etag:
+                headers = {"Authorization": f"Bearer {token}", "Accept-Encoding": "br", "If-None-Match": etag}
+                variants["304"], _ = _variant(conn, path, headers, args.repeat)
+            base = variants["identity"]
+            for name, v in variants.items():
+                print(f"{path:<26} {name:<9} {v['status']}  {v['bytes']:>10} B ({v['bytes'] / base['bytes']:6.1%})  "
+                      f"ttfb p50={v['ttfb_p50_ms']:>8.2f} ms  total p50={v['total_p50_ms']:>8.2f} ms  p95={v['total_p95_ms']:>8.2f} ms")
+    finally:
+        proc.terminate()
+        proc.wait(timeout=30)
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--path", action="append", help="GET path to fetch; repeatable")
+    parser.add_argument("--repeat", type=int, default=20, help="requests per path and variant")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--username", default="admin")
+    parser.add_argument("--password", default="admin123")
+    parser.add_argument("--json", help="write the results to this file")
+    args = parser.parse_args()
+    args.path = args.path or DEFAULT_PATHS
+
+    results = run(args)
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump({"args": {k: v for k, v in vars(args).items() if k != "password"}, "results": results}, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,129 @@
+"""
+Benchmark: GET /gate-passes item loading, per-pass queries (old) vs batched loader (new).
+
+Seeds gate passes into the database configured in backend/.env, then times both strategies
+and counts the queries each one sends. Point MYSQL_DATABASE at a scratch database created
+from init_db.sql.
+
+    cd backend
+    python -m benchmarks.list_gate_passes --seed 50000
+    python -m benchmarks.list_gate_passes            # reuse already-seeded rows
+"""
+import argparse
+import asyncio
+import random
+import time
+from datetime import date, timedelta
+
+from app.async_database import get_db_async
+from app.database import get_db
+from app.routes.gate_passes import _row_to_response, _rows_to_responses
+
+BENCH_PREFIX = "B"
+
+
+class CountingCursor:
+    """Wraps a DB cursor (sync or async) and counts execute() calls."""
+
+    def __init__(self, cur):
+        self._cur = cur
+        self.queries = 0
+
+    def execute(self, sql, args=None):
+        self.queries += 1
+        return self._cur.execute(sql, args)
+
+    def __getattr__(self, name):
+        return getattr(self._cur, name)
+
+
+def seed(count: int, max_items: int = 10):
+    """Insert `count` gate passes with 1..max_items items each (gp_number prefixed with BENCH_PREFIX)."""
+    rnd = random.Random(42)
+    start = date.today() - timedelta(days=365)
+    with get_db() as conn:
+        with conn.cursor() as cur:
+            cur.execute("SELECT COUNT(*) AS c FROM gate_passes WHERE gp_number LIKE %s", (f"{BENCH_PREFIX}%",))
+            offset = cur.fetchone()["c"]
+            for batch_start in range(0, count, 1000):
+                n = min(1000, count - batch_start)
+                headers = [
+                    (f"{BENCH_PREFIX}{offset + batch_start + i:09d}", start + timedelta(days=rnd.randrange(365)),
+                     f"Driver {rnd.randrange(500)}", rnd.choice(("in", "out")),
+                     rnd.choice(("pending", "approved", "rejected")), f"ABC {rnd.randrange(9999):04d}")
+                    for i in range(n)
+                ]
+                cur.executemany(
+                    "INSERT INTO gate_passes (gp_number, pass_date, authorized_name, in_or_out, status, plate_no) "
+                    "VALUES (%s, %s, %s, %s, %s, %s)",
+                    headers,
+                )
+                cur.execute(
+                    "SELECT id FROM gate_passes WHERE gp_number >= %s AND gp_number <= %s",
+                    (headers[0][0], headers[-1][0]),
+                )
+                items = [
+                    (r["id"], f"ITEM-{rnd.randrange(5000):05d}", "Benchmark item", rnd.randint(1, 100), None, None)
+                    for r in cur.fetchall()
+                    for _ in range(rnd.randint(1, max_items))
+                ]
+                cur.executemany(
+                    "INSERT INTO gate_pass_items (gate_pass_id, item_code, item_description, qty, ref_doc_no, destination) "
+                    "VALUES (%s, %s, %s, %s, %s, %s)",
+                    items,
+                )
+            conn.commit()
+
+
+def per_pass_queries(cur):
+    cur.execute("SELECT * FROM gate_passes ORDER BY id DESC")
+    result = []
+    for gp in cur.fetchall():
+        cur.execute("SELECT * FROM gate_pass_items WHERE gate_pass_id = %s ORDER BY id", (gp["id"],))
+        result.append(_row_to_response(gp, cur.fetchall()))
+    return result
+
+
+async def batched_loader(cur):
+    await cur.execute("SELECT * FROM gate_passes ORDER BY id DESC")
+    return await _rows_to_responses(cur, await cur.fetchall())
+
+
+async def _run_async(fn):
+    async with get_db_async() as conn:
+        async with conn.cursor() as raw:
+            cur = CountingCursor(raw)
+            t0 = time.perf_counter()
+            passes = await fn(cur)
+            return passes, cur, time.perf_counter() - t0
+
+
+def run(label, fn):
+    if asyncio.iscoroutinefunction(fn):
+        passes, cur, elapsed = asyncio.run(_run_async(fn))
+    else:
+        with get_db() as conn:
+            with conn.cursor() as raw:
+                cur = CountingCursor(raw)
+                t0 = time.perf_counter()
+                passes = fn(cur)
+                elapsed = time.perf_counter() - t0
+    print(f"{label:<18} passes={len(passes):>7}  queries={cur.queries:>7}  time={elapsed * 1000:>10.1f} ms")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--seed", type=int, default=0, help="number of gate passes to insert before measuring")
+    parser.add_argument("--skip-old", action="store_true", help="only measure the batched loader")
+    args = parser.parse_args()
+    if args.seed:
+        t0 = time.perf_counter()
+        seed(args.seed)
+        print(f"seeded {args.seed} passes in {time.perf_counter() - t0:.1f} s")
+    if not args.skip_old:
+        run("per-pass (N+1)", per_pass_queries)
+    run("batched loader", batched_loader)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,68 @@
+"""
+Benchmark: in-memory product typeahead index (app.product_search.ProductIndex).
+
+Builds the index over a synthetic catalog and times random code-prefix and description queries.
+No database needed.
+
+    cd backend
+    python -m benchmarks.product_search --products 200000
+"""
+import argparse
+import random
+import statistics
+import time
+
+from app.product_search import ProductIndex
+
+WORDS = [
+    "bolt", "nut", "washer", "screw", "bracket", "panel", "hinge", "cable", "wire", "pipe", "valve", "pump",
+    "motor", "gear", "belt", "bearing", "seal", "gasket", "filter", "hose", "clamp", "spring", "plate", "rod",
+    "steel", "brass", "plastic", "rubber", "copper", "aluminum", "galvanized", "stainless", "black", "white",
+    "small", "large", "heavy", "duty", "assembly", "kit", "set", "cover", "frame", "fitting", "coupling",
+]
+GROUPS = ["FG", "RM", "SPARE", "PACK", "TOOLS", "CONSUMABLE"]
+
+
+def make_catalog(n, rnd):
+    return [
+        (i + 1, f"{rnd.choice(GROUPS)}-{i:06d}", " ".join(rnd.choices(WORDS, k=rnd.randint(2, 6))), rnd.choice(GROUPS))
+        for i in range(n)
+    ]
+
+
+def percentile(samples, p):
+    return samples[min(len(samples) - 1, int(len(samples) * p))]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--products", type=int, default=200_000)
+    parser.add_argument("--queries", type=int, default=5_000)
+    parser.add_argument("--limit", type=int, default=20)
+    args = parser.parse_args()
+    rnd = random.Random(7)
+
+    rows = make_catalog(args.products, rnd)
+    t0 = time.perf_counter()
+    index = ProductIndex(rows)
+    print(f"built index over {len(rows)} products in {time.perf_counter() - t0:.2f} s")
+
+    scenarios = {
+        "code prefix": lambda: f"{rnd.choice(GROUPS)}-{rnd.randrange(args.products):06d}"[: rnd.randint(3, 8)],
+        "one word": lambda: rnd.choice(WORDS)[: rnd.randint(2, 5)],
+        "two words": lambda: " ".join(w[: rnd.randint(2, 5)] for w in rnd.sample(WORDS, 2)),
+    }
+    for name, make_query in scenarios.items():
+        samples = []
+        for _ in range(args.queries):
+            q = make_query()
+            t0 = time.perf_counter()
+            index.search(q, args.limit)
+            samples.append((time.perf_counter() - t0) * 1000)
+        samples.sort()
+        print(f"{name:<12} p50={percentile(samples, 0.5):.3f} ms  p99={percentile(samples, 0.99):.3f} ms  "
+              f"mean={statistics.fmean(samples):.3f} ms")
+
+
+if __name__ == "__main__":
+    main()
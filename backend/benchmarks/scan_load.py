@@ -0,0 +1,92 @@
+"""
+Load test: scanner lookups (GET /gate-passes/scan/{gp_number} or /by-number/{gp_number}) at a fixed rate.
+
+Requests are issued open-loop at --rate per second against a running server, and latency is
+measured from each request's scheduled start, so a stalled server shows up in the percentiles.
+GP numbers are sampled from the most recent passes in the database configured in backend/.env.
+
+    cd backend
+    uvicorn app.main:app --port 8000 &
+    python -m benchmarks.scan_load --rate 200 --duration 30
+"""
+import argparse
+import http.client
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlparse
+
+from app.database import get_db
+
+_local = threading.local()
+
+
+def _connection(host, port):
+    conn = getattr(_local, "conn", None)
+    if conn is None:
+        conn = _local.conn = http.client.HTTPConnection(host, port, timeout=10)
+    return conn
+
+
+def _request(host, port, path, scheduled):
+    conn = _connection(host, port)
+    try:
+        conn.request("GET", path)
+        resp = conn.getresponse()
+        resp.read()
+        status = resp.status
+    except (OSError, http.client.HTTPException):
+        conn.close()
+        _local.conn = None
+        status = 0
+    return status, time.perf_counter() - scheduled
+
+
+def percentile(samples, p):
+    return samples[min(len(samples) - 1, int(len(samples) * p))]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--url", default="http://127.0.0.1:8000")
+    parser.add_argument("--rate", type=float, default=200, help="requests per second")
+    parser.add_argument("--duration", type=float, default=30, help="seconds")
+    parser.add_argument("--passes", type=int, default=500, help="distinct recent GP numbers to scan")
+    parser.add_argument("--endpoint", choices=("scan", "by-number"), default="scan")
+    parser.add_argument("--threads", type=int, default=32)
+    args = parser.parse_args()
+
+    with get_db() as conn:
+        with conn.cursor() as cur:
+            cur.execute("SELECT gp_number FROM gate_passes ORDER BY id DESC LIMIT %s", (args.passes,))
+            numbers = [r["gp_number"] for r in cur.fetchall()]
+    if not numbers:
+        raise SystemExit("No gate passes in the database; seed some first (see benchmarks/list_gate_passes.py)")
+
+    url = urlparse(args.url)
+    rnd = random.Random(1)
+    total = int(args.rate * args.duration)
+    interval = 1.0 / args.rate
+    futures = []
+    with ThreadPoolExecutor(max_workers=args.threads) as ex:
+        start = time.perf_counter()
+        for i in range(total):
+            scheduled = start + i * interval
+            delay = scheduled - time.perf_counter()
+            if delay > 0:
+                time.sleep(delay)
+            path = f"/gate-passes/{args.endpoint}/{rnd.choice(numbers)}"
+            futures.append(ex.submit(_request, url.hostname, url.port or 80, path, scheduled))
+        results = [f.result() for f in futures]
+    elapsed = time.perf_counter() - start
+
+    latencies = sorted(lat * 1000 for _, lat in results)
+    errors = sum(1 for status, _ in results if status != 200)
+    print(f"requests={len(results)} errors={errors} achieved={len(results) / elapsed:.0f}/s")
+    print(f"p50={percentile(latencies, 0.5):.2f} ms  p95={percentile(latencies, 0.95):.2f} ms  "
+          f"p99={percentile(latencies, 0.99):.2f} ms  max={latencies[-1]:.2f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,85 @@
+"""
+Microbenchmark: GET /gate-passes serialization, Pydantic models + response_model (old) vs dicts + orjson (new).
+
+Builds synthetic DB rows in memory (no database needed) and times turning them into the JSON body:
+  models: GatePassResponse per pass, FastAPI validation against list[GatePassResponse], JSONResponse
+  orjson: _row_to_dict per pass, ORJSONResponse
+Both bodies are checked to decode to the same data.
+
+    cd backend
+    python -m benchmarks.serialize_gate_passes --passes 10000 --items 10
+"""
+import argparse
+import asyncio
+import json
+import random
+import statistics
+import time
+from datetime import date, timedelta
+
+from fastapi.responses import JSONResponse, ORJSONResponse
+from fastapi.routing import serialize_response
+from fastapi.utils import create_response_field
+
+from app.routes.gate_passes import _row_to_dict, _row_to_response
+from app.schemas import GatePassResponse
+
+
+def make_rows(passes, items_per_pass, rnd):
+    start = date.today() - timedelta(days=365)
+    gp_rows, items = [], {}
+    for i in range(1, passes + 1):
+        gp_rows.append({
+            "id": i, "gp_number": f"2026{i:05d}", "pass_date": start + timedelta(days=rnd.randrange(365)),
+            "authorized_name": f"Driver {rnd.randrange(500)}", "in_or_out": rnd.choice(("in", "out")),
+            "purpose_delivery": 1, "purpose_return": 0, "purpose_inter_warehouse": rnd.randint(0, 1), "purpose_others": 0,
+            "vehicle_type": "Truck", "plate_no": f"ABC {rnd.randrange(9999):04d}", "attention": None,
+            "prepared_by": "Clerk", "checked_by": "Guard", "recommended_by": None, "approved_by": "Manager",
+            "time_out": "08:00", "time_in": None, "status": rnd.choice(("pending", "approved", "rejected")),
+            "rejected_remarks": None, "date_approved": None, "created_at": None,
+        })
+        items[i] = [
+            {"id": i * items_per_pass + k, "gate_pass_id": i, "item_code": f"ITEM-{rnd.randrange(5000):05d}",
+             "item_description": "Benchmark item", "qty": rnd.randint(1, 100), "ref_doc_no": "DR-1", "destination": "Warehouse 2"}
+            for k in range(items_per_pass)
+        ]
+    return gp_rows, items
+
+
+def models_path(gp_rows, items, field):
+    responses = [_row_to_response(gp, items[gp["id"]]) for gp in gp_rows]
+    content = asyncio.run(serialize_response(field=field, response_content=responses))
+    return JSONResponse(content).body
+
+
+def orjson_path(gp_rows, items):
+    return ORJSONResponse([_row_to_dict(gp, items[gp["id"]]) for gp in gp_rows]).body
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--passes", type=int, default=10_000)
+    parser.add_argument("--items", type=int, default=10, help="items per pass")
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    gp_rows, items = make_rows(args.passes, args.items, random.Random(3))
+    field = create_response_field(name="Response_list_gate_passes", type_=list[GatePassResponse], mode="serialization")
+    if json.loads(models_path(gp_rows, items, field)) != json.loads(orjson_path(gp_rows, items)):
+        raise SystemExit("FAIL: bodies differ")
+
+    results = {}
+    for label, fn in (("models", lambda: models_path(gp_rows, items, field)), ("orjson", lambda: orjson_path(gp_rows, items))):
+        samples = []
+        for _ in range(args.repeat):
+            t0 = time.perf_counter()
+            body = fn()
+            samples.append((time.perf_counter() - t0) * 1000)
+        results[label] = statistics.median(samples)
+        print(f"{label:<7} passes={args.passes} items/pass={args.items}  median={results[label]:8.1f} ms  "
+              f"min={min(samples):8.1f} ms  body={len(body) / 1e6:.1f} MB")
+    print(f"speedup: {results['models'] / results['orjson']:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
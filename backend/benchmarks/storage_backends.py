@@ -0,0 +1,187 @@
+"""
+Benchmark: DB_BACKEND=mysql vs DB_BACKEND=sqlite under a mixed read/write load.
+
+Starts the API once per backend (uvicorn subprocess, single worker): MySQL is the database in
+backend/.env (point MYSQL_DATABASE at a scratch database; the run adds passes and products), SQLite a
+fresh file under a temp directory (or --sqlite-path). Each run seeds --seed gate passes through the
+API, then keeps --concurrency requests in flight for --duration seconds (closed loop): creates for
+--write-ratio of the requests, the rest list/detail/search reads. Reports throughput and latency
+per backend and per request kind; --json writes the results to a file.
+
+    cd backend
+    python -m benchmarks.storage_backends --concurrency 32 --duration 20
+    python -m benchmarks.storage_backends --backends sqlite --write-ratio 0.5 --json sqlite.json
+"""
+import argparse
+import http.client
+import json
+import os
+import random
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date
+
+from benchmarks.db_mode import DEFAULT_PATHS, _login, _wait_ready, percentile
+
+PRODUCTS = [(f"BENCH-{i:04d}", f"Bolt {i} steel" if i % 3 else f"Nut {i} brass") for i in range(200)]
+
+
+def _pass_body(rnd):
+    return {
+        "pass_date": str(date.today()),
+        "authorized_name": f"Driver {rnd.randrange(500)}",
+        "plate_no": f"ABC {rnd.randrange(9999):04d}",
+        "items": [
+            {"item_code": code, "item_description": desc, "qty": rnd.randint(1, 100), "destination": f"WH{rnd.randrange(5)}"}
+            for code, desc in rnd.sample(PRODUCTS, rnd.randint(1, 5))
+        ],
+    }
+
+
+def _request(conn, method, path, headers, body=None):
+    if body is not None:
+        body = json.dumps(body)
+        headers = dict(headers, **{"Content-Type": "application/json"})
+    conn.request(method, path, body, headers)
+    resp = conn.getresponse()
+    return resp.status, resp.read()
+
+
+def _seed(port, token, count):
+    """Products plus `count` gate passes through the API; returns the new pass ids."""
+    headers = {"Authorization": f"Bearer {token}"}
+    conn = http.client.HTTPConnection("127.0.0.1", port, timeout=60)
+    items = [{"item_code": code, "item_description": desc, "item_group": "BENCH"} for code, desc in PRODUCTS]
+    status, body = _request(conn, "POST", "/products/bulk", headers, {"items": items})
+    if status != 200:
+        raise SystemExit(f"seeding products failed: {status} {body[:200]!r}")
+    rnd = random.Random(42)
+    ids = []
+    for _ in range(count):
+        status, body = _request(conn, "POST", "/gate-passes", headers, _pass_body(rnd))
+        if status != 200:
+            raise SystemExit(f"seeding gate passes failed: {status} {body[:200]!r}")
+        ids.append(json.loads(body)["id"])
+    return ids
+
+
+def _load(port, token, paths, ids, concurrency, duration, write_ratio):
+    headers = {"Authorization": f"Bearer {token}"}
+    stop = time.perf_counter() + duration
+    lock = threading.Lock()
+    latencies = {"read": [], "write": []}
+    errors = [0]
+
+    def client(seed):
+        rnd = random.Random(seed)
+        conn = http.client.HTTPConnection("127.0.0.1", port, timeout=60)
+        local, failed = {"read": [], "write": []}, 0
+        while time.perf_counter() < stop:
+            if rnd.random() < write_ratio:
+                kind, method, path, body = "write", "POST", "/gate-passes", _pass_body(rnd)
+            else:
+                kind, method, body = "read", "GET", None
+                path = rnd.choice(paths).replace("{id}", str(rnd.choice(ids)))
+            t0 = time.perf_counter()
+            try:
+                status, _ = _request(conn, method, path, headers, body)
+                if status != 200:
+                    failed += 1
+            except (OSError, http.client.HTTPException):
+                conn.close()
+                conn = http.client.HTTPConnection("127.0.0.1", port, timeout=60)
+                failed += 1
+            local[kind].append(time.perf_counter() - t0)
+        with lock:
+            for kind, samples in local.items():
+                latencies[kind].extend(samples)
+            errors[0] += failed
+
+    t0 = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as ex:
+        list(ex.map(client, range(concurrency)))
+    return {kind: sorted(samples) for kind, samples in latencies.items()}, errors[0], time.perf_counter() - t0
+
+
+def _summary(latencies, elapsed):
+    ms = [lat * 1000 for lat in latencies]
+    if not ms:
+        return {"requests": 0}
+    return {
+        "requests": len(ms),
+        "rps": round(len(ms) / elapsed, 1),
+        "p50_ms": round(percentile(ms, 0.5), 2),
+        "p95_ms": round(percentile(ms, 0.95), 2),
+        "p99_ms": round(percentile(ms, 0.99), 2),
+    }
+
+
+def run_backend(backend, args, tmpdir):
+    env = dict(os.environ, DB_BACKEND=backend, EVENTS_BACKEND="memory")
+    if backend == "sqlite":
+        env["SQLITE_PATH"] = args.sqlite_path or os.path.join(tmpdir, "bench.db")
+    proc = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "app.main:app", "--port", str(args.port), "--log-level", "warning"],
+        env=env,
+    )
+    try:
+        try:
+            _wait_ready(args.port, proc)
+        except SystemExit as e:
+            print(f"{backend:<6} skipped: {e}")
+            return {"backend": backend, "skipped": str(e)}
+        token = _login(args.port, args.username, args.password)
+        ids = _seed(args.port, token, args.seed)
+        _load(args.port, token, args.path, ids, args.concurrency, min(3.0, args.duration), args.write_ratio)  # warm up
+        latencies, errors, elapsed = _load(args.port, token, args.path, ids, args.concurrency, args.duration, args.write_ratio)
+    finally:
+        proc.terminate()
+        proc.wait(timeout=30)
+    result = {
+        "backend": backend,
+        "errors": errors,
+        **_summary(latencies["read"] + latencies["write"], elapsed),
+        "read": _summary(latencies["read"], elapsed),
+        "write": _summary(latencies["write"], elapsed),
+    }
+    line = f"{backend:<6} requests={result['requests']} errors={errors}"
+    for kind in ("read", "write"):
+        s = result[kind]
+        if s["requests"]:
+            line += f"  {kind}: rps={s['rps']:.0f} p50={s['p50_ms']:.2f} ms p95={s['p95_ms']:.2f} ms p99={s['p99_ms']:.2f} ms"
+    print(line)
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--backends", nargs="+", choices=("mysql", "sqlite"), default=["mysql", "sqlite"])
+    parser.add_argument("--concurrency", type=int, default=32, help="requests kept in flight")
+    parser.add_argument("--duration", type=float, default=20, help="seconds per backend")
+    parser.add_argument("--write-ratio", type=float, default=0.1, help="fraction of requests that create a gate pass")
+    parser.add_argument("--seed", type=int, default=300, help="gate passes created before the run")
+    parser.add_argument("--sqlite-path", help="SQLite file to use (default: a fresh temp file)")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--path", action="append", help="GET path to request ({id} = a seeded gate pass id); repeatable")
+    parser.add_argument("--username", default="admin")
+    parser.add_argument("--password", default="admin123")
+    parser.add_argument("--json", help="write the results to this file")
+    args = parser.parse_args()
+    args.path = args.path or DEFAULT_PATHS
+
+    with tempfile.TemporaryDirectory() as tmpdir:
+        results = {backend: run_backend(backend, args, tmpdir) for backend in args.backends}
+    mysql, sqlite = results.get("mysql", {}), results.get("sqlite", {})
+    if mysql.get("rps") and sqlite.get("rps"):
+        print(f"sqlite/mysql throughput: {sqlite['rps'] / mysql['rps']:.2f}x")
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump({"args": {k: v for k, v in vars(args).items() if k != "password"}, "results": results}, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
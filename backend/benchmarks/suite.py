@@ -0,0 +1,274 @@
+"""
+Benchmark suite: fixed scenarios against the API, reported as JSON for comparison between commits.
+
+Drives the FastAPI app in-process (default; httpx ASGI transport, app startup/shutdown included) or
+a running server with --url, against data from benchmarks.datagen in the database configured in
+backend/.env. Each scenario sends a fixed number of requests with a fixed concurrency after a short
+warm-up and reports throughput, p50/p95/p99 latency, response statuses, and DB statements and DB time
+per request (from GET /metrics, so run a single worker when using --url).
+
+Scenarios:
+  login                 POST /auth/login as the generated users (bcrypt dominated)
+  list_gate_passes      GET /gate-passes?limit=50, plain, filtered by status, and a deep keyset page
+  scan_by_number        GET /gate-passes/scan/{gp_number} (the Scan page's lookup) for random generated passes
+  create_gate_pass_50   POST /gate-passes with 50 item lines
+  product_import        POST /products/import?mode=upsert, a 1000-row CSV changing every description
+
+In-process runs lift the login rate limits (they would cap the login scenario at LOGIN_RATE_PER_IP
+per minute); with --url, start the server with LOGIN_RATE_PER_IP / LOGIN_RATE_PER_USERNAME raised.
+
+    cd backend
+    python -m benchmarks.datagen --passes 20000
+    python -m benchmarks.suite --json before.json
+    python -m benchmarks.suite --json after.json --baseline before.json
+    python -m benchmarks.suite --url http://127.0.0.1:8000 --scenario scan_by_number --requests 5000
+"""
+import argparse
+import asyncio
+import json
+import os
+import platform
+import random
+import re
+import subprocess
+import sys
+import time
+from collections import Counter
+from datetime import date, datetime, timezone
+
+import httpx
+
+from app.database import DB_BACKEND, get_db
+from benchmarks.datagen import PRODUCT_PREFIX, USER_PASSWORD, USER_PREFIX, product_rows
+from benchmarks.db_mode import percentile
+
+IMPORT_ROWS = 1000
+CREATE_ITEMS = 50
+
+
+class Context:
+    """Data the scenarios draw from: generated users, gate pass ids/numbers and products."""
+
+    def __init__(self):
+        with get_db() as conn:
+            with conn.cursor() as cur:
+                cur.execute("SELECT username FROM users WHERE username LIKE %s", (USER_PREFIX.replace("_", "\\_") + "%",))
+                self.users = [r["username"] for r in cur.fetchall()]
+                cur.execute("SELECT id, gp_number FROM gate_passes ORDER BY id DESC LIMIT 5000")
+                rows = cur.fetchall()
+                cur.execute("SELECT COUNT(*) AS c FROM gate_passes")
+                self.total_passes = int(cur.fetchone()["c"])
+        if not self.users or not rows:
+            raise SystemExit("No generated data in the database; run python -m benchmarks.datagen first")
+        self.ids = [r["id"] for r in rows]
+        self.gp_numbers = [r["gp_number"] for r in rows]
+        self.products = product_rows(1000, random.Random(42))
+        self.imports = 0
+
+
+def _login(rnd, ctx):
+    return "POST", "/auth/login", {"json": {"username": rnd.choice(ctx.users), "password": USER_PASSWORD}}
+
+
+def _list(rnd, ctx):
+    path = rnd.choice([
+        "/gate-passes?limit=50",
+        "/gate-passes?limit=50&status=pending",
+        f"/gate-passes?limit=50&after_id={rnd.choice(ctx.ids)}",
+    ])
+    return "GET", path, {}
+
+
+def _scan(rnd, ctx):
+    return "GET", f"/gate-passes/scan/{rnd.choice(ctx.gp_numbers)}", {}
+
+
+def _create(rnd, ctx):
+    items = [
+        {"item_code": code, "item_description": description, "qty": rnd.randint(1, 200), "destination": "Warehouse 1"}
+        for code, description, _ in rnd.sample(ctx.products, CREATE_ITEMS)
+    ]
+    body = {"pass_date": str(date.today()), "authorized_name": f"Driver {rnd.randrange(500)}", "plate_no": "BENCH 001", "items": items}
+    return "POST", "/gate-passes", {"json": body}
+
+
+def _import(rnd, ctx):
+    ctx.imports += 1
+    lines = ["Item No.,Item Description,Item Group"]
+    lines += [f"{PRODUCT_PREFIX}{i:05d},Imported item {i} rev {ctx.imports},FG" for i in range(IMPORT_ROWS)]
+    csv = ("\n".join(lines) + "\n").encode()
+    return "POST", "/products/import?mode=upsert", {"files": {"file": ("products.csv", csv, "text/csv")}}
+
+
+# name -> (request builder, default requests, default concurrency, authenticated)
+SCENARIOS = {
+    "login": (_login, 200, 16, False),
+    "list_gate_passes": (_list, 1000, 16, True),
+    "scan_by_number": (_scan, 2000, 32, True),
+    "create_gate_pass_50": (_create, 300, 8, True),
+    "product_import": (_import, 20, 2, True),
+}
+
+_METRIC_RE = re.compile(r"^(db_queries_total|http_request_db_seconds_sum)(?:\{[^}]*\})? (\S+)$", re.MULTILINE)
+
+
+async def _db_totals(client):
+    """(statements, DB seconds) so far according to GET /metrics."""
+    resp = await client.get("/metrics")
+    resp.raise_for_status()
+    totals = {"db_queries_total": 0.0, "http_request_db_seconds_sum": 0.0}
+    for name, value in _METRIC_RE.findall(resp.text):
+        totals[name] += float(value)
+    return totals["db_queries_total"], totals["http_request_db_seconds_sum"]
+
+
+async def _drive(client, build, ctx, headers, requests, concurrency, seed):
+    """Send `requests` requests from `concurrency` workers; returns (latencies, status counts, elapsed)."""
+    remaining = [requests]
+    latencies, statuses = [], Counter()
+
+    async def worker(n):
+        rnd = random.Random(seed * 1000 + n)
+        while remaining[0] > 0:
+            remaining[0] -= 1
+            method, path, kwargs = build(rnd, ctx)
+            t0 = time.perf_counter()
+            try:
+                resp = await client.request(method, path, headers=headers, **kwargs)
+                status = resp.status_code
+            except httpx.HTTPError as e:
+                status = type(e).__name__
+            latencies.append(time.perf_counter() - t0)
+            statuses[status] += 1
+
+    t0 = time.perf_counter()
+    await asyncio.gather(*(worker(n) for n in range(concurrency)))
+    return sorted(latencies), statuses, time.perf_counter() - t0
+
+
+async def run_scenario(client, name, ctx, token, args):
+    build, requests, concurrency, authenticated = SCENARIOS[name]
+    requests = args.requests or requests
+    concurrency = min(args.concurrency or concurrency, requests)
+    headers = {"Authorization": f"Bearer {token}"} if authenticated else {}
+    await _drive(client, build, ctx, headers, max(1, requests // 10), concurrency, seed=0)  # warm-up
+    queries0, db0 = await _db_totals(client)
+    latencies, statuses, elapsed = await _drive(client, build, ctx, headers, requests, concurrency, seed=args.seed)
+    queries1, db1 = await _db_totals(client)
+    ms = [lat * 1000 for lat in latencies]
+    ok = sum(n for status, n in statuses.items() if status == 200)
+    return {
+        "requests": len(ms),
+        "concurrency": concurrency,
+        "errors": len(ms) - ok,
+        "statuses": {str(status): n for status, n in sorted(statuses.items(), key=str)},
+        "elapsed_s": round(elapsed, 3),
+        "rps": round(len(ms) / elapsed, 1),
+        "p50_ms": round(percentile(ms, 0.5), 2),
+        "p95_ms": round(percentile(ms, 0.95), 2),
+        "p99_ms": round(percentile(ms, 0.99), 2),
+        "max_ms": round(ms[-1], 2),
+        "db_queries_per_request": round((queries1 - queries0) / len(ms), 2),
+        "db_ms_per_request": round((db1 - db0) * 1000 / len(ms), 3),
+    }
+
+
+async def _token(client, username, password):
+    resp = await client.post("/auth/login", json={"username": username, "password": password})
+    if resp.status_code != 200:
+        raise SystemExit(f"login as {username} failed: {resp.status_code} {resp.text[:200]}")
+    return resp.json()["access_token"]
+
+
+async def _run(args, ctx):
+    if args.url:
+        limits = httpx.Limits(max_connections=args.concurrency or max(s[2] for s in SCENARIOS.values()))
+        client = httpx.AsyncClient(base_url=args.url, timeout=120, limits=limits)
+        lifespan = None
+    else:
+        from app.main import app
+        from app.routes import auth
+        for limiter in (auth._ip_limiter, auth._username_limiter):
+            limiter.limit = sys.maxsize
+        client = httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://bench", timeout=120)
+        lifespan = app.router.lifespan_context(app)
+        await lifespan.__aenter__()
+    results = {}
+    try:
+        async with client:
+            token = await _token(client, args.username, args.password)
+            for name in args.scenario:
+                results[name] = result = await run_scenario(client, name, ctx, token, args)
+                print(f"{name:<20} n={result['requests']:<5} err={result['errors']:<4} rps={result['rps']:>8.1f}  "
+                      f"p50={result['p50_ms']:>8.2f}  p95={result['p95_ms']:>8.2f}  p99={result['p99_ms']:>8.2f} ms  "
+                      f"queries/req={result['db_queries_per_request']:.1f}  db/req={result['db_ms_per_request']:.2f} ms")
+    finally:
+        if lifespan is not None:
+            await lifespan.__aexit__(None, None, None)
+    return results
+
+
+def _git():
+    def git(*cmd):
+        try:
+            return subprocess.run(["git", *cmd], capture_output=True, text=True, check=True).stdout.strip()
+        except (OSError, subprocess.CalledProcessError):
+            return None
+    return {"commit": git("rev-parse", "HEAD"), "dirty": bool(git("status", "--porcelain", "--untracked-files=no"))}
+
+
+def compare(results, baseline):
+    """Print each scenario against the same scenario in a baseline JSON report."""
+    print(f"\nvs {baseline.get('git', {}).get('commit') or 'baseline'}:")
+    for name, new in results.items():
+        old = baseline.get("scenarios", {}).get(name)
+        if not old:
+            continue
+        rps = new["rps"] / old["rps"] if old["rps"] else float("nan")
+        p95 = new["p95_ms"] / old["p95_ms"] if old["p95_ms"] else float("nan")
+        queries = new["db_queries_per_request"] - old["db_queries_per_request"]
+        flag = "  <-- slower" if rps < 0.9 or p95 > 1.1 else ""
+        flag += "  <-- more queries" if queries > 0.5 else ""
+        print(f"{name:<20} rps x{rps:.2f}  p95 x{p95:.2f}  queries/req {queries:+.1f}{flag}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--scenario", action="append", choices=list(SCENARIOS), help="run only these (repeatable)")
+    parser.add_argument("--url", help="benchmark a running server instead of the app in-process")
+    parser.add_argument("--requests", type=int, help="requests per scenario (default: per scenario)")
+    parser.add_argument("--concurrency", type=int, help="requests in flight (default: per scenario)")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--username", default="admin")
+    parser.add_argument("--password", default="admin123")
+    parser.add_argument("--json", help="write the report to this file ('-' for stdout)")
+    parser.add_argument("--baseline", help="earlier --json report to compare against")
+    args = parser.parse_args()
+    args.scenario = args.scenario or list(SCENARIOS)
+
+    ctx = Context()
+    results = asyncio.run(_run(args, ctx))
+    report = {
+        "timestamp": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "git": _git(),
+        "target": args.url or "in-process",
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpus": os.cpu_count(),
+        "db_backend": DB_BACKEND,
+        "db_mode": os.getenv("DB_MODE", "async"),
+        "gate_passes": ctx.total_passes,
+        "scenarios": results,
+    }
+    if args.json == "-":
+        json.dump(report, sys.stdout, indent=2)
+    elif args.json:
+        with open(args.json, "w") as f:
+            json.dump(report, f, indent=2)
+    if args.baseline:
+        with open(args.baseline) as f:
+            compare(results, json.load(f))
+
+
+if __name__ == "__main__":
+    main()
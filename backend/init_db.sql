@@ -9,6 +9,13 @@ USE gate_pass_db;
 -- Drop tables if they exist (child tables first due to foreign keys)
 DROP TABLE IF EXISTS gate_pass_items;
 DROP TABLE IF EXISTS gate_passes;
+DROP TABLE IF EXISTS gp_sequences;
+DROP TABLE IF EXISTS cache_versions;
+DROP TABLE IF EXISTS schema_version;
+DROP TABLE IF EXISTS report_daily_passes;
+DROP TABLE IF EXISTS report_daily_items;
+DROP TABLE IF EXISTS report_daily_destinations;
+DROP TABLE IF EXISTS gate_pass_events;
 DROP TABLE IF EXISTS products;
 DROP TABLE IF EXISTS users;
 
@@ -28,7 +35,9 @@ CREATE TABLE products (
     item_code VARCHAR(100) UNIQUE NOT NULL,
     item_description VARCHAR(500) NOT NULL,
     item_group VARCHAR(100),
-    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    INDEX idx_products_item_group_code (item_group, item_code),
+    FULLTEXT INDEX ft_products_item_description (item_description)
 );
 
 
@@ -56,7 +65,14 @@ CREATE TABLE gate_passes (
     time_out VARCHAR(20),
     time_in VARCHAR(20),
     date_approved DATE NULL,
-    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    change_version BIGINT UNSIGNED NOT NULL DEFAULT 0,
+    INDEX idx_gate_passes_status_id (status, id),
+    INDEX idx_gate_passes_in_or_out_id (in_or_out, id),
+    INDEX idx_gate_passes_pass_date_id (pass_date, id),
+    INDEX idx_gate_passes_authorized_name (authorized_name),
+    INDEX idx_gate_passes_plate_no (plate_no),
+    INDEX idx_gate_passes_change_version_id (change_version, id)
 );
 
 -- Gate pass line items
@@ -69,5 +85,76 @@ CREATE TABLE gate_pass_items (
     qty INT NOT NULL,
     ref_doc_no VARCHAR(100),
     destination VARCHAR(255),
+    INDEX idx_gate_pass_items_gate_pass_id_id (gate_pass_id, id),
     FOREIGN KEY (gate_pass_id) REFERENCES gate_passes(id) ON DELETE CASCADE
 );
+
+-- GP number sequence per year (last issued sequence; GP number = year + sequence)
+CREATE TABLE gp_sequences (
+    year INT PRIMARY KEY,
+    last_seq INT UNSIGNED NOT NULL
+);
+
+-- Cache version counters (bumped on writes so every app worker can invalidate its in-memory caches)
+CREATE TABLE cache_versions (
+    name VARCHAR(50) PRIMARY KEY,
+    version BIGINT UNSIGNED NOT NULL
+);
+
+-- Daily report rollups (kept up to date by the app; rebuild with: python -m app.reports rebuild)
+CREATE TABLE report_daily_passes (
+    pass_date DATE NOT NULL,
+    status VARCHAR(20) NOT NULL,
+    in_or_out VARCHAR(10) NOT NULL,
+    passes INT NOT NULL,
+    PRIMARY KEY (pass_date, status, in_or_out)
+);
+
+CREATE TABLE report_daily_items (
+    pass_date DATE NOT NULL,
+    status VARCHAR(20) NOT NULL,
+    item_code VARCHAR(100) NOT NULL,
+    qty BIGINT NOT NULL,
+    line_count INT NOT NULL,
+    PRIMARY KEY (pass_date, status, item_code)
+);
+
+CREATE TABLE report_daily_destinations (
+    pass_date DATE NOT NULL,
+    status VARCHAR(20) NOT NULL,
+    destination VARCHAR(255) NOT NULL,
+    qty BIGINT NOT NULL,
+    line_count INT NOT NULL,
+    PRIMARY KEY (pass_date, status, destination)
+);
+
+-- Gate pass change events streamed by GET /gate-passes/events (EVENTS_BACKEND=mysql); id is the gate_passes cache version
+CREATE TABLE gate_pass_events (
+    id BIGINT UNSIGNED PRIMARY KEY,
+    type VARCHAR(20) NOT NULL,
+    data MEDIUMTEXT NOT NULL,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    INDEX idx_gate_pass_events_created_at (created_at)
+);
+
+-- Migrations this script already includes, so the runner (app.migrations) treats the schema as current
+CREATE TABLE schema_version (
+    version INT PRIMARY KEY,
+    name VARCHAR(255) NOT NULL,
+    applied_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+
+INSERT INTO schema_version (version, name) VALUES
+(1, '001_add_products_item_group.sql'),
+(2, '002_add_gatepass_in_out_status.sql'),
+(3, '003_user_role_to_gatepass_only.sql'),
+(4, '004_add_gatepass_attention.sql'),
+(5, '005_add_gatepass_date_approved.sql'),
+(6, '006_add_gatepass_list_indexes.sql'),
+(7, '007_add_gp_sequences.sql'),
+(8, '008_add_cache_versions.sql'),
+(9, '009_add_products_search_index.sql'),
+(10, '010_add_report_rollups.sql'),
+(11, '011_add_hot_query_indexes.sql'),
+(12, '012_add_gate_pass_events.sql'),
+(13, '013_add_gate_pass_change_version.sql');
@@ -0,0 +1,8 @@
+-- Indexes for GET /gate-passes filters and keyset pagination (ORDER BY id DESC, id < after_id).
+-- Run once on existing DBs; new installs get them from init_db.sql / app startup.
+-- If you get "Duplicate key name", the index already exists; skip that line.
+CREATE INDEX idx_gate_passes_status_id ON gate_passes (status, id);
+CREATE INDEX idx_gate_passes_in_or_out_id ON gate_passes (in_or_out, id);
+CREATE INDEX idx_gate_passes_pass_date_id ON gate_passes (pass_date, id);
+CREATE INDEX idx_gate_passes_authorized_name ON gate_passes (authorized_name);
+CREATE INDEX idx_gate_passes_plate_no ON gate_passes (plate_no);
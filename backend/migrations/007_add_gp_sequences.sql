@@ -0,0 +1,6 @@
+-- Per-year GP number sequence (replaces MAX(gp_number) scan on every create).
+-- Run once on existing DBs. The app seeds each year's row from existing gp_numbers on first use.
+CREATE TABLE IF NOT EXISTS gp_sequences (
+    year INT PRIMARY KEY,
+    last_seq INT UNSIGNED NOT NULL
+);
@@ -0,0 +1,6 @@
+-- Version counters for the app's in-memory caches (e.g. product catalog); bumped on writes so all workers see changes.
+-- Run once on existing DBs.
+CREATE TABLE IF NOT EXISTS cache_versions (
+    name VARCHAR(50) PRIMARY KEY,
+    version BIGINT UNSIGNED NOT NULL
+);
@@ -0,0 +1,3 @@
+-- FULLTEXT index for GET /products/search description lookups (item_code prefixes use its UNIQUE index).
+-- Run once on existing DBs; skip if you get "Duplicate key name".
+CREATE FULLTEXT INDEX ft_products_item_description ON products (item_description);
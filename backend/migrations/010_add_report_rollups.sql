@@ -0,0 +1,51 @@
+-- Daily rollups behind the /reports endpoints, maintained on gate pass create and status change.
+-- Applied by app.migrations; the INSERTs backfill from existing passes (same as python -m app.reports rebuild).
+CREATE TABLE IF NOT EXISTS report_daily_passes (
+    pass_date DATE NOT NULL,
+    status VARCHAR(20) NOT NULL,
+    in_or_out VARCHAR(10) NOT NULL,
+    passes INT NOT NULL,
+    PRIMARY KEY (pass_date, status, in_or_out)
+);
+
+CREATE TABLE IF NOT EXISTS report_daily_items (
+    pass_date DATE NOT NULL,
+    status VARCHAR(20) NOT NULL,
+    item_code VARCHAR(100) NOT NULL,
+    qty BIGINT NOT NULL,
+    line_count INT NOT NULL,
+    PRIMARY KEY (pass_date, status, item_code)
+);
+
+CREATE TABLE IF NOT EXISTS report_daily_destinations (
+    pass_date DATE NOT NULL,
+    status VARCHAR(20) NOT NULL,
+    destination VARCHAR(255) NOT NULL,
+    qty BIGINT NOT NULL,
+    line_count INT NOT NULL,
+    PRIMARY KEY (pass_date, status, destination)
+);
+
+INSERT INTO report_daily_passes (pass_date, status, in_or_out, passes)
+SELECT * FROM (
+    SELECT g.pass_date, LOWER(COALESCE(NULLIF(TRIM(g.status), ''), 'pending')) AS status,
+           LOWER(COALESCE(NULLIF(TRIM(g.in_or_out), ''), 'out')) AS in_or_out, COUNT(*) AS passes
+    FROM gate_passes g GROUP BY 1, 2, 3
+) AS new
+ON DUPLICATE KEY UPDATE passes = new.passes;
+
+INSERT INTO report_daily_items (pass_date, status, item_code, qty, line_count)
+SELECT * FROM (
+    SELECT g.pass_date, LOWER(COALESCE(NULLIF(TRIM(g.status), ''), 'pending')) AS status,
+           COALESCE(i.item_code, '') AS item_code, SUM(i.qty) AS qty, COUNT(*) AS line_count
+    FROM gate_pass_items i JOIN gate_passes g ON g.id = i.gate_pass_id GROUP BY 1, 2, 3
+) AS new
+ON DUPLICATE KEY UPDATE qty = new.qty, line_count = new.line_count;
+
+INSERT INTO report_daily_destinations (pass_date, status, destination, qty, line_count)
+SELECT * FROM (
+    SELECT g.pass_date, LOWER(COALESCE(NULLIF(TRIM(g.status), ''), 'pending')) AS status,
+           COALESCE(i.destination, '') AS destination, SUM(i.qty) AS qty, COUNT(*) AS line_count
+    FROM gate_pass_items i JOIN gate_passes g ON g.id = i.gate_pass_id GROUP BY 1, 2, 3
+) AS new
+ON DUPLICATE KEY UPDATE qty = new.qty, line_count = new.line_count;
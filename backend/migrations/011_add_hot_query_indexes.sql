@@ -0,0 +1,6 @@
+-- Indexes for the hot item and catalog queries. Applied by app.migrations.
+-- gate_pass_items: batched item loads (WHERE gate_pass_id IN (...) ORDER BY gate_pass_id, id).
+-- products: the full catalog (ORDER BY item_group, item_code).
+-- gate_passes (status, id) and (pass_date, id) already exist from 006; (pass_date, id) also serves pass_date ranges.
+CREATE INDEX idx_gate_pass_items_gate_pass_id_id ON gate_pass_items (gate_pass_id, id);
+CREATE INDEX idx_products_item_group_code ON products (item_group, item_code);
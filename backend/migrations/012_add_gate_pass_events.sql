@@ -0,0 +1,9 @@
+-- Gate pass change events for GET /gate-passes/events (EVENTS_BACKEND=mysql). Applied by app.migrations.
+-- id is the gate_passes cache version committed with the change, so ids are gap-free and commit in order.
+CREATE TABLE IF NOT EXISTS gate_pass_events (
+    id BIGINT UNSIGNED PRIMARY KEY,
+    type VARCHAR(20) NOT NULL,
+    data MEDIUMTEXT NOT NULL,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    INDEX idx_gate_pass_events_created_at (created_at)
+);
@@ -0,0 +1,7 @@
+-- Commit-ordered change stamp for the scanner delta feed (GET /gate-passes/sync). Applied by app.migrations.
+-- Every create and status change stamps its passes with the gate_passes cache version it bumped. That row
+-- stays locked until commit, so versions commit in order and a cursor never skips a slow transaction
+-- (a timestamp is set when the statement runs, not when it commits). Existing passes start at 0 and come
+-- with a full sync. The feed reads (change_version, id) ranges from the index, never the whole table.
+ALTER TABLE gate_passes ADD COLUMN change_version BIGINT UNSIGNED NOT NULL DEFAULT 0;
+CREATE INDEX idx_gate_passes_change_version_id ON gate_passes (change_version, id);
@@ -0,0 +1,3 @@
+-- SQLite version of 013_add_gate_pass_change_version.sql.
+ALTER TABLE gate_passes ADD COLUMN change_version INTEGER NOT NULL DEFAULT 0;
+CREATE INDEX IF NOT EXISTS idx_gate_passes_change_version_id ON gate_passes (change_version, id);
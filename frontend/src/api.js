@@ -36,7 +36,8 @@ export function getAuthHeader() {
 
 const API_TIMEOUT_MS = 15000;
 
-export async function api(path, options = {}) {
+// fetch() with the API base, auth header and timeout; resolves to the Response, throws on an error status
+async function request(path, options = {}) {
   const base = getApiBase();
   const url = `${base}${path}`;
   if (typeof window !== 'undefined' && path === '/auth/login') {
@@ -56,7 +57,7 @@ export async function api(path, options = {}) {
       const err = await res.json().catch(() => ({ detail: res.statusText }));
       throw new Error(err.detail || res.statusText);
     }
-    return res.json();
+    return res;
   } catch (e) {
     clearTimeout(timeoutId);
     if (e.name === 'AbortError') {
@@ -66,6 +67,10 @@ export async function api(path, options = {}) {
   }
 }
 
+export async function api(path, options = {}) {
+  return (await request(path, options)).json();
+}
+
 export async function login(username, password) {
   return api('/auth/login', {
     method: 'POST',
@@ -106,8 +111,32 @@ export async function deleteProduct(id) {
   return api(`/products/${id}`, { method: 'DELETE', headers: getAuthHeader() });
 }
 
-export async function getGatePasses() {
-  return api('/gate-passes', { headers: getAuthHeader() });
+function gatePassQuery(params) {
+  const qs = new URLSearchParams();
+  for (const [key, value] of Object.entries(params)) {
+    if (value == null || value === '') continue;
+    for (const v of Array.isArray(value) ? value : [value]) qs.append(key, v);
+  }
+  const query = qs.toString();
+  return query ? `?${query}` : '';
+}
+// params: { after_id, limit, status (string or array), in_or_out, pass_date_from, pass_date_to, authorized_name, plate_no }
+// One page, newest first: { passes, nextAfterId } where nextAfterId (null on the last page) is the after_id of the next
+export async function getGatePassPage(params = {}) {
+  const res = await request(`/gate-passes${gatePassQuery(params)}`, { headers: getAuthHeader() });
+  const next = res.headers.get('X-Next-After-Id');
+  return { passes: await res.json(), nextAfterId: next ? Number(next) : null };
+}
+// Every matching pass, page by page; for small sets such as the pending passes
+export async function getGatePasses(params = {}) {
+  const all = [];
+  let after_id = params.after_id;
+  do {
+    const page = await getGatePassPage({ limit: 500, ...params, after_id });
+    all.push(...page.passes);
+    after_id = page.nextAfterId;
+  } while (after_id);
+  return all;
 }
 export async function getGatePass(id) {
   return api(`/gate-passes/${id}`, { headers: getAuthHeader() });
@@ -115,6 +144,10 @@ export async function getGatePass(id) {
 export async function getGatePassByNumber(gpNumber) {
   return api(`/gate-passes/by-number/${encodeURIComponent(gpNumber)}`);
 }
+// Compact scanner view (no attention / approved by); fetch by number for printing
+export async function getGatePassScan(gpNumber) {
+  return api(`/gate-passes/scan/${encodeURIComponent(gpNumber)}`);
+}
 export async function createGatePass(data) {
   return api('/gate-passes', { method: 'POST', body: JSON.stringify(data), headers: getAuthHeader() });
 }
@@ -124,4 +157,37 @@ export async function updateGatePassStatus(id, { status, rejected_remarks, appro
     body: JSON.stringify({ status, rejected_remarks, approved_by }),
     headers: getAuthHeader(),
   });
-}
\ No newline at end of file
+}
+
+// Live gate pass changes (server-sent events). handlers: { created, status, reset }, each called with the event data
+// ({ passes: [...] } for created/status). The browser reconnects with Last-Event-ID by itself. Returns an unsubscribe function.
+export function subscribeGatePassEvents(handlers) {
+  const token = localStorage.getItem('token');
+  const source = new EventSource(`${getApiBase()}/gate-passes/events${token ? `?access_token=${encodeURIComponent(token)}` : ''}`);
+  for (const type of ['created', 'status', 'reset']) {
+    if (handlers[type]) source.addEventListener(type, (e) => handlers[type](JSON.parse(e.data)));
+  }
+  return () => source.close();
+}
+
+// Scanner delta feed: passes created or changed since `since` (a cursor from the previous call; omit for everything).
+// Returns { cursor, more, passes } with passes as objects (scan fields plus items); keep calling while `more` is true.
+export async function syncGatePasses(since, limit) {
+  const qs = new URLSearchParams();
+  if (since) qs.set('since', since);
+  if (limit) qs.set('limit', limit);
+  const query = qs.toString();
+  const { cursor, more, fields, item_fields: itemFields, passes } = await api(
+    `/gate-passes/sync${query ? `?${query}` : ''}`,
+    { headers: getAuthHeader() },
+  );
+  const toObject = (names, values) => Object.fromEntries(names.map((name, i) => [name, values[i]]));
+  return {
+    cursor,
+    more,
+    passes: passes.map((row) => ({
+      ...toObject(fields, row),
+      items: row[fields.length].map((item) => toObject(itemFields, item)),
+    })),
+  };
+}
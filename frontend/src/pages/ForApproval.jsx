@@ -1,5 +1,5 @@
 import { useState, useEffect } from 'react';
-import { getGatePasses, updateGatePassStatus } from '../api';
+import { getGatePass, getGatePasses, subscribeGatePassEvents, updateGatePassStatus } from '../api';
 import { useAuth } from '../context/AuthContext';
 import './GatePassForm.css';
 import './Scan.css';
@@ -18,20 +18,40 @@ export default function ForApproval() {
 
   useEffect(() => {
     let cancelled = false;
-    (async () => {
-      setLoading(true);
+    async function load() {
       setError('');
       try {
-        const data = await getGatePasses();
-        const pending = (data || []).filter((g) => (g.status || 'pending') === 'pending');
-        if (!cancelled) setList(pending);
+        const data = await getGatePasses({ status: 'pending' });
+        if (!cancelled) setList(data || []);
       } catch (e) {
         if (!cancelled) setError(e.message);
       } finally {
         if (!cancelled) setLoading(false);
       }
-    })();
-    return () => { cancelled = true; };
+    }
+    // Newly pending passes are fetched one by one; passes that left pending are dropped from the list
+    async function addPending(passes) {
+      for (const p of passes.filter((p) => p.status === 'pending')) {
+        try {
+          const full = await getGatePass(p.id);
+          if (!cancelled) setList((prev) => (prev.some((g) => g.id === full.id) ? prev : [full, ...prev]));
+        } catch (_) {}
+      }
+    }
+    load();
+    const unsubscribe = subscribeGatePassEvents({
+      created: ({ passes }) => addPending(passes),
+      status: ({ passes }) => {
+        const decided = new Set(passes.filter((p) => p.status !== 'pending').map((p) => p.id));
+        setList((prev) => prev.filter((g) => !decided.has(g.id)));
+        addPending(passes);
+      },
+      reset: load,
+    });
+    return () => {
+      cancelled = true;
+      unsubscribe();
+    };
   }, []);
 
   function purposeSummary(gp) {
@@ -1,12 +1,18 @@
 import { useState, useEffect } from 'react';
 import * as XLSX from 'xlsx';
-import { getGatePasses } from '../api';
+import { getGatePassPage } from '../api';
 import './GatePassForm.css';
 import './Scan.css';
 
+// Passes per request; older ones are fetched with "Load more"
+const PAGE_SIZE = 100;
+const HISTORY_STATUSES = ['approved', 'rejected'];
+
 export default function GatePassHistory() {
   const [list, setList] = useState([]);
+  const [nextAfterId, setNextAfterId] = useState(null);
   const [loading, setLoading] = useState(true);
+  const [loadingMore, setLoadingMore] = useState(false);
   const [error, setError] = useState('');
   const [viewGp, setViewGp] = useState(null);
   const [search, setSearch] = useState('');
@@ -17,8 +23,11 @@ export default function GatePassHistory() {
       setLoading(true);
       setError('');
       try {
-        const data = await getGatePasses();
-        if (!cancelled) setList(data);
+        const page = await getGatePassPage({ status: HISTORY_STATUSES, limit: PAGE_SIZE });
+        if (!cancelled) {
+          setList(page.passes);
+          setNextAfterId(page.nextAfterId);
+        }
       } catch (e) {
         if (!cancelled) setError(e.message);
       } finally {
@@ -28,6 +37,20 @@ export default function GatePassHistory() {
     return () => { cancelled = true; };
   }, []);
 
+  async function loadMore() {
+    setLoadingMore(true);
+    setError('');
+    try {
+      const page = await getGatePassPage({ status: HISTORY_STATUSES, limit: PAGE_SIZE, after_id: nextAfterId });
+      setList((prev) => [...prev, ...page.passes]);
+      setNextAfterId(page.nextAfterId);
+    } catch (e) {
+      setError(e.message);
+    } finally {
+      setLoadingMore(false);
+    }
+  }
+
   function purposeSummary(gp) {
     const parts = [];
     if (gp.purpose_delivery) parts.push('Delivery');
@@ -203,6 +226,13 @@ export default function GatePassHistory() {
             </tbody>
           </table>
         </div>
+        {nextAfterId && (
+          <div className="gp-history-more">
+            <button type="button" className="btn-secondary gp-export-btn" onClick={loadMore} disabled={loadingMore}>
+              {loadingMore ? 'Loading…' : 'Load more'}
+            </button>
+          </div>
+        )}
       </section>
 
       {gp && (
@@ -1,7 +1,7 @@
 import { useState, useEffect, useRef, useCallback } from 'react';
 import { useLocation, useNavigate } from 'react-router-dom';
 import { Html5Qrcode } from 'html5-qrcode';
-import { getGatePassByNumber } from '../api';
+import { getGatePassByNumber, getGatePassScan } from '../api';
 import './Scan.css';
 
 const AUTO_LOOKUP_DELAY_MS = 500;
@@ -23,7 +23,7 @@ export default function Scan() {
     setError('');
     setGatePass(null);
     try {
-      const data = await getGatePassByNumber(num);
+      const data = await getGatePassScan(num);
       setGatePass(data);
     } catch (e) {
       setError(e.message || 'Gate pass not found');
@@ -86,9 +86,15 @@ export default function Scan() {
     fetchAndShow(manualGp);
   }
 
-  function handlePrintRelease() {
+  async function handlePrintRelease() {
     if (!gatePass) return;
-    navigate('/print', { state: { gatePass, variant: 'release' } });
+    // The scan view leaves out what the release tag prints (attention, approved by)
+    try {
+      const full = await getGatePassByNumber(gatePass.gp_number);
+      navigate('/print', { state: { gatePass: full, variant: 'release' } });
+    } catch (e) {
+      setError(e.message || 'Could not load gate pass for printing');
+    }
   }
 
   useEffect(() => {